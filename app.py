@@ -10,8 +10,41 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import hashlib
+import io
+import json
+import os
+import threading
+import time
 import warnings
 
+import requests
+
+from ple import bootstrap, processing, profiling, tracing
+from ple.ingest import ingest_sources, load_manifest, sheet_export_url
+from ple.dag import Graph
+from ple.districts import DistrictRegistry
+from ple.hierarchy import ALL, HierarchyIndex
+from ple.memcache import BudgetCache
+from ple.offload import OffloadError, OffloadExecutor
+from ple.peers import PeerIndex
+from ple.profiling import ProfileHistory
+from ple.projection import MODELS, Projections
+from ple.quality import METRICS as QUALITY_METRICS
+from ple.quality import THRESHOLD as QUALITY_THRESHOLD
+from ple.quality import scan as quality_scan
+from ple.ranking import RankIndex, RankPanel
+from ple.search import NameIndex
+from ple.shrinkage import adjusted_rates
+from ple.storage import (
+    SharedDataset,
+    load_local,
+    partition_stamp,
+    partition_values,
+    read_partitioned,
+    read_summary,
+)
+
 warnings.filterwarnings("ignore")
 
 # Page configuration
@@ -364,275 +397,900 @@ COLORS = {
 # Google Sheet configuration
 GOOGLE_SHEET_ID = "1X8Iwe1jbmkFZ1SHH6ayHx6YE11hamr6idJ68-L-KJF8"
 
+# Local source used instead of the Google Sheet when set: a CSV, Excel or
+# .arrow file (converted once, then memory-mapped) or a year-partitioned
+# dataset directory written by `python -m ple.storage partition`
+LOCAL_DATA_PATH = os.environ.get("PLE_DATA_PATH")
+
+# JSON manifest of several sources (sheet tabs, local CSV/Excel files) that
+# are fetched and parsed concurrently and combined into one dataset
+SOURCES_MANIFEST = os.environ.get("PLE_SOURCES_MANIFEST")
+
+# Multi-process deployments: when set, one process loads and publishes the
+# cleaned dataset here and every server process memory-maps it read-only
+SHARED_DATASET_DIR = os.environ.get("PLE_SHARED_DATASET_DIR")
+
+# Minimum seconds between two Refresh Data clicks that actually refetch
+REFRESH_COOLDOWN_SECONDS = 30
+
+# Process pool for heavy stages; smaller frames are processed in-line
+OFFLOAD_WORKERS = 2
+OFFLOAD_MAX_PENDING = 8
+OFFLOAD_TIMEOUT_SECONDS = 120
+OFFLOAD_MIN_ROWS = 50_000
+
+# Raw and cleaned sheet copies kept by st.cache_data; a refresh clears them
+DATA_CACHE_MAX_ENTRIES = 2
+DATA_CACHE_TTL_SECONDS = 6 * 60 * 60
+
+# Byte budget for cached filtered views, summaries and exports; least
+# recently used entries are evicted beyond it
+CACHE_BUDGET_BYTES = int(float(os.environ.get("PLE_CACHE_BUDGET_MB", 256)) * 2**20)
+
+# Division filter options
+DIVISION_OPTIONS = [
+    "Division 1",
+    "Division 2",
+    "Division 3",
+    "Division 4",
+    "Division U",
+    "Division X",
+]
+DEFAULT_GRADES = ["Division 1", "Division 2", "Division 3", "Division 4"]
+
+# Cascading geography filters, coarsest first. Finer levels (schools,
+# centres) can be appended once the data carries them.
+GEOGRAPHY_LEVELS = {
+    "Zone": "Zonal Office:",
+    "Sub Region": "Sub Region:",
+    "District": "District:",
+}
 
-@st.cache_data
+# Name columns covered by the Data Explorer search
+SEARCH_COLUMNS = ["District"]
+
+# Metrics with precomputed national ranks and top/bottom N
+RANK_METRICS = [
+    "Pass_Rate",
+    "Excellence_Rate",
+    "Division 1 - Total",
+    "Strong_Performance_Rate",
+    "Division X - Total",
+]
+
+# District series projected one year ahead in the Trends tab
+PROJECTION_METRICS = ["Pass_Rate", "Excellence_Rate", "Registered - Total"]
+
+# Peer comparison: default and largest peer group, and the metrics on which
+# a district is placed within its group
+PEER_COUNT = 10
+PEER_MAX = 30
+PEER_METRICS = [
+    "Pass_Rate",
+    "Excellence_Rate",
+    "Strong_Performance_Rate",
+    "Gender_Gap",
+]
+
+# Empirical-Bayes rates, pulled towards the national rate for districts
+# with few candidates; each has _Low/_High 95% interval columns
+ADJUSTED_METRICS = [
+    "Adjusted_Pass_Rate",
+    "Adjusted_Excellence_Rate",
+    "Adjusted_Gender_Gap",
+]
+
+# Gender tab bootstrap intervals for national and regional figures (district
+# intervals are closed form): replicates, and the random draws (replicates x
+# rows) above which batches go to the pool
+BOOTSTRAP_REPLICATES = 2000
+BOOTSTRAP_SEED = 0
+BOOTSTRAP_POOL_MIN_DRAWS = 2_000_000
+
+# Filter combinations precomputed in the background at startup and after each
+# refresh. Unset keys fall back to the sidebar defaults (latest year, "All"
+# gender, Divisions 1-4); "*" expands to every value of that column.
+WARMUP_FILTERS = [
+    {},
+    {"sub_region": "*"},
+    {"zone": "*"},
+]
+
+# Developer profiling panel: PLE_PROFILE=1, or ?profile=1 in the URL
+PROFILE_ENABLED = os.environ.get("PLE_PROFILE") == "1"
+PROFILE_HISTORY = 50
+
+
+@st.cache_data(max_entries=DATA_CACHE_MAX_ENTRIES, ttl=DATA_CACHE_TTL_SECONDS)
+@profiling.computes
 def load_from_google_sheet(sheet_id, sheet_name="Sheet1"):
     """Load data from public Google Sheets"""
     try:
-        export_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}"
-        df = pd.read_csv(export_url)
+        export_url = sheet_export_url(sheet_id, sheet_name)
+        with tracing.span("fetch", kind="fetch", url=export_url) as span:
+            response = requests.get(export_url, timeout=60)
+            response.raise_for_status()
+            span.set(bytes=len(response.content), status=response.status_code)
+        with tracing.span("parse", kind="parse", format="csv") as span:
+            df = pd.read_csv(io.BytesIO(response.content))
+            span.set(rows=len(df), columns=len(df.columns))
+        # Cached with the frame, so later reruns need not hash its cells
+        df.attrs["version"] = hashlib.blake2b(response.content, digest_size=8).hexdigest()
         return df
     except Exception as e:
         st.error(f"Error loading Google Sheet: {e}")
         return None
 
 
-@st.cache_data
+@st.cache_resource
+def get_offload_executor():
+    """Process pool shared by all sessions for heavy computations"""
+    return OffloadExecutor(
+        max_workers=OFFLOAD_WORKERS,
+        max_pending=OFFLOAD_MAX_PENDING,
+        timeout=OFFLOAD_TIMEOUT_SECONDS,
+    )
+
+
+def run_offloaded(func, df, *args, **kwargs):
+    """Run a frame-in stage in the process pool when the frame is large"""
+    if len(df) < OFFLOAD_MIN_ROWS:
+        return func(df, *args, **kwargs)
+    with tracing.span(
+        "offload", kind="offload", task=func.__name__, rows=len(df)
+    ) as span:
+        try:
+            return get_offload_executor().run(func, df, *args, **kwargs)
+        except OffloadError as e:
+            # Pool saturated, frame not shareable, task timed out or a
+            # worker died: run here rather than fail
+            span.set(fallback=type(e).__name__)
+            return func(df, *args, **kwargs)
+
+
+@st.cache_data(max_entries=DATA_CACHE_MAX_ENTRIES, ttl=DATA_CACHE_TTL_SECONDS)
+@profiling.computes
 def clean_and_process_data(df):
     """Clean and calculate metrics for PLE data"""
     if df is None:
         return None
+    return run_offloaded(processing.clean_and_process_data, df)
 
-    df = df.copy()
 
-    # Remove empty rows
-    df = df.dropna(how="all")
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
 
-    # Reset index to avoid duplicate index issues
-    df = df.reset_index(drop=True)
+    The first caller for a key runs the function; callers arriving while it
+    is in flight block until it finishes and share its result (or error).
+    """
 
-    # Fix duplicate column names by adding suffix
-    cols = pd.Series(df.columns)
-    for dup in cols[cols.duplicated()].unique():
-        cols[cols[cols == dup].index.values.tolist()] = [
-            dup + "_" + str(i) if i != 0 else dup for i in range(sum(cols == dup))
-        ]
-    df.columns = cols
-
-    # Identify numeric columns
-    numeric_patterns = [
-        "Div",
-        "Division",
-        "Boys",
-        "Girls",
-        "Total",
-        "Registered",
-        "Pass",
-        "Rate",
-        "M",
-        "F",
-    ]
-    numeric_cols = [
-        col
-        for col in df.columns
-        if any(pattern in str(col) for pattern in numeric_patterns)
-    ]
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = {"done": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn(*args, **kwargs)
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call["done"].set()
+        return call["result"]
+
+
+@st.cache_resource
+def _dataset_state():
+    """Process-wide dataset generation and in-flight load tracking"""
+    return {
+        "lock": threading.Lock(),
+        "flight": SingleFlight(),
+        "generation": 0,
+        "shared_generation": 0,
+        "refreshed_at": float("-inf"),
+    }
 
-    # Convert to numeric
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-    # Detect if we have standard PLE structure
-    has_divisions = any("Div" in str(col) for col in df.columns)
-
-    if has_divisions:
-        # Map column names to standard format
-        col_mapping = {}
-        for col in df.columns:
-            col_str = str(col)
-            # Map division columns
-            if "Div1" in col_str or "Division 1" in col_str:
-                if "_M" in col_str or "Boys" in col_str:
-                    col_mapping[col] = "Division 1 - Boys"
-                elif "_F" in col_str or "Girls" in col_str:
-                    col_mapping[col] = "Division 1 - Girls"
-                elif "Total" in col_str:
-                    col_mapping[col] = "Division 1 - Total"
-            elif "Div2" in col_str or "Division 2" in col_str:
-                if "_M" in col_str or "Boys" in col_str:
-                    col_mapping[col] = "Division 2 - Boys"
-                elif "_F" in col_str or "Girls" in col_str:
-                    col_mapping[col] = "Division 2 - Girls"
-                elif "Total" in col_str:
-                    col_mapping[col] = "Division 2 - Total"
-            elif "Div3" in col_str or "Division 3" in col_str:
-                if "_M" in col_str or "Boys" in col_str:
-                    col_mapping[col] = "Division 3 - Boys"
-                elif "_F" in col_str or "Girls" in col_str:
-                    col_mapping[col] = "Division 3 - Girls"
-                elif "Total" in col_str:
-                    col_mapping[col] = "Division 3 - Total"
-            elif "Div4" in col_str or "Division 4" in col_str:
-                if "_M" in col_str or "Boys" in col_str:
-                    col_mapping[col] = "Division 4 - Boys"
-                elif "_F" in col_str or "Girls" in col_str:
-                    col_mapping[col] = "Division 4 - Girls"
-                elif "Total" in col_str:
-                    col_mapping[col] = "Division 4 - Total"
-            elif "DivU" in col_str or "Division U" in col_str:
-                if "_M" in col_str or "Boys" in col_str:
-                    col_mapping[col] = "Division U - Boys"
-                elif "_F" in col_str or "Girls" in col_str:
-                    col_mapping[col] = "Division U - Girls"
-                elif "Total" in col_str:
-                    col_mapping[col] = "Division U - Total"
-            elif "DivX" in col_str or "Division X" in col_str:
-                if "_M" in col_str or "Boys" in col_str:
-                    col_mapping[col] = "Division X - Boys"
-                elif "_F" in col_str or "Girls" in col_str:
-                    col_mapping[col] = "Division X - Girls"
-                elif "Total" in col_str:
-                    col_mapping[col] = "Division X - Total"
-            # Map district/area columns
-            if "Area" in col_str and "District" not in col_str:
-                col_mapping[col] = "District"
-
-        df = df.rename(columns=col_mapping)
-
-        # After renaming, check for duplicate column names again and fix
-        if df.columns.duplicated().any():
-            cols = pd.Series(df.columns)
-            for dup in cols[cols.duplicated()].unique():
-                cols[cols[cols == dup].index.values.tolist()] = [
-                    dup + "_dup" + str(i) if i != 0 else dup
-                    for i in range(sum(cols == dup))
-                ]
-            df.columns = cols
-
-        # Calculate totals if not present - using .values to avoid index alignment
-        if "Registered - Total" not in df.columns:
-            if (
-                all(f"Division {i} - Total" in df.columns for i in range(1, 5))
-                and "Division U - Total" in df.columns
-            ):
-                total = (
-                    df["Division 1 - Total"].fillna(0).values
-                    + df["Division 2 - Total"].fillna(0).values
-                    + df["Division 3 - Total"].fillna(0).values
-                    + df["Division 4 - Total"].fillna(0).values
-                    + df["Division U - Total"].fillna(0).values
-                )
-                if "Division X - Total" in df.columns:
-                    total = total + df["Division X - Total"].fillna(0).values
-                df["Registered - Total"] = total
-
-        # Calculate boys and girls totals
-        if "Registered - Boys" not in df.columns:
-            boys_cols = [
-                "Division 1 - Boys",
-                "Division 2 - Boys",
-                "Division 3 - Boys",
-                "Division 4 - Boys",
-                "Division U - Boys",
-                "Division X - Boys",
-            ]
-            total_boys = np.zeros(len(df))
-            for col in boys_cols:
-                if col in df.columns:
-                    total_boys = total_boys + df[col].fillna(0).values
-            df["Registered - Boys"] = total_boys
-
-        if "Registered - Girls" not in df.columns:
-            girls_cols = [
-                "Division 1 - Girls",
-                "Division 2 - Girls",
-                "Division 3 - Girls",
-                "Division 4 - Girls",
-                "Division U - Girls",
-                "Division X - Girls",
-            ]
-            total_girls = np.zeros(len(df))
-            for col in girls_cols:
-                if col in df.columns:
-                    total_girls = total_girls + df[col].fillna(0).values
-            df["Registered - Girls"] = total_girls
-
-        # Calculate performance metrics
-        pass_cols = [
-            "Division 1 - Total",
-            "Division 2 - Total",
-            "Division 3 - Total",
-            "Division 4 - Total",
-        ]
-        passed = np.zeros(len(df))
-        for col in pass_cols:
-            if col in df.columns:
-                passed = passed + df[col].fillna(0).values
-        df["Passed_Total"] = passed
-
-        fail_cols = ["Division U - Total", "Division X - Total"]
-        failed = np.zeros(len(df))
-        for col in fail_cols:
-            if col in df.columns:
-                failed = failed + df[col].fillna(0).values
-        df["Failed_Total"] = failed
-
-        # Calculate rates (avoid division by zero)
-        div1_for_rate = (
-            df["Division 1 - Total"].fillna(0).values
-            if "Division 1 - Total" in df.columns
-            else np.zeros(len(df))
-        )
-        div2_for_rate = (
-            df["Division 2 - Total"].fillna(0).values
-            if "Division 2 - Total" in df.columns
-            else np.zeros(len(df))
-        )
-        div3_for_rate = (
-            df["Division 3 - Total"].fillna(0).values
-            if "Division 3 - Total" in df.columns
-            else np.zeros(len(df))
-        )
-
-        df["Pass_Rate"] = np.where(
-            df["Registered - Total"] > 0,
-            (df["Passed_Total"] / df["Registered - Total"] * 100).round(2),
-            0,
-        )
-        df["Excellence_Rate"] = np.where(
-            df["Registered - Total"] > 0,
-            (div1_for_rate / df["Registered - Total"].values * 100).round(2),
-            0,
-        )
-        df["Strong_Performance_Rate"] = np.where(
-            df["Registered - Total"] > 0,
-            (
-                (div1_for_rate + div2_for_rate + div3_for_rate)
-                / df["Registered - Total"].values
-                * 100
-            ).round(2),
-            0,
+
+@st.cache_resource
+def get_shared_dataset():
+    """Handle on the version-stamped dataset shared by all server processes"""
+    return SharedDataset(SHARED_DATASET_DIR)
+
+
+def _fetch_and_clean(sheet_id, sheet_name):
+    with profiling.stage("load_from_google_sheet", cached=True, kind="fetch") as record:
+        raw_data = load_from_google_sheet(sheet_id, sheet_name)
+        record["rows"] = len(raw_data) if raw_data is not None else None
+    with profiling.stage("clean_and_process_data", cached=True, kind="clean") as record:
+        data = clean_and_process_data(raw_data) if raw_data is not None else None
+        record["rows"] = len(data) if data is not None else None
+    version = (
+        source_version("sheet", sheet_id, sheet_name, raw_data.attrs.get("version"))
+        if raw_data is not None
+        else None
+    )
+    return raw_data, data, version
+
+
+def _load_shared(sheet_id, sheet_name, generation):
+    store = get_shared_dataset()
+    state = _dataset_state()
+    meta = store.current()
+    if meta is None or generation > state["shared_generation"]:
+
+        def loader():
+            # Uncached: this process must not hold a private copy of the data
+            raw_data = load_from_google_sheet.__wrapped__(sheet_id, sheet_name)
+            return processing.clean_and_process_data(raw_data)
+
+        meta = store.publish_with(
+            loader, max_age=REFRESH_COOLDOWN_SECONDS if meta is not None else None
         )
+        state["shared_generation"] = generation
+    if meta is None:
+        # Nothing published and the fetch failed
+        return None, None, None
+    data = store.open(meta)
+    return data, data, meta["version"]
 
-        # Gender metrics
-        boys_pass_cols = [
-            "Division 1 - Boys",
-            "Division 2 - Boys",
-            "Division 3 - Boys",
-            "Division 4 - Boys",
-        ]
-        boys_passed = np.zeros(len(df))
-        for col in boys_pass_cols:
-            if col in df.columns:
-                boys_passed = boys_passed + df[col].fillna(0).values
-
-        girls_pass_cols = [
-            "Division 1 - Girls",
-            "Division 2 - Girls",
-            "Division 3 - Girls",
-            "Division 4 - Girls",
-        ]
-        girls_passed = np.zeros(len(df))
-        for col in girls_pass_cols:
-            if col in df.columns:
-                girls_passed = girls_passed + df[col].fillna(0).values
 
-        df["Boys_Pass_Rate"] = np.where(
-            df["Registered - Boys"] > 0,
-            (boys_passed / df["Registered - Boys"].values * 100).round(2),
-            0,
+@st.cache_resource(max_entries=4)
+@profiling.computes
+def open_local_dataset(path, source_mtime):
+    """Memory-mapped frame for a local source (one mapping per file version)"""
+    return load_local(path)
+
+
+def _load_local(path):
+    stat = os.stat(path)
+    data = open_local_dataset(path, stat.st_mtime)
+    return data, data, source_version("local", path, stat.st_mtime_ns, stat.st_size)
+
+
+@st.cache_data(show_spinner=False, max_entries=DATA_CACHE_MAX_ENTRIES)
+@profiling.computes
+def load_manifest_sources(path, manifest_mtime, generation):
+    """Fetch, clean and combine every source listed in a manifest"""
+    try:
+        return ingest_sources(load_manifest(path), workers=get_offload_executor())
+    except Exception as e:
+        st.error(f"Error loading sources: {e}")
+        return None
+
+
+def _load_manifest(path, generation):
+    mtime = os.path.getmtime(path)
+    data = load_manifest_sources(path, mtime, generation)
+    return data, data, source_version("manifest", path, mtime, generation)
+
+
+def get_partition_summary():
+    """Summary of the partitioned local dataset, or None in other modes"""
+    if LOCAL_DATA_PATH and os.path.isdir(LOCAL_DATA_PATH):
+        return read_summary(LOCAL_DATA_PATH)
+    return None
+
+
+@st.cache_resource(max_entries=8)
+@profiling.computes
+def open_partitions(root, years, zones, stamp):
+    """Memory-mapped frame holding only the selected Year (and Zone)
+    partitions.
+
+    ``stamp`` covers just those partitions, so ingesting another year does
+    not invalidate it.
+    """
+    return read_partitioned(root, Year=list(years), Zone=list(zones))
+
+
+def partition_selection(summary, years, zones):
+    """Partition filters for a selection; Zone only when it is a partition
+    column"""
+    selected = {"Year": list(years or ())}
+    if "Zone" in summary["partition_cols"]:
+        selected["Zone"] = list(zones or ())
+    return selected
+
+
+def _load_partitions(root, years, zones):
+    summary = get_partition_summary()
+    selected = partition_selection(summary, years, zones)
+    stamp = partition_stamp(summary, **selected)
+    data = open_partitions(
+        root, tuple(selected["Year"]), tuple(selected.get("Zone", ())), stamp
+    )
+    # Versions of the loaded partitions only: derived caches survive
+    # ingestion of other years and zones
+    return data, data, stamp
+
+
+def load_dataset(sheet_id, sheet_name="Sheet1", years=None, zones=None):
+    """Load and clean the sheet, sharing one in-flight load between sessions.
+
+    Returns ``(raw_data, data, version)``; the version comes from the
+    source's own stamp (file, partition or published version, or a digest
+    of the fetched sheet), never from the frame's cells. ``years`` and
+    ``zones`` limit a partitioned local dataset to those partitions.
+    """
+    state = _dataset_state()
+    generation = state["generation"]
+    key = (sheet_id, sheet_name, generation)
+    if LOCAL_DATA_PATH and os.path.isdir(LOCAL_DATA_PATH):
+        key = (LOCAL_DATA_PATH, tuple(years or ()), tuple(zones or ()))
+        return state["flight"].do(key, _load_partitions, LOCAL_DATA_PATH, years, zones)
+    if LOCAL_DATA_PATH:
+        return state["flight"].do(LOCAL_DATA_PATH, _load_local, LOCAL_DATA_PATH)
+    if SOURCES_MANIFEST:
+        key = (SOURCES_MANIFEST, generation)
+        return state["flight"].do(key, _load_manifest, SOURCES_MANIFEST, generation)
+    if SHARED_DATASET_DIR:
+        return state["flight"].do(key, _load_shared, sheet_id, sheet_name, generation)
+    return state["flight"].do(key, _fetch_and_clean, sheet_id, sheet_name)
+
+
+def request_refresh():
+    """Start a new dataset generation unless one was started very recently"""
+    state = _dataset_state()
+    with state["lock"]:
+        now = time.monotonic()
+        if now - state["refreshed_at"] < REFRESH_COOLDOWN_SECONDS:
+            return False
+        state["refreshed_at"] = now
+        state["generation"] += 1
+    st.cache_data.clear()
+    get_memory_cache().clear()
+    _warmup_registry()["versions"].clear()
+    return True
+
+
+def source_version(*stamp):
+    """Dataset version derived from a source stamp (path, mtime, generation...)"""
+    encoded = json.dumps(stamp, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def get_data_version(df):
+    """Content fingerprint of a frame that has no source stamp (e.g. a view
+    passed straight to a tab). Row order and column names are part of it."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(json.dumps([str(col) for col in df.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def get_default_years(year_options):
+    """Years selected by default in the sidebar"""
+    if 2025 in year_options:
+        return [2025]
+    return year_options[:1] if year_options else []
+
+
+def year_filter(year_options):
+    """Sidebar year picker"""
+    return st.multiselect(
+        "Year:",
+        options=year_options,
+        default=get_default_years(year_options),
+        help="Select years to include in analysis",
+    )
+
+
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES)
+def get_geography_index(data_version, _data):
+    """Observed geography combinations per year, built once per dataset version"""
+    return HierarchyIndex(_data, GEOGRAPHY_LEVELS)
+
+
+def geography_filters(index, selected_years, chosen=None):
+    """Sidebar selectboxes whose options depend on the levels above them;
+    levels in ``chosen`` were already picked and are not shown again"""
+    chosen = chosen or {}
+    selection = []
+    for level in index.levels:
+        if level in chosen:
+            selection.append(chosen[level])
+            continue
+        options = [ALL] + index.options(level, selection, selected_years)
+        selection.append(st.selectbox(GEOGRAPHY_LEVELS[level], options=options))
+    return dict(zip(index.levels, selection))
+
+
+@st.cache_resource
+def get_memory_cache():
+    """Budgeted LRU shared by all sessions for derived results"""
+    return BudgetCache(CACHE_BUDGET_BYTES)
+
+
+# Derived results as named computations with declared inputs. A node's cache
+# key is built from its inputs only, so changing one widget re-executes just
+# the nodes downstream of it. Frames are identified by their version.
+PIPELINE = Graph(
+    get_memory_cache,
+    opaque={
+        "dataset": "data_version",
+        "view": "view_version",
+        "names": "index_version",
+        "ranks": "index_version",
+        "adjusted": "index_version",
+        "projections": "index_version",
+        "quality": "index_version",
+        "peers": "index_version",
+    },
+)
+
+
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES)
+def get_name_index(data_version, _data):
+    """Search index over the SEARCH_COLUMNS names of a dataset version"""
+    columns = [col for col in SEARCH_COLUMNS if col in _data.columns]
+    return NameIndex(pd.unique(_data[columns].to_numpy().ravel()))
+
+
+@st.cache_resource
+def get_district_registry():
+    """Canonical district IDs shared by all sessions and dataset versions"""
+    return DistrictRegistry()
+
+
+def district_panel_options(data, metrics):
+    """RankPanel options giving one row per district as it was before later
+    splits: split-off areas are rolled into their parent, rates weighted by
+    candidates"""
+    if "District" not in data.columns:
+        return None
+    ids = get_district_registry().ids(data["District"])
+    parents = get_district_registry().parents(ids)
+    return {
+        "keys": parents,
+        "totals": [m for m in metrics if m.endswith("- Total")],
+        "weights": data.get("Registered - Total"),
+        "label_rows": ids == parents,
+    }
+
+
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES)
+def get_rank_index(data_version, _data):
+    """Sort orders, ranks and percentiles of RANK_METRICS for a dataset version,
+    plus the District x Year rank panel"""
+    panel = district_panel_options(_data, RANK_METRICS)
+    columns = [col for col in ["Year", "District"] + RANK_METRICS if col in _data.columns]
+    ranked = pd.concat([_data[columns], get_adjusted_rates(data_version, _data)], axis=1)
+    return RankIndex(ranked, RANK_METRICS + ADJUSTED_METRICS, panel=panel)
+
+
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES)
+def get_projections(data_version, _data):
+    """Next-year projections of PROJECTION_METRICS for every district of a
+    dataset version"""
+    panel = district_panel_options(_data, PROJECTION_METRICS)
+    metrics = [m for m in PROJECTION_METRICS if m in _data.columns]
+    if panel is None or "Year" not in _data.columns:
+        return None
+    return Projections(
+        RankPanel(_data, metrics, **panel),
+        metrics,
+        bounds={m: (0, 100) if m.endswith("_Rate") else (0, None) for m in metrics},
+    )
+
+
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES)
+def get_peer_index(data_version, _data):
+    """Nearest-peer trees over district feature vectors, one per year, with
+    the columns the peer comparison shows"""
+    return PeerIndex(
+        _data, columns=["District", "Registered - Total"] + PEER_METRICS + RANK_METRICS
+    )
+
+
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES)
+def get_quality_report(data_version, _data):
+    """Data quality findings for every row of a dataset version; history is
+    scored per district as it was before later splits"""
+    return quality_scan(_data, **(district_panel_options(_data, list(QUALITY_METRICS)) or {}))
+
+
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES)
+def get_adjusted_rates(data_version, _data):
+    """Shrunken rates and intervals for every row of a dataset version"""
+    return adjusted_rates(_data)
+
+
+def history_dataset(data_version, data):
+    """Version and frame the per-version indexes are built from.
+
+    A partitioned dataset loads only the selected years, but projections,
+    rank mobility and history checks need every year: its indexes are
+    built over all partitions, whose row labels match any selection's.
+    """
+    summary = get_partition_summary()
+    if summary is None:
+        return data_version, data
+    stamp = partition_stamp(summary)
+    return stamp, open_partitions(LOCAL_DATA_PATH, (), (), stamp)
+
+
+def index_params(data_version, data):
+    """Pipeline parameters for the per-version search, ranking, projection,
+    data quality and peer indexes"""
+    data_version, data = history_dataset(data_version, data)
+    return {
+        "names": get_name_index(data_version, data),
+        "ranks": get_rank_index(data_version, data),
+        "adjusted": get_adjusted_rates(data_version, data),
+        "projections": get_projections(data_version, data),
+        "quality": get_quality_report(data_version, data),
+        "peers": get_peer_index(data_version, data),
+        "index_version": data_version,
+    }
+
+
+def view_pipeline(data, **params):
+    """Pipeline run over an already filtered frame"""
+    version = get_data_version(data)
+    return PIPELINE.run(
+        view=data, view_version=version, **index_params(version, data), **params
+    )
+
+
+@PIPELINE.node(
+    "view", inputs=["dataset", "years", "sub_region", "zone", "district"], kind="frame"
+)
+@profiling.computes
+def filter_data(data, selected_years, sub_region, zone, district):
+    """Apply the sidebar filters"""
+    if selected_years and "Year" in data.columns:
+        data = data[data["Year"].isin(selected_years)]
+
+    if sub_region != "All":
+        data = data[data["Sub Region"] == sub_region]
+
+    if zone != "All":
+        data = data[data["Zone"] == zone]
+
+    if district != "All":
+        data = data[data["District"] == district]
+
+    return data
+
+
+@PIPELINE.node("kpis", inputs=["view", "gender", "grades"], kind="summary")
+@profiling.computes
+def compute_kpis(data, gender_filter, grade_filter):
+    """Headline metrics shown above the tabs"""
+    if gender_filter == "Boys Only":
+        total_students = data["Registered - Boys"].sum()
+        pass_rate_metric = data["Boys_Pass_Rate"].mean()
+    elif gender_filter == "Girls Only":
+        total_students = data["Registered - Girls"].sum()
+        pass_rate_metric = data["Girls_Pass_Rate"].mean()
+    else:
+        total_students = data["Registered - Total"].sum()
+        pass_rate_metric = data["Pass_Rate"].mean()
+
+    # Calculate grade-specific metrics based on filter
+    grade_totals = 0
+    for grade in grade_filter or []:
+        col_name = f"{grade} - Total"
+        if col_name in data.columns:
+            grade_totals += data[col_name].sum()
+
+    return {
+        "total_students": total_students,
+        "pass_rate": pass_rate_metric,
+        "excellence": data["Excellence_Rate"].mean(),
+        "grade_totals": grade_totals,
+        "gender_gap": (
+            data["Gender_Gap"].mean() if "Gender_Gap" in data.columns else None
+        ),
+    }
+
+
+@PIPELINE.node("adjusted_view", inputs=["view", "adjusted"], kind="frame")
+def add_adjusted_rates(data, adjusted):
+    """Filtered rows with their shrunken rates and intervals"""
+    return pd.concat([data, adjusted.reindex(data.index)], axis=1)
+
+
+@PIPELINE.node(
+    "overview_summary", inputs=["adjusted_view", "gender", "ranks"], kind="summary"
+)
+@profiling.computes
+def compute_overview_summary(data, gender_filter, ranks):
+    """Division totals, top performers and participation for the Overview tab"""
+    if gender_filter == "Boys Only":
+        suffix = "Boys"
+    elif gender_filter == "Girls Only":
+        suffix = "Girls"
+    else:
+        suffix = "Total"
+    division_totals = {
+        f"Div {d}": data.get(f"Division {d} - {suffix}", pd.Series([0])).sum()
+        for d in ["1", "2", "3", "4", "U", "X"]
+    }
+
+    # Ranked by the adjusted rate, so small districts cannot top the
+    # table on noise alone
+    metric = "Adjusted_Pass_Rate" if "Adjusted_Pass_Rate" in data.columns else "Pass_Rate"
+    top_10 = ranks.top(data, metric, 10)[
+        ["District", "Pass_Rate", "Excellence_Rate", "Registered - Total"]
+        + [col for col in data.columns if col.startswith("Adjusted_Pass_Rate")]
+    ].copy()
+
+    registered_total = data["Registered - Total"].sum()
+    if "Division X - Total" in data.columns:
+        did_not_sit = data["Division X - Total"].sum()
+    else:
+        did_not_sit = 0
+
+    return {
+        "division_totals": division_totals,
+        "top_10": top_10,
+        "registered_total": registered_total,
+        "did_not_sit": did_not_sit,
+    }
+
+
+def bootstrap_batches(func, counts, batches, replicates):
+    """Run ``func(counts, *args)`` for each batch, across the process pool
+    when ``replicates`` over all rows reach BOOTSTRAP_POOL_MIN_DRAWS draws"""
+    if len(batches) < 2 or replicates * len(counts) < BOOTSTRAP_POOL_MIN_DRAWS:
+        return [func(counts, *args) for args in batches]
+    with tracing.span(
+        "offload", kind="offload", task=func.__name__, rows=len(counts), batches=len(batches)
+    ) as span:
+        try:
+            return get_offload_executor().map(func, counts, batches)
+        except OffloadError as e:
+            span.set(fallback=type(e).__name__)
+            return [func(counts, *args) for args in batches]
+
+
+@PIPELINE.node("gender_intervals", inputs=["view"], kind="summary")
+@profiling.computes
+def compute_gender_intervals(data):
+    """Intervals of boys', girls' and overall pass rates and the gender gap:
+    bootstrap nationally and per Sub Region, Wilson score per district row"""
+    parts = bootstrap.split(BOOTSTRAP_REPLICATES, OFFLOAD_WORKERS)
+    seeds = bootstrap.seeds(BOOTSTRAP_SEED, OFFLOAD_WORKERS)
+    intervals = {}
+    for name, group_col in [("national", None), ("regional", "Sub Region")]:
+        if group_col is not None and group_col not in data.columns:
+            intervals[name] = None
+            continue
+        counts = bootstrap.gap_counts(data, group_col)
+        if counts.empty:
+            intervals[name] = None
+            continue
+        replicates = bootstrap_batches(
+            bootstrap.group_replicates, counts, list(zip(parts, seeds)), BOOTSTRAP_REPLICATES
         )
-        df["Girls_Pass_Rate"] = np.where(
-            df["Registered - Girls"] > 0,
-            (girls_passed / df["Registered - Girls"].values * 100).round(2),
-            0,
+        intervals[name] = bootstrap.group_intervals(counts, np.concatenate(replicates))
+    intervals["district"] = bootstrap.district_intervals(bootstrap.gap_counts(data))
+    return intervals
+
+
+@PIPELINE.node("quality_view", inputs=["view", "quality"], kind="frame")
+def select_quality_findings(data, quality):
+    """Data quality findings for the filtered rows"""
+    return quality[quality["Row"].isin(data.index)]
+
+
+@PIPELINE.node("yearly_summary", inputs=["view"], kind="frame")
+@profiling.computes
+def compute_yearly_summary(data):
+    """Per-year aggregates for the Trends tab"""
+    return run_offloaded(processing.summarize_by_year, data)
+
+
+@PIPELINE.node("regional_summary", inputs=["view"], kind="frame")
+@profiling.computes
+def compute_regional_summary(data):
+    """Per Sub Region aggregates for the Geography tab"""
+    regional_stats = (
+        data.assign(Failure_Rate=100 - data["Pass_Rate"])
+        .groupby("Sub Region")
+        .agg(
+            {
+                "Registered - Total": "sum",
+                "Pass_Rate": "mean",
+                "Excellence_Rate": "mean",
+                "Failure_Rate": "mean",
+            }
+        )
+        .reset_index()
+    )
+    return regional_stats.sort_values("Pass_Rate", ascending=False)
+
+
+@PIPELINE.node("explorer_matches", inputs=["view", "search", "names"], kind="frame")
+def search_districts(data, search, names):
+    """Data Explorer rows whose name matches ``search`` (typos tolerated)"""
+    columns = [col for col in SEARCH_COLUMNS if col in data.columns]
+    if search and columns:
+        matches = names.search(search)
+        return data[data[columns].isin(matches).any(axis=1)]
+    return data
+
+
+@PIPELINE.node(
+    "explorer_table",
+    inputs=["explorer_matches", "sort_by", "columns", "ranks"],
+    kind="frame",
+)
+def build_explorer_table(data, sort_by, columns, ranks):
+    """Selected columns of the matching rows with their national rank and
+    percentile, sorted (numeric values)"""
+    metric = sort_by if sort_by in ranks.metrics else "Pass_Rate"
+    table = data[list(columns)]
+    if metric in ranks.metrics:
+        table = table.join(ranks.ranks(data, metric).add_prefix("National "))
+    if sort_by in data.columns:
+        table = table.sort_values(sort_by, ascending=False)
+    return table.reset_index(drop=True)
+
+
+@PIPELINE.node("explorer_display", inputs=["explorer_table"], kind="frame")
+def format_explorer_table(table):
+    """Explorer table with rates formatted as percentages"""
+    display_data = table.copy()
+    for col in ["Pass_Rate", "Excellence_Rate", "Boys_Pass_Rate", "Girls_Pass_Rate"]:
+        if col in display_data.columns:
+            display_data[col] = display_data[col].apply(lambda x: f"{x:.1f}%")
+    if "National Percentile" in display_data.columns:
+        display_data["National Percentile"] = display_data["National Percentile"].round(1)
+    return display_data
+
+
+@PIPELINE.node("csv_export", inputs=["explorer_display"], kind="export")
+def build_csv_export(display_data):
+    return display_data.to_csv(index=False)
+
+
+@PIPELINE.node("excel_export", inputs=["explorer_display"], kind="export")
+def build_excel_export(display_data):
+    """Excel bytes for the Data Explorer table"""
+    return run_offloaded(processing.to_excel_bytes, display_data)
+
+
+def expand_warmup_filters(data, warmup_filters):
+    """Turn WARMUP_FILTERS entries into concrete sidebar selections"""
+    year_options = (
+        sorted(data["Year"].dropna().unique().tolist(), reverse=True)
+        if "Year" in data.columns
+        else []
+    )
+    column_for = {"sub_region": "Sub Region", "zone": "Zone", "district": "District"}
+
+    combinations = []
+    for spec in warmup_filters:
+        base = {
+            "years": spec.get("years", get_default_years(year_options)),
+            "sub_region": spec.get("sub_region", "All"),
+            "zone": spec.get("zone", "All"),
+            "district": spec.get("district", "All"),
+            "gender": spec.get("gender", "All"),
+            "grades": spec.get("grades", DEFAULT_GRADES),
+        }
+        expanded = [base]
+        for key, column in column_for.items():
+            if base[key] != "*":
+                continue
+            values = (
+                sorted(data[column].dropna().unique().tolist())
+                if column in data.columns
+                else []
+            )
+            expanded = [dict(combo, **{key: value}) for combo in expanded for value in values]
+        combinations.extend(expanded)
+    return combinations
+
+
+def warm_cache(data, data_version, warmup_filters=None):
+    """Precompute KPI and tab results for common filter combinations"""
+    for combo in expand_warmup_filters(data, warmup_filters or WARMUP_FILTERS):
+        pipeline = PIPELINE.run(
+            dataset=data,
+            data_version=data_version,
+            years=tuple(combo["years"]),
+            sub_region=combo["sub_region"],
+            zone=combo["zone"],
+            district=combo["district"],
+            gender=combo["gender"],
+            grades=tuple(combo["grades"]),
+            **index_params(data_version, data),
         )
-        df["Gender_Gap"] = (df["Boys_Pass_Rate"] - df["Girls_Pass_Rate"]).round(2)
+        filtered = pipeline["view"]
+        if filtered.empty:
+            continue
+        pipeline["kpis"]
+        pipeline["overview_summary"]
+        if "Year" in filtered.columns:
+            pipeline["yearly_summary"]
+        if "Sub Region" in filtered.columns:
+            pipeline["regional_summary"]
+
+
+@st.cache_resource
+def _warmup_registry():
+    """Process-wide record of dataset versions already warmed"""
+    return {"lock": threading.Lock(), "versions": set()}
+
+
+def start_cache_warmup(data, data_version):
+    """Warm the caches for a dataset version once, in a background thread"""
+    registry = _warmup_registry()
+    with registry["lock"]:
+        if data_version in registry["versions"]:
+            return
+        registry["versions"].add(data_version)
+
+    def _run():
+        try:
+            warm_cache(data, data_version)
+        except Exception:
+            # Warm-up is best effort; allow a later rerun to try again
+            with registry["lock"]:
+                registry["versions"].discard(data_version)
+
+    threading.Thread(target=_run, name="ple-cache-warmup", daemon=True).start()
 
-    return df
+
+def profiling_enabled():
+    return PROFILE_ENABLED or st.query_params.get("profile") == "1"
+
+
+@st.cache_resource
+def init_tracing():
+    """Configure the span sink once per process (PLE_TRACE_FILE / PLE_TRACE_EXPORTER)"""
+    return tracing.configure_from_env()
+
+
+@st.cache_resource
+def get_profile_history():
+    """Recent rerun profiles from every session of this process"""
+    return ProfileHistory(PROFILE_HISTORY)
 
 
 def main():
+    show_panel = profiling_enabled()
+    # Tracing reuses the profiler's stage timers
+    profile = (
+        profiling.start(measure_payload=show_panel)
+        if show_panel or tracing.enabled()
+        else None
+    )
+    try:
+        pipeline = show_dashboard()
+    finally:
+        # Also on st.rerun()/st.stop(), so no stale profile stays bound to
+        # the script thread and leaks into the next rerun
+        if profile is not None:
+            profiling.stop()
+    if profile is not None:
+        get_profile_history().add(profile)
+        if show_panel:
+            show_profiler(profile, pipeline)
+
+
+def show_dashboard():
+    """Header, sidebar and tabs of one rerun; returns its pipeline run"""
+    pipeline = None
+
     # Modern Hero Header
     st.markdown(
         """
@@ -665,35 +1323,62 @@ def main():
         )
 
         # Load data
-        with st.spinner("Loading data from Google Sheets..."):
-            raw_data = load_from_google_sheet(GOOGLE_SHEET_ID, "Sheet1")
+        if LOCAL_DATA_PATH:
+            source_label = os.path.basename(LOCAL_DATA_PATH)
+        elif SOURCES_MANIFEST:
+            source_label = os.path.basename(SOURCES_MANIFEST)
+        else:
+            source_label = "Google Sheets"
+        with st.spinner(f"Loading data from {source_label}..."):
+            partition_summary = get_partition_summary()
+            partition_geography = {}
+            if partition_summary is not None:
+                # Partitioned dataset: pick years from the summary, then read
+                # only those partitions
+                st.subheader("🔍 Filters")
+                selected_years = year_filter(
+                    partition_values(partition_summary, "Year")[::-1]
+                )
+                if "Zone" in partition_summary["partition_cols"]:
+                    # Zone partitions are pruned too, so the zone is picked
+                    # from the summary before loading
+                    partition_geography = {
+                        "Zone": st.selectbox(
+                            GEOGRAPHY_LEVELS["Zone"],
+                            options=[ALL]
+                            + partition_values(
+                                partition_summary, "Zone", Year=selected_years
+                            ),
+                        )
+                    }
+                with profiling.stage("load_dataset", kind="load"):
+                    raw_data, data, data_version = load_dataset(
+                        GOOGLE_SHEET_ID,
+                        "Sheet1",
+                        years=selected_years,
+                        zones=[
+                            zone for zone in partition_geography.values() if zone != ALL
+                        ],
+                    )
+            else:
+                with profiling.stage("load_dataset", kind="load"):
+                    raw_data, data, data_version = load_dataset(GOOGLE_SHEET_ID, "Sheet1")
 
             if raw_data is not None:
-                data = clean_and_process_data(raw_data)
-
                 if data is not None:
-                    # Filters
-                    st.subheader("🔍 Filters")
+                    # Precompute common views in the background
+                    start_cache_warmup(data, data_version)
+                    geography = get_geography_index(data_version, data)
 
-                    # Year filter
-                    if "Year" in data.columns:
-                        years = ["All"] + sorted(
-                            data["Year"].dropna().unique().tolist(), reverse=True
-                        )
-                        year_options = [y for y in years if y != "All"]
-                        default_year = (
-                            [2025]
-                            if 2025 in year_options
-                            else (year_options[:1] if year_options else [])
-                        )
-                        selected_years = st.multiselect(
-                            "Year:",
-                            options=year_options,
-                            default=default_year,
-                            help="Select years to include in analysis",
-                        )
-                    else:
-                        selected_years = None
+                    if partition_summary is None:
+                        # Filters
+                        st.subheader("🔍 Filters")
+
+                        # Year filter
+                        if "Year" in data.columns:
+                            selected_years = year_filter(geography.years)
+                        else:
+                            selected_years = None
 
                     # Gender filter
                     gender_filter = st.radio(
@@ -702,59 +1387,20 @@ def main():
                         horizontal=True,
                     )
 
-                    # Sub Region filter
-                    if "Sub Region" in data.columns:
-                        sub_regions = ["All"] + sorted(
-                            data["Sub Region"].dropna().unique().tolist()
-                        )
-                        selected_sub_region = st.selectbox(
-                            "Sub Region:",
-                            options=sub_regions,
-                        )
-                    else:
-                        selected_sub_region = "All"
-
-                    # Zonal Office filter
-                    if "Zone" in data.columns:
-                        zones = ["All"] + sorted(
-                            data["Zone"].dropna().unique().tolist()
-                        )
-                        selected_zone = st.selectbox(
-                            "Zonal Office:",
-                            options=zones,
-                        )
-                    else:
-                        selected_zone = "All"
-
-                    # District filter
-                    if "District" in data.columns:
-                        districts = ["All"] + sorted(
-                            data["District"].dropna().unique().tolist()
-                        )
-                        selected_district = st.selectbox(
-                            "District:",
-                            options=districts,
-                        )
-                    else:
-                        selected_district = "All"
+                    # Zone, Sub Region and District filters: each level
+                    # only offers values found under the levels above it
+                    selected_geography = geography_filters(
+                        geography, selected_years, partition_geography
+                    )
+                    selected_zone = selected_geography.get("Zone", ALL)
+                    selected_sub_region = selected_geography.get("Sub Region", ALL)
+                    selected_district = selected_geography.get("District", ALL)
 
                     # Grade filter
                     grade_filter = st.multiselect(
                         "Grade/Division:",
-                        options=[
-                            "Division 1",
-                            "Division 2",
-                            "Division 3",
-                            "Division 4",
-                            "Division U",
-                            "Division X",
-                        ],
-                        default=[
-                            "Division 1",
-                            "Division 2",
-                            "Division 3",
-                            "Division 4",
-                        ],
+                        options=DIVISION_OPTIONS,
+                        default=DEFAULT_GRADES,
                         help="Select divisions to include in analysis",
                     )
 
@@ -762,7 +1408,7 @@ def main():
 
                     # Refresh button
                     if st.button("🔄 Refresh Data", type="primary"):
-                        st.cache_data.clear()
+                        request_refresh()
                         st.rerun()
 
                     st.markdown("---")
@@ -778,7 +1424,7 @@ def main():
                                 <div>
                                     <div style='font-weight: 600; color: #065f46;'>Data Loaded Successfully</div>
                                     <div style='font-size: 0.9em; color: #047857; margin-top: 4px;'>
-                                        {len(raw_data):,} records from Google Sheets
+                                        {len(raw_data):,} records from {source_label}
                                     </div>
                                 </div>
                             </div>
@@ -787,21 +1433,44 @@ def main():
                         unsafe_allow_html=True,
                     )
 
-                    # Store original data for gender calculations
-                    original_data = data.copy()
+                    # The loaded frame is shared by every session (memory-mapped
+                    # or cached) and never written to, so it is used as is
+                    original_data = data
+                    total_records = (
+                        partition_summary["rows"]
+                        if partition_summary is not None
+                        else len(original_data)
+                    )
 
                     # Apply filters
-                    if selected_years and "Year" in data.columns:
-                        data = data[data["Year"].isin(selected_years)]
-
-                    if selected_sub_region != "All":
-                        data = data[data["Sub Region"] == selected_sub_region]
-
-                    if selected_zone != "All":
-                        data = data[data["Zone"] == selected_zone]
-
-                    if selected_district != "All":
-                        data = data[data["District"] == selected_district]
+                    pipeline = PIPELINE.run(
+                        dataset=original_data,
+                        data_version=data_version,
+                        years=tuple(selected_years or ()),
+                        sub_region=selected_sub_region,
+                        zone=selected_zone,
+                        district=selected_district,
+                        gender=gender_filter,
+                        grades=tuple(grade_filter),
+                        **index_params(data_version, original_data),
+                    )
+                    if not geography.exists(selected_geography.values(), selected_years):
+                        # Impossible combination (e.g. a year without that
+                        # district): skip the filter chain entirely
+                        st.warning("No records match the selected filters")
+                        data = original_data.iloc[0:0]
+                    else:
+                        with profiling.stage(
+                            "filter_data",
+                            len(original_data),
+                            cached=True,
+                            kind="filter",
+                            years=pipeline.params["years"],
+                            sub_region=selected_sub_region,
+                            zone=selected_zone,
+                            district=selected_district,
+                        ):
+                            data = pipeline["view"]
 
                     # Modern sidebar metrics with icons
                     st.markdown(
@@ -817,7 +1486,7 @@ def main():
                                         box-shadow: 0 4px 12px rgba(139, 92, 246, 0.2);'>
                                 <div style='font-size: 1.8em; margin-bottom: 8px;'>📁</div>
                                 <div style='font-size: 0.8em; color: #5b21b6; font-weight: 600; text-transform: uppercase;'>Total</div>
-                                <div style='font-size: 1.8em; font-weight: 700; color: #6d28d9; margin-top: 4px;'>{len(original_data):,}</div>
+                                <div style='font-size: 1.8em; font-weight: 700; color: #6d28d9; margin-top: 4px;'>{total_records:,}</div>
                             </div>
                         """,
                             unsafe_allow_html=True,
@@ -859,26 +1528,19 @@ def main():
 
     # Main content
     if data is not None and not data.empty:
-        # Apply gender filter to metrics
-        if gender_filter == "Boys Only":
-            total_students = data["Registered - Boys"].sum()
-            pass_rate_metric = data["Boys_Pass_Rate"].mean()
-        elif gender_filter == "Girls Only":
-            total_students = data["Registered - Girls"].sum()
-            pass_rate_metric = data["Girls_Pass_Rate"].mean()
-        else:
-            total_students = data["Registered - Total"].sum()
-            pass_rate_metric = data["Pass_Rate"].mean()
-
-        # Calculate grade-specific metrics based on filter
-        if grade_filter:
-            grade_totals = 0
-            for grade in grade_filter:
-                col_name = f"{grade} - Total"
-                if col_name in data.columns:
-                    grade_totals += data[col_name].sum()
-        else:
-            grade_totals = 0
+        # Apply gender and grade filters to metrics
+        with profiling.stage(
+            "compute_kpis",
+            len(data),
+            cached=True,
+            kind="aggregate",
+            gender=gender_filter,
+            grades=grade_filter,
+        ):
+            kpis = pipeline["kpis"]
+        total_students = kpis["total_students"]
+        pass_rate_metric = kpis["pass_rate"]
+        grade_totals = kpis["grade_totals"]
 
         # Key metrics with enhanced styling
         st.markdown("<div style='margin: 30px 0;'></div>", unsafe_allow_html=True)
@@ -913,7 +1575,7 @@ def main():
             )
 
         with col3:
-            avg_excellence = data["Excellence_Rate"].mean()
+            avg_excellence = kpis["excellence"]
             st.markdown(
                 """
                 <div style='text-align: center; padding: 20px; background: linear-gradient(135deg, #ffd93d 0%, #ffb627 100%);
@@ -942,8 +1604,8 @@ def main():
             )
 
         with col5:
-            if "Gender_Gap" in data.columns:
-                avg_gender_gap = data["Gender_Gap"].mean()
+            if kpis["gender_gap"] is not None:
+                avg_gender_gap = kpis["gender_gap"]
                 st.markdown(
                     """
                     <div style='text-align: center; padding: 20px; background: linear-gradient(135deg, #a29bfe 0%, #6c5ce7 100%);
@@ -960,7 +1622,7 @@ def main():
         st.markdown("---")
 
         # Tabs
-        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
+        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(
             [
                 "📊 Overview",
                 "🎯 Performance",
@@ -968,26 +1630,30 @@ def main():
                 "🏆 Rankings",
                 "📈 Trends",
                 "🗺️ Geography",
+                "🧪 Data Quality",
             ]
         )
 
-        with tab1:
-            show_overview(data, gender_filter, grade_filter)
+        with tab1, profiling.stage("show_overview", len(data), kind="render"):
+            show_overview(data, gender_filter, grade_filter, pipeline)
 
-        with tab2:
-            show_performance(data, gender_filter)
+        with tab2, profiling.stage("show_performance", len(data), kind="render"):
+            show_performance(data, gender_filter, pipeline)
 
-        with tab3:
-            show_gender_analysis(data, grade_filter)
+        with tab3, profiling.stage("show_gender_analysis", len(data), kind="render"):
+            show_gender_analysis(data, grade_filter, pipeline)
 
-        with tab4:
-            show_rankings(data, gender_filter)
+        with tab4, profiling.stage("show_rankings", len(data), kind="render"):
+            show_rankings(data, gender_filter, pipeline)
 
-        with tab5:
-            show_trends(data, gender_filter, grade_filter)
+        with tab5, profiling.stage("show_trends", len(data), kind="render"):
+            show_trends(data, gender_filter, grade_filter, pipeline)
 
-        with tab6:
-            show_geographical_analysis(data)
+        with tab6, profiling.stage("show_geographical_analysis", len(data), kind="render"):
+            show_geographical_analysis(data, pipeline)
+
+        with tab7, profiling.stage("show_data_quality", len(data), kind="render"):
+            show_data_quality(data, pipeline)
 
     else:
         st.markdown(
@@ -1020,9 +1686,23 @@ def main():
             unsafe_allow_html=True,
         )
 
+    return pipeline
+
 
-def show_overview(data, gender_filter="All", grade_filter=None):
+def show_chart(fig):
+    """Render a Plotly figure (timed and sized when profiling)"""
+    with profiling.chart(fig):
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def show_overview(data, gender_filter="All", grade_filter=None, pipeline=None):
     """Overview tab"""
+    pipeline = pipeline or view_pipeline(data, gender=gender_filter)
+    with profiling.stage(
+        "compute_overview_summary", len(data), cached=True, kind="aggregate"
+    ):
+        summary = pipeline["overview_summary"]
+
     st.markdown(
         "<h2 style='color: #5f6368; margin-top: 20px;'>📊 Performance Overview</h2>",
         unsafe_allow_html=True,
@@ -1032,33 +1712,7 @@ def show_overview(data, gender_filter="All", grade_filter=None):
 
     with col1:
         # Division distribution based on gender filter
-        if gender_filter == "Boys Only":
-            division_totals = {
-                "Div 1": data["Division 1 - Boys"].sum(),
-                "Div 2": data["Division 2 - Boys"].sum(),
-                "Div 3": data["Division 3 - Boys"].sum(),
-                "Div 4": data["Division 4 - Boys"].sum(),
-                "Div U": data["Division U - Boys"].sum(),
-                "Div X": data.get("Division X - Boys", pd.Series([0])).sum(),
-            }
-        elif gender_filter == "Girls Only":
-            division_totals = {
-                "Div 1": data["Division 1 - Girls"].sum(),
-                "Div 2": data["Division 2 - Girls"].sum(),
-                "Div 3": data["Division 3 - Girls"].sum(),
-                "Div 4": data["Division 4 - Girls"].sum(),
-                "Div U": data["Division U - Girls"].sum(),
-                "Div X": data.get("Division X - Girls", pd.Series([0])).sum(),
-            }
-        else:
-            division_totals = {
-                "Div 1": data["Division 1 - Total"].sum(),
-                "Div 2": data["Division 2 - Total"].sum(),
-                "Div 3": data["Division 3 - Total"].sum(),
-                "Div 4": data["Division 4 - Total"].sum(),
-                "Div U": data["Division U - Total"].sum(),
-                "Div X": data["Division X - Total"].sum(),
-            }
+        division_totals = summary["division_totals"]
 
         fig = go.Figure(
             data=[
@@ -1094,7 +1748,7 @@ def show_overview(data, gender_filter="All", grade_filter=None):
                 font=dict(size=13, color="#5f6368"),
             ),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
 
     with col2:
         # Pass rate distribution
@@ -1125,16 +1779,28 @@ def show_overview(data, gender_filter="All", grade_filter=None):
                 tickfont=dict(size=12, color="#2d3436"),
             ),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
 
     # Top performers table
     st.markdown(
         "<h2 style='color: #5f6368; margin-top: 30px;'>🏆 Top 10 Performers</h2>",
         unsafe_allow_html=True,
     )
-    top_10 = data.nlargest(10, "Pass_Rate")[
-        ["District", "Pass_Rate", "Excellence_Rate", "Registered - Total"]
-    ].copy()
+    top_10 = summary["top_10"].copy()
+    if "Adjusted_Pass_Rate" in top_10.columns:
+        st.caption(
+            "Ranked by adjusted pass rate: each district's rate is pulled towards "
+            "the national rate in proportion to how few candidates it has "
+            "(95% interval in brackets)"
+        )
+        top_10["Adjusted_Pass_Rate"] = [
+            f"{rate:.1f}% ({low:.1f}–{high:.1f})"
+            for rate, low, high in zip(
+                top_10.pop("Adjusted_Pass_Rate"),
+                top_10.pop("Adjusted_Pass_Rate_Low"),
+                top_10.pop("Adjusted_Pass_Rate_High"),
+            )
+        ]
     top_10["Pass_Rate"] = top_10["Pass_Rate"].apply(lambda x: f"{x:.1f}%")
     top_10["Excellence_Rate"] = top_10["Excellence_Rate"].apply(lambda x: f"{x:.1f}%")
     st.dataframe(top_10.reset_index(drop=True), use_container_width=True)
@@ -1151,12 +1817,8 @@ def show_overview(data, gender_filter="All", grade_filter=None):
     )
 
     # Calculate sat vs not sat
-    registered_total = data["Registered - Total"].sum()
-
-    if "Division X - Total" in data.columns:
-        did_not_sit = data["Division X - Total"].sum()
-    else:
-        did_not_sit = 0
+    registered_total = summary["registered_total"]
+    did_not_sit = summary["did_not_sit"]
 
     sat_for_exam = registered_total - did_not_sit
     participation_rate = (
@@ -1246,7 +1908,7 @@ def show_overview(data, gender_filter="All", grade_filter=None):
             font=dict(color="#2d3436", size=13),
             title_font=dict(size=20, color="#5f6368"),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
 
     with col2:
         # Bar chart by district (top 10 absentees)
@@ -1260,7 +1922,9 @@ def show_overview(data, gender_filter="All", grade_filter=None):
                 * 100
             ).fillna(0)
 
-            top_absentee = absentee_by_district.nlargest(10, "Division X - Total")
+            top_absentee = pipeline["ranks"].top(
+                absentee_by_district, "Division X - Total", 10
+            )
 
             fig = px.bar(
                 top_absentee,
@@ -1281,7 +1945,7 @@ def show_overview(data, gender_filter="All", grade_filter=None):
                 title_font=dict(size=20, color="#5f6368"),
                 xaxis_tickangle=-45,
             )
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig)
 
     # Gender breakdown
     if "Division X - Boys" in data.columns and "Division X - Girls" in data.columns:
@@ -1336,6 +2000,10 @@ def show_overview(data, gender_filter="All", grade_filter=None):
             "",
             placeholder="Type to search by district name...",
         )
+        if search and pipeline["names"].search(search, limit=1, fuzzy=False) == []:
+            suggestions = pipeline["names"].search(search, limit=3)
+            if suggestions:
+                st.caption(f"No exact match; showing similar names: {', '.join(suggestions)}")
 
     with col2:
         sort_by = st.selectbox(
@@ -1344,15 +2012,8 @@ def show_overview(data, gender_filter="All", grade_filter=None):
             index=0,
         )
 
-    # Filter data based on search
-    filtered_data = data.copy()
-    if search and "District" in filtered_data.columns:
-        filtered_data = filtered_data[
-            filtered_data["District"].str.contains(search, case=False, na=False)
-        ]
-
     # Column selector
-    available_cols = filtered_data.columns.tolist()
+    available_cols = data.columns.tolist()
     default_cols = [
         col
         for col in ["District", "Pass_Rate", "Excellence_Rate", "Registered - Total"]
@@ -1365,44 +2026,22 @@ def show_overview(data, gender_filter="All", grade_filter=None):
         default=default_cols[: min(4, len(default_cols))],
     )
 
+    pipeline.update(search=search, sort_by=sort_by, columns=tuple(cols_to_show))
     if cols_to_show:
-        # Sort and display data
-        if sort_by in filtered_data.columns:
-            display_data = (
-                filtered_data[cols_to_show]
-                .sort_values(sort_by, ascending=False)
-                .reset_index(drop=True)
-            )
-        else:
-            display_data = filtered_data[cols_to_show].reset_index(drop=True)
+        # Matching rows, sorted, with numeric values for the stats below
+        stats_data = pipeline["explorer_table"]
+        display_data = pipeline["explorer_display"]
 
         # Show record count
         st.markdown(
             f"<p style='color: #80868b;'>Showing {len(display_data):,} of {len(data):,} records</p>",
             unsafe_allow_html=True,
         )
-
-        # Calculate stats before formatting (need numeric values)
-        stats_data = display_data.copy()
-
-        # Format percentage columns for display
-        display_data = display_data.copy()
-        if "Pass_Rate" in display_data.columns:
-            display_data["Pass_Rate"] = display_data["Pass_Rate"].apply(
-                lambda x: f"{x:.1f}%"
-            )
-        if "Excellence_Rate" in display_data.columns:
-            display_data["Excellence_Rate"] = display_data["Excellence_Rate"].apply(
-                lambda x: f"{x:.1f}%"
-            )
-        if "Boys_Pass_Rate" in display_data.columns:
-            display_data["Boys_Pass_Rate"] = display_data["Boys_Pass_Rate"].apply(
-                lambda x: f"{x:.1f}%"
-            )
-        if "Girls_Pass_Rate" in display_data.columns:
-            display_data["Girls_Pass_Rate"] = display_data["Girls_Pass_Rate"].apply(
-                lambda x: f"{x:.1f}%"
-            )
+        rank_metric = sort_by if sort_by in pipeline["ranks"].metrics else "Pass_Rate"
+        st.caption(
+            f"National rank and percentile by {rank_metric.replace('_', ' ')} "
+            "among all districts in the same year"
+        )
 
         # Display dataframe with custom styling
         st.dataframe(
@@ -1416,7 +2055,7 @@ def show_overview(data, gender_filter="All", grade_filter=None):
         col1, col2, col3 = st.columns([1, 1, 2])
 
         with col1:
-            csv = display_data.to_csv(index=False)
+            csv = pipeline["csv_export"]
             st.download_button(
                 label="📥 Download as CSV",
                 data=csv,
@@ -1426,12 +2065,7 @@ def show_overview(data, gender_filter="All", grade_filter=None):
 
         with col2:
             try:
-                from io import BytesIO
-
-                excel_buffer = BytesIO()
-                with pd.ExcelWriter(excel_buffer, engine="openpyxl") as writer:
-                    display_data.to_excel(writer, index=False, sheet_name="PLE Data")
-                excel_data = excel_buffer.getvalue()
+                excel_data = pipeline["excel_export"]
 
                 st.download_button(
                     label="📊 Download as Excel",
@@ -1441,6 +2075,8 @@ def show_overview(data, gender_filter="All", grade_filter=None):
                 )
             except ImportError:
                 st.info("📊 Excel export requires openpyxl. Use CSV export instead.")
+            except TimeoutError:
+                st.warning("📊 Excel export timed out. Use CSV export instead.")
 
         # Quick stats about filtered data (use numeric stats_data)
         if len(stats_data) > 0:
@@ -1476,8 +2112,9 @@ def show_overview(data, gender_filter="All", grade_filter=None):
         st.info("👆 Please select at least one column to display")
 
 
-def show_performance(data, gender_filter="All"):
+def show_performance(data, gender_filter="All", pipeline=None):
     """Performance tab"""
+    pipeline = pipeline or view_pipeline(data)
     st.markdown(
         f"<h2 style='color: #5f6368; margin-top: 20px;'>🎯 Performance Analysis ({gender_filter})</h2>",
         unsafe_allow_html=True,
@@ -1509,7 +2146,7 @@ def show_performance(data, gender_filter="All"):
                 tickfont=dict(size=12, color="#2d3436"),
             ),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
 
     with col2:
         # Scatter: Division 1 vs Pass Rate
@@ -1543,16 +2180,16 @@ def show_performance(data, gender_filter="All"):
                 tickfont=dict(size=12, color="#2d3436"),
             ),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
 
-    # Performance categories
-    data["Category"] = pd.cut(
+    # Performance categories (kept out of ``data``, which is a cached view)
+    categories = pd.cut(
         data["Pass_Rate"],
         bins=[0, 65, 75, 85, 95, 100],
         labels=["Needs Improvement", "Average", "Good", "Very Good", "Excellent"],
     )
 
-    category_counts = data["Category"].value_counts().sort_index()
+    category_counts = categories.value_counts().sort_index()
 
     fig = px.bar(
         x=category_counts.index,
@@ -1578,11 +2215,13 @@ def show_performance(data, gender_filter="All"):
         xaxis=dict(showgrid=False),
         yaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
     )
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
 
 
-def show_gender_analysis(data, grade_filter=None):
+def show_gender_analysis(data, grade_filter=None, pipeline=None):
     """Gender analysis tab"""
+    pipeline = pipeline or view_pipeline(data)
+    intervals = pipeline["gender_intervals"]
     grade_text = f" - {', '.join(grade_filter)}" if grade_filter else ""
     st.markdown(
         f"<h2 style='color: #5f6368; margin-top: 20px;'>👥 Gender Performance Analysis{grade_text}</h2>",
@@ -1630,7 +2269,7 @@ def show_gender_analysis(data, grade_filter=None):
                 font=dict(size=13, color="#5f6368"),
             ),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
 
     with col2:
         # Gender gap distribution
@@ -1659,19 +2298,35 @@ def show_gender_analysis(data, grade_filter=None):
             xaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
             yaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
 
-    # Average pass rates by gender
-    avg_boys = data["Boys_Pass_Rate"].mean()
-    avg_girls = data["Girls_Pass_Rate"].mean()
+    # Pass rates by gender over all candidates in view, with bootstrap intervals
+    national = intervals["national"]
+    if national is None:
+        st.info("No candidates in the current selection")
+        return
+    national = national.iloc[0]
+    rates = [national["Boys_Pass_Rate"], national["Girls_Pass_Rate"]]
 
     fig = go.Figure(
         data=[
             go.Bar(
                 x=["Boys", "Girls"],
-                y=[avg_boys, avg_girls],
+                y=rates,
+                error_y=dict(
+                    type="data",
+                    array=[
+                        national["Boys_Pass_Rate_High"] - rates[0],
+                        national["Girls_Pass_Rate_High"] - rates[1],
+                    ],
+                    arrayminus=[
+                        rates[0] - national["Boys_Pass_Rate_Low"],
+                        rates[1] - national["Girls_Pass_Rate_Low"],
+                    ],
+                    color="#5f6368",
+                ),
                 marker_color=[COLORS["boys"], COLORS["girls"]],
-                text=[f"{avg_boys:.1f}%", f"{avg_girls:.1f}%"],
+                text=[f"{rates[0]:.1f}%", f"{rates[1]:.1f}%"],
                 textposition="outside",
                 textfont=dict(size=16, color="#2d3436", family="Arial", weight="bold"),
                 hovertemplate="<b>%{x}</b><br>Pass Rate: %{y:.1f}%<extra></extra>",
@@ -1680,10 +2335,10 @@ def show_gender_analysis(data, grade_filter=None):
     )
     fig.update_layout(
         title=dict(
-            text="<b>Average Pass Rate by Gender</b>",
+            text="<b>Pooled Pass Rate by Gender</b>",
             font=dict(size=18, color="#5f6368"),
         ),
-        yaxis_title="Pass Rate (%)",
+        yaxis_title="Pooled Pass Rate (%)",
         height=400,
         showlegend=False,
         plot_bgcolor="white",
@@ -1692,11 +2347,112 @@ def show_gender_analysis(data, grade_filter=None):
         yaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
         xaxis=dict(showgrid=False),
     )
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
+
+    col1, col2 = st.columns(2)
+    col1.metric(
+        "Pooled Gender Gap (boys - girls)",
+        f"{national['Gender_Gap']:.2f} pts",
+        help=f"95% interval {national['Gender_Gap_Low']:.2f} to "
+        f"{national['Gender_Gap_High']:.2f} points",
+    )
+    col2.metric(
+        "Pooled Pass Rate",
+        f"{national['Pass_Rate']:.1f}%",
+        help=f"95% interval {national['Pass_Rate_Low']:.1f}% to "
+        f"{national['Pass_Rate_High']:.1f}%",
+    )
+    st.caption(
+        "Pooled rates count all candidates in the selection together, so "
+        "large districts weigh more than in the headline figures above the "
+        "tabs, which average the district rates. Bars show 95% bootstrap "
+        f"intervals from {BOOTSTRAP_REPLICATES:,} resamples of districts "
+        "(within each sub region for the regional chart); district intervals "
+        "are Wilson score intervals from each district's own counts"
+    )
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        regional = intervals["regional"]
+        if regional is None or regional.empty:
+            st.info("No sub region data for the selected years")
+        else:
+            regional = regional.rename_axis("Sub Region").reset_index()
+            regional = regional.sort_values("Gender_Gap")
+            fig = px.bar(
+                regional,
+                y="Sub Region",
+                x="Gender_Gap",
+                orientation="h",
+                error_x=regional["Gender_Gap_High"] - regional["Gender_Gap"],
+                error_x_minus=regional["Gender_Gap"] - regional["Gender_Gap_Low"],
+                title="<b>Gender Gap by Sub Region</b>",
+                labels={"Gender_Gap": "Gender Gap (% points)"},
+                color_discrete_sequence=[COLORS["primary"]],
+            )
+            fig.add_vline(x=0, line_dash="dash", line_color="#5f6368", line_width=2)
+            fig.update_layout(
+                height=500,
+                showlegend=False,
+                plot_bgcolor="white",
+                paper_bgcolor="white",
+                font=dict(color="#5f6368", size=12),
+                title_font=dict(size=18, color="#5f6368"),
+                xaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
+                yaxis=dict(showgrid=False),
+            )
+            show_chart(fig)
+
+    with col2:
+        # Widest district gaps whose interval excludes zero
+        districts = intervals["district"].dropna(subset=["Gender_Gap_Low"])
+        clear = districts[
+            (districts["Gender_Gap_Low"] > 0) | (districts["Gender_Gap_High"] < 0)
+        ]
+        if clear.empty:
+            st.info("No district gap is distinguishable from zero")
+        else:
+            widest = clear.loc[clear["Gender_Gap"].abs().nlargest(15).index].copy()
+            if widest["Year"].nunique() > 1:
+                widest["District"] = (
+                    widest["District"] + " (" + widest["Year"].astype(str) + ")"
+                )
+            widest = widest.sort_values("Gender_Gap")
+            fig = px.bar(
+                widest,
+                y="District",
+                x="Gender_Gap",
+                orientation="h",
+                error_x=widest["Gender_Gap_High"] - widest["Gender_Gap"],
+                error_x_minus=widest["Gender_Gap"] - widest["Gender_Gap_Low"],
+                title=(
+                    f"<b>Widest District Gaps ({len(clear)} of {len(districts)} "
+                    "clear of zero)</b>"
+                ),
+                labels={"Gender_Gap": "Gender Gap (% points)"},
+                color="Gender_Gap",
+                color_continuous_scale=[[0, COLORS["girls"]], [1, COLORS["boys"]]],
+                color_continuous_midpoint=0,
+            )
+            fig.add_vline(x=0, line_dash="dash", line_color="#5f6368", line_width=2)
+            fig.update_layout(
+                height=500,
+                showlegend=False,
+                plot_bgcolor="white",
+                paper_bgcolor="white",
+                font=dict(color="#5f6368", size=12),
+                title_font=dict(size=18, color="#5f6368"),
+                xaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
+                yaxis=dict(showgrid=False),
+            )
+            show_chart(fig)
 
 
-def show_rankings(data, gender_filter="All"):
+def show_rankings(data, gender_filter="All", pipeline=None):
     """Rankings tab"""
+    pipeline = pipeline or view_pipeline(data)
+    ranks = pipeline["ranks"]
     st.markdown(
         f"<h2 style='color: #5f6368; margin-top: 20px;'>🏆 District Rankings ({gender_filter})</h2>",
         unsafe_allow_html=True,
@@ -1709,21 +2465,37 @@ def show_rankings(data, gender_filter="All"):
             "Excellence_Rate",
             "Division 1 - Total",
             "Strong_Performance_Rate",
-        ],
+        ]
+        + [m for m in ADJUSTED_METRICS if m in ranks.metrics],
         format_func=lambda x: x.replace("_", " ").title(),
     )
+    columns = ["District", metric]
+    error_bars = {}
+    if metric in ADJUSTED_METRICS:
+        st.caption(
+            "Adjusted rates shrink small districts towards the national rate for "
+            "the year (empirical Bayes); bars show 95% intervals"
+        )
+        data = pipeline["adjusted_view"]
+        columns += [f"{metric}_Low", f"{metric}_High"]
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown("### 🥇 Top 15")
-        top_15 = data.nlargest(15, metric)[["District", metric]]
+        top_15 = ranks.top(data, metric, 15)[columns].iloc[::-1]
+        if metric in ADJUSTED_METRICS:
+            error_bars = {
+                "error_x": top_15[f"{metric}_High"] - top_15[metric],
+                "error_x_minus": top_15[metric] - top_15[f"{metric}_Low"],
+            }
 
         fig = px.bar(
-            top_15.sort_values(metric),
+            top_15,
             y="District",
             x=metric,
             orientation="h",
+            **error_bars,
             title=f"<b>Top 15 by {metric.replace('_', ' ').title()}</b>",
             color=metric,
             color_continuous_scale=[[0, COLORS["success"]], [1, COLORS["primary"]]],
@@ -1738,17 +2510,23 @@ def show_rankings(data, gender_filter="All"):
             xaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
             yaxis=dict(showgrid=False),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
 
     with col2:
         st.markdown("### 🔻 Bottom 15")
-        bottom_15 = data.nsmallest(15, metric)[["District", metric]]
+        bottom_15 = ranks.bottom(data, metric, 15)[columns].iloc[::-1]
+        if metric in ADJUSTED_METRICS:
+            error_bars = {
+                "error_x": bottom_15[f"{metric}_High"] - bottom_15[metric],
+                "error_x_minus": bottom_15[metric] - bottom_15[f"{metric}_Low"],
+            }
 
         fig = px.bar(
-            bottom_15.sort_values(metric, ascending=False),
+            bottom_15,
             y="District",
             x=metric,
             orientation="h",
+            **error_bars,
             title=f"<b>Bottom 15 by {metric.replace('_', ' ').title()}</b>",
             color=metric,
             color_continuous_scale=[[0, COLORS["danger"]], [1, COLORS["warning"]]],
@@ -1763,10 +2541,101 @@ def show_rankings(data, gender_filter="All"):
             xaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
             yaxis=dict(showgrid=False),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
+
+    show_peer_comparison(data, pipeline["peers"], metric)
+
+
+def show_peer_comparison(data, peers, metric="Pass_Rate"):
+    """Where a district sits among the districts most similar to it"""
+    st.markdown(
+        "<h2 style='color: #5f6368; margin-top: 30px;'>🤝 Peer Comparison</h2>",
+        unsafe_allow_html=True,
+    )
+    if "District" not in data.columns or "Year" not in data.columns or data.empty:
+        st.info("Peer comparison needs district and year data")
+        return
+    st.markdown(
+        "<p style='color: #80868b;'>Peers are the districts nationally most similar "
+        "in the same year by size, division profile, girls' share and absenteeism "
+        "(Division X)</p>",
+        unsafe_allow_html=True,
+    )
 
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        years = sorted(data["Year"].dropna().unique().tolist(), reverse=True)
+        year = st.selectbox("Peer Year:", years, key="peer_year")
+    with col2:
+        in_year = data[data["Year"] == year]
+        district = st.selectbox(
+            "Compare District:", sorted(in_year["District"].unique()), key="peer_district"
+        )
+    with col3:
+        k = st.slider("Peers:", 3, PEER_MAX, PEER_COUNT, key="peer_count")
+
+    row = in_year.index[in_year["District"] == district][0]
+    metrics = [m for m in PEER_METRICS if m in data.columns]
+    # Adjusted rates are not part of the dataset the peers are drawn from
+    chart_metric = metric if metric in RANK_METRICS else "Pass_Rate"
+    columns = ["District", "Registered - Total"] + metrics
+    group = peers.compare(
+        row, k, columns + ([chart_metric] if chart_metric not in columns else [])
+    )
+    if len(group) < 2:
+        st.info(f"No peers for {district} in {year}: some of its figures are missing")
+        return
 
-def show_trends(data, gender_filter="All", grade_filter=None):
+    own = group.iloc[0]
+    others = group.iloc[1:]
+    columns = st.columns(len(metrics))
+    for col, name in zip(columns, metrics):
+        rank = int((others[name] > own[name]).sum()) + 1
+        median = others[name].median()
+        col.metric(
+            name.replace("_", " ").title(),
+            f"{own[name]:.1f}",
+            delta=f"{own[name] - median:+.1f} vs peer median",
+            delta_color="off" if name == "Gender_Gap" else "normal",
+            help=f"Rank {rank} of {len(group)} in the peer group",
+        )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        ordered = group.sort_values(chart_metric)
+        fig = px.bar(
+            ordered,
+            y="District",
+            x=chart_metric,
+            orientation="h",
+            title=f"<b>{district} and its {len(others)} Peers ({year})</b>",
+            color=np.where(ordered.index == row, district, "Peers"),
+            color_discrete_map={district: COLORS["danger"], "Peers": COLORS["primary"]},
+        )
+        fig.add_vline(
+            x=others[chart_metric].median(),
+            line_dash="dash",
+            line_color="#5f6368",
+            annotation_text="Peer median",
+            annotation_position="top",
+        )
+        fig.update_layout(
+            height=max(400, 24 * len(group)),
+            showlegend=False,
+            plot_bgcolor="white",
+            paper_bgcolor="white",
+            font=dict(color="#5f6368", size=12),
+            title_font=dict(size=18, color="#5f6368"),
+            xaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
+            yaxis=dict(showgrid=False),
+        )
+        show_chart(fig)
+    with col2:
+        st.markdown("### 📋 Peer Group")
+        st.dataframe(group.round(2), use_container_width=True, hide_index=True)
+
+
+def show_trends(data, gender_filter="All", grade_filter=None, pipeline=None):
     """Trends analysis tab"""
     st.markdown(
         "<h2 style='color: #5f6368; margin-top: 20px;'>📈 Year-over-Year Trends Analysis</h2>",
@@ -1778,29 +2647,11 @@ def show_trends(data, gender_filter="All", grade_filter=None):
         return
 
     # Group by year for trend analysis
-    yearly_data = (
-        data.groupby("Year")
-        .agg(
-            {
-                "Registered - Total": "sum",
-                "Registered - Boys": "sum",
-                "Registered - Girls": "sum",
-                "Pass_Rate": "mean",
-                "Boys_Pass_Rate": "mean",
-                "Girls_Pass_Rate": "mean",
-                "Excellence_Rate": "mean",
-                "Division 1 - Total": "sum",
-                "Division 2 - Total": "sum",
-                "Division 3 - Total": "sum",
-                "Division 4 - Total": "sum",
-                "Division U - Total": "sum",
-            }
-        )
-        .reset_index()
-    )
-
-    # Sort by year
-    yearly_data = yearly_data.sort_values("Year")
+    pipeline = pipeline or view_pipeline(data)
+    with profiling.stage(
+        "compute_yearly_summary", len(data), cached=True, kind="aggregate"
+    ):
+        yearly_data = pipeline["yearly_summary"]
 
     col1, col2 = st.columns(2)
 
@@ -1853,7 +2704,7 @@ def show_trends(data, gender_filter="All", grade_filter=None):
             yaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
             legend=dict(bgcolor="white", bordercolor="#e8eaed", borderwidth=1),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
 
     with col2:
         # Pass rate trends
@@ -1904,7 +2755,7 @@ def show_trends(data, gender_filter="All", grade_filter=None):
             yaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
             legend=dict(bgcolor="white", bordercolor="#e8eaed", borderwidth=1),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
 
     # Division 1 trend
     fig = go.Figure()
@@ -1934,7 +2785,7 @@ def show_trends(data, gender_filter="All", grade_filter=None):
         xaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
         yaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
     )
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
 
     # Division distribution over years
     st.markdown(
@@ -2011,7 +2862,7 @@ def show_trends(data, gender_filter="All", grade_filter=None):
         yaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
         legend=dict(bgcolor="white", bordercolor="#e8eaed", borderwidth=1),
     )
-    st.plotly_chart(fig, use_container_width=True)
+    show_chart(fig)
 
     # Year-over-Year growth rates
     st.markdown(
@@ -2109,9 +2960,232 @@ def show_trends(data, gender_filter="All", grade_filter=None):
     else:
         st.info("Need at least 2 years of data for growth analysis")
 
+    show_projections(data, pipeline["projections"])
+    show_rank_mobility(data, pipeline["ranks"].panel)
 
-def show_geographical_analysis(data):
+
+def show_projections(data, projections):
+    """Next-year projections of the districts in view"""
+    st.markdown(
+        "<h2 style='color: #5f6368; margin-top: 30px;'>🔮 Next-Year Projections</h2>",
+        unsafe_allow_html=True,
+    )
+    if projections is None or len(projections.years) < 2:
+        st.info("Need at least 2 years of district data for projections")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        metric = st.selectbox(
+            "Projected Metric:",
+            projections.metrics,
+            format_func=lambda x: x.replace("_", " ").title(),
+            key="projection_metric",
+        )
+    with col2:
+        model = st.radio(
+            "Model:",
+            list(MODELS),
+            format_func=MODELS.get,
+            horizontal=True,
+            key="projection_model",
+        )
+    table = projections.table(metric, data)
+    if table.empty:
+        st.info("No district in view has 2 or more years of data")
+        return
+
+    last_year, next_year = projections.years[-1], projections.next_year
+    table["Change"] = table[model] - table["Last"]
+    shown = table[["District", "Last", model, f"{model}_Low", f"{model}_High", "Change"]]
+    shown = shown.rename(
+        columns={
+            "Last": f"Latest ({last_year})",
+            model: f"Projected {next_year}",
+            f"{model}_Low": "Low (95%)",
+            f"{model}_High": "High (95%)",
+        }
+    ).round(1)
+    st.markdown(
+        f"<p style='color: #80868b;'>{MODELS[model]} fitted to every district's "
+        f"{', '.join(str(y) for y in projections.years)} series; intervals need "
+        "3 or more years of data</p>",
+        unsafe_allow_html=True,
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("### 📈 Largest Projected Gains")
+        st.dataframe(
+            shown.sort_values("Change", ascending=False).head(10),
+            use_container_width=True,
+            hide_index=True,
+        )
+    with col2:
+        st.markdown("### 📉 Largest Projected Declines")
+        st.dataframe(
+            shown.sort_values("Change").head(10),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    # One district's history with both models' projections
+    district = st.selectbox(
+        "District:",
+        table.sort_values("District")["District"],
+        key="projection_district",
+    )
+    history = projections.history(metric, district)
+    projected = table[table["District"] == district].iloc[0]
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=history.index,
+            y=history.to_numpy(),
+            mode="lines+markers",
+            name="Actual",
+            line=dict(color=COLORS["primary"], width=3),
+            marker=dict(size=10),
+        )
+    )
+    for name, color in zip(MODELS, [COLORS["success"], COLORS["warning"]]):
+        fig.add_trace(
+            go.Scatter(
+                x=[next_year],
+                y=[projected[name]],
+                mode="markers",
+                name=MODELS[name],
+                error_y=dict(
+                    type="data",
+                    array=[projected[f"{name}_High"] - projected[name]],
+                    arrayminus=[projected[name] - projected[f"{name}_Low"]],
+                ),
+                marker=dict(size=12, color=color, symbol="diamond"),
+            )
+        )
+    fig.update_layout(
+        title=dict(
+            text=f"<b>{district}: {metric.replace('_', ' ').title()}</b>",
+            font=dict(size=18, color="#5f6368"),
+        ),
+        xaxis_title="Year",
+        height=400,
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(color="#5f6368", size=12),
+        xaxis=dict(showgrid=True, gridcolor="#f0f0f0", dtick=1),
+        yaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
+        legend=dict(bgcolor="white", bordercolor="#e8eaed", borderwidth=1),
+    )
+    show_chart(fig)
+
+
+def show_rank_mobility(data, panel):
+    """How the districts in view moved in the national rankings between years"""
+    st.markdown(
+        "<h2 style='color: #5f6368; margin-top: 30px;'>🔀 District Rank Mobility</h2>",
+        unsafe_allow_html=True,
+    )
+    if panel is None or len(panel.years) < 2:
+        st.info("Need at least 2 years of district data for rank mobility")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        metric = st.selectbox(
+            "Ranking Metric:",
+            list(panel.ranks),
+            format_func=lambda x: x.replace("_", " ").title(),
+            key="mobility_metric",
+        )
+    with col2:
+        start = st.selectbox("From:", panel.years, index=0, key="mobility_start")
+    with col3:
+        end = st.selectbox(
+            "To:", panel.years, index=len(panel.years) - 1, key="mobility_end"
+        )
+    if start == end:
+        st.info("Pick two different years to compare")
+        return
+
+    movers = panel.movers(metric, start, end, data)
+    if movers.empty:
+        st.info(f"No district in view was ranked in both {start} and {end}")
+        return
+    st.markdown(
+        f"<p style='color: #80868b;'>National ranks among all districts; "
+        f"{len(movers):,} districts in view were ranked in both years</p>",
+        unsafe_allow_html=True,
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("### 📈 Biggest Gainers")
+        st.dataframe(
+            movers[movers["Change"] > 0].head(10),
+            use_container_width=True,
+            hide_index=True,
+        )
+    with col2:
+        st.markdown("### 📉 Biggest Losers")
+        st.dataframe(
+            movers[movers["Change"] < 0].iloc[::-1].head(10),
+            use_container_width=True,
+            hide_index=True,
+        )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        # Quintile transition matrix: the diagonal holds districts that
+        # stayed in the same fifth of the national ranking
+        matrix = panel.transitions(metric, start, end, data)
+        fig = px.imshow(
+            matrix,
+            text_auto=True,
+            color_continuous_scale="Blues",
+            labels={
+                "x": f"Quintile in {end}",
+                "y": f"Quintile in {start}",
+                "color": "Districts",
+            },
+            title="<b>Rank Quintile Mobility (1 = top fifth)</b>",
+        )
+        fig.update_layout(
+            height=450,
+            paper_bgcolor="white",
+            font=dict(color="#5f6368", size=12),
+            title_font=dict(size=18, color="#5f6368"),
+        )
+        show_chart(fig)
+
+    with col2:
+        # Rank trajectories of the districts that moved most
+        biggest = movers.reindex(
+            movers["Change"].abs().sort_values(ascending=False, kind="stable").index
+        ).head(25)
+        table = panel.table(metric, data).loc[biggest["District"]]
+        fig = px.imshow(
+            table,
+            text_auto=".0f",
+            aspect="auto",
+            color_continuous_scale="RdYlGn_r",
+            labels={"x": "Year", "y": "District", "color": "Rank"},
+            title="<b>Rank by Year of the Biggest Movers</b>",
+        )
+        fig.update_xaxes(type="category")
+        fig.update_layout(
+            height=max(450, 22 * len(table)),
+            paper_bgcolor="white",
+            font=dict(color="#5f6368", size=11),
+            title_font=dict(size=18, color="#5f6368"),
+        )
+        show_chart(fig)
+
+
+def show_geographical_analysis(data, pipeline=None):
     """Geographical analysis tab"""
+    pipeline = pipeline or view_pipeline(data)
+    ranks = pipeline["ranks"]
     st.markdown(
         "<h2 style='color: #5f6368; margin-top: 20px;'>🗺️ Geographical Performance Analysis</h2>",
         unsafe_allow_html=True,
@@ -2122,8 +3196,7 @@ def show_geographical_analysis(data):
     )
 
     # Calculate failure rate
-    data_with_failure = data.copy()
-    data_with_failure["Failure_Rate"] = 100 - data_with_failure["Pass_Rate"]
+    data_with_failure = data.assign(Failure_Rate=100 - data["Pass_Rate"])
 
     # Check which geographical columns are available
     has_sub_region = "Sub Region" in data.columns
@@ -2135,20 +3208,10 @@ def show_geographical_analysis(data):
         st.markdown("---")
         st.markdown("### 📍 Performance by Sub Region")
 
-        regional_stats = (
-            data_with_failure.groupby("Sub Region")
-            .agg(
-                {
-                    "Registered - Total": "sum",
-                    "Pass_Rate": "mean",
-                    "Excellence_Rate": "mean",
-                    "Failure_Rate": "mean",
-                }
-            )
-            .reset_index()
-        )
-
-        regional_stats = regional_stats.sort_values("Pass_Rate", ascending=False)
+        with profiling.stage(
+            "compute_regional_summary", len(data), cached=True, kind="aggregate"
+        ):
+            regional_stats = pipeline["regional_summary"]
 
         col1, col2 = st.columns(2)
 
@@ -2173,7 +3236,7 @@ def show_geographical_analysis(data):
                 xaxis_tickangle=-45,
                 showlegend=False,
             )
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig)
 
         with col2:
             # Failure Rate by Sub Region
@@ -2196,7 +3259,7 @@ def show_geographical_analysis(data):
                 xaxis_tickangle=-45,
                 showlegend=False,
             )
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig)
 
         # Regional comparison table
         st.markdown("#### 📊 Regional Performance Summary")
@@ -2228,7 +3291,7 @@ def show_geographical_analysis(data):
 
         with col1:
             # Top 20 districts by pass rate
-            top_districts = data_with_failure.nlargest(20, "Pass_Rate")[
+            top_districts = ranks.top(data_with_failure, "Pass_Rate", 20)[
                 ["District", "Pass_Rate", "Failure_Rate"]
             ]
 
@@ -2249,11 +3312,11 @@ def show_geographical_analysis(data):
                 title_font=dict(size=18, color="#5f6368"),
                 showlegend=False,
             )
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig)
 
         with col2:
             # Bottom 20 districts by pass rate (highest failure)
-            bottom_districts = data_with_failure.nsmallest(20, "Pass_Rate")[
+            bottom_districts = ranks.bottom(data_with_failure, "Pass_Rate", 20)[
                 ["District", "Pass_Rate", "Failure_Rate"]
             ]
 
@@ -2274,7 +3337,7 @@ def show_geographical_analysis(data):
                 title_font=dict(size=18, color="#5f6368"),
                 showlegend=False,
             )
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig)
 
     # Geographic scatter plot
     st.markdown("---")
@@ -2299,8 +3362,146 @@ def show_geographical_analysis(data):
             font=dict(color="#2d3436", size=13),
             title_font=dict(size=20, color="#5f6368"),
         )
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
+
+
+def show_data_quality(data, pipeline=None):
+    """Data quality tab"""
+    pipeline = pipeline or view_pipeline(data)
+    findings = pipeline["quality_view"]
+    st.markdown(
+        "<h2 style='color: #5f6368; margin-top: 20px;'>🧪 Data Quality</h2>",
+        unsafe_allow_html=True,
+    )
+    st.markdown(
+        "<p style='color: #80868b;'>Reported totals and pass rates are checked "
+        "against the division columns; rates and registrations are scored "
+        "against each district's own history and its sub region peers in the "
+        "same year (robust z-score, median and MAD based, flagged beyond "
+        f"{QUALITY_THRESHOLD})</p>",
+        unsafe_allow_html=True,
+    )
+
+    col1, col2, col3, col4 = st.columns(4)
+    consistency = findings["Check"].str.startswith("Inconsistent")
+    outliers = findings["Check"].str.endswith("outlier")
+    col1.metric("Rows Checked", f"{len(data):,}")
+    col2.metric("Rows Flagged", f"{findings['Row'].nunique():,}")
+    col3.metric("Inconsistent Totals", f"{int(consistency.sum()):,}")
+    col4.metric("Outliers", f"{int(outliers.sum()):,}")
+
+    if findings.empty:
+        st.success("No issues found in the current selection")
+        return
+
+    counts = findings.groupby(["Check", "Field"]).size().reset_index(name="Findings")
+    fig = px.bar(
+        counts,
+        x="Findings",
+        y="Check",
+        color="Field",
+        orientation="h",
+        title="<b>Findings by Check</b>",
+        color_discrete_sequence=COLORS["chart_colors"],
+    )
+    fig.update_layout(
+        height=350,
+        plot_bgcolor="white",
+        paper_bgcolor="white",
+        font=dict(color="#5f6368", size=12),
+        title_font=dict(size=18, color="#5f6368"),
+        xaxis=dict(showgrid=True, gridcolor="#f0f0f0"),
+        yaxis=dict(showgrid=False),
+        legend=dict(bgcolor="white", bordercolor="#e8eaed", borderwidth=1),
+    )
+    show_chart(fig)
+
+    checks = st.multiselect(
+        "Checks:",
+        findings["Check"].unique().tolist(),
+        default=findings["Check"].unique().tolist(),
+        key="quality_checks",
+    )
+    shown = findings[findings["Check"].isin(checks)].drop(columns="Row")
+    st.dataframe(
+        shown.round({"Value": 2, "Expected": 2, "Score": 2}),
+        use_container_width=True,
+        hide_index=True,
+    )
+    st.download_button(
+        label="📥 Download findings (CSV)",
+        data=shown.to_csv(index=False),
+        file_name="ple_data_quality.csv",
+        mime="text/csv",
+    )
+
+
+def show_profiler(profile, pipeline=None):
+    """Developer panel: where this rerun's time went, plus recent history"""
+    with st.expander("⏱️ Profiler", expanded=False):
+        counts = profile.cache_counts()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Rerun", f"{profile.total * 1000:,.0f} ms")
+        col2.metric("Cache hits", counts["hit"])
+        col3.metric("Cache misses", counts["miss"])
+        col4.metric(
+            "Chart payload",
+            f"{sum(c['payload_bytes'] for c in profile.charts) / 1024:,.0f} KiB",
+        )
+
+        stages = pd.DataFrame(profile.stages)
+        if not stages.empty:
+            stages["stage"] = [
+                "↳ " * depth + name
+                for depth, name in zip(stages["depth"], stages["stage"])
+            ]
+            stages["ms"] = stages.pop("seconds") * 1000
+            st.markdown("**Stages**")
+            st.dataframe(
+                stages[["stage", "ms", "rows", "cache"]],
+                use_container_width=True,
+                hide_index=True,
+            )
+
+        if profile.charts:
+            st.markdown("**Charts**")
+            st.dataframe(
+                pd.DataFrame(profile.charts),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+        if pipeline is not None:
+            st.markdown(
+                f"**Pipeline nodes** — ran: {', '.join(pipeline.ran) or 'none'}; "
+                f"reused: {', '.join(pipeline.reused) or 'none'}"
+            )
+
+        history = get_profile_history()
+        runs = history.runs()
+        if len(runs) > 1:
+            st.markdown(f"**Last {len(runs)} reruns (all sessions)**")
+            st.line_chart(
+                pd.DataFrame(
+                    {"rerun ms": [r["total_s"] * 1000 for r in runs]}
+                ),
+                height=160,
+            )
+            st.dataframe(
+                pd.DataFrame(history.stage_stats()),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+        st.markdown("**Memory cache**")
+        st.json(get_memory_cache().usage(), expanded=False)
+
+        executor = get_offload_executor()
+        st.markdown("**Process pool**")
+        st.json(executor.metrics(), expanded=False)
 
 
 if __name__ == "__main__":
-    main()
+    init_tracing()
+    with tracing.span("rerun", kind="rerun"):
+        main()
@@ -0,0 +1,311 @@
+"""
+Concurrent-session load test
+Drives N simulated users through the dashboard in one process with
+Streamlit's AppTest runner, the same way a server runs one script thread
+per session, and reports rerun latency percentiles, peak RSS and
+throughput. Everything runs locally: the app reads a file via PLE_DATA_PATH.
+
+    python benchmarks/load_test.py --sessions 8 --actions 20
+    python benchmarks/load_test.py --data "data/V2/P.L.E Digest 2023 - 2025 v1.csv"
+
+Tabs are switched client-side without a rerun, so a "tab" step here means
+using a widget inside that tab (ranking metric, Data Explorer search/sort).
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import traceback
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP_PATH = os.path.join(ROOT, "app.py")
+
+
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    return None
+
+
+def change_years(at, rng):
+    widget = _widget(at.sidebar.multiselect, "Year:")
+    if widget is None:
+        return None
+    years = rng.sample(widget.options, rng.randint(1, len(widget.options)))
+    return widget.set_value(years)
+
+
+def _pick(label):
+    def action(at, rng):
+        widget = _widget(at.sidebar.selectbox, label)
+        if widget is None:
+            return None
+        return widget.select(rng.choice(widget.options))
+
+    return action
+
+
+def reset_filters(at, rng):
+    for label in ("Sub Region:", "Zonal Office:", "District:"):
+        widget = _widget(at.sidebar.selectbox, label)
+        if widget is not None:
+            widget.select("All")
+    return at
+
+
+def change_gender(at, rng):
+    widget = _widget(at.sidebar.radio, "View:")
+    if widget is None:
+        return None
+    return widget.set_value(rng.choice(widget.options))
+
+
+def rankings_metric(at, rng):
+    widget = _widget(at.selectbox, "Select Ranking Metric:")
+    if widget is None:
+        return None
+    return widget.select(rng.choice(widget.options))
+
+
+def explorer_search(at, rng):
+    widget = _widget(at.text_input, "🔍 Search districts")
+    districts = _widget(at.sidebar.selectbox, "District:")
+    if widget is None or districts is None or len(districts.options) < 2:
+        return None
+    name = str(rng.choice(districts.options[1:]))
+    # Users type a prefix, not the whole name
+    return widget.input(name[: rng.randint(1, min(len(name), 6))])
+
+
+def explorer_sort(at, rng):
+    widget = _widget(at.selectbox, "Sort by")
+    if widget is None:
+        return None
+    return widget.select(rng.choice(widget.options))
+
+
+# Relative frequency of each step in a simulated session
+ACTIONS = {
+    "change_years": (change_years, 3),
+    "pick_district": (_pick("District:"), 3),
+    "pick_sub_region": (_pick("Sub Region:"), 2),
+    "pick_zone": (_pick("Zonal Office:"), 1),
+    "reset_filters": (reset_filters, 2),
+    "change_gender": (change_gender, 2),
+    "rankings_metric": (rankings_metric, 2),
+    "explorer_search": (explorer_search, 3),
+    "explorer_sort": (explorer_sort, 1),
+}
+
+
+class RSSSampler(threading.Thread):
+    """Polls the resident set size of this process and its children"""
+
+    def __init__(self, interval=0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self._done = threading.Event()
+
+    @staticmethod
+    def _rss(pid):
+        try:
+            with open(f"/proc/{pid}/status") as handle:
+                for line in handle:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return 0
+
+    @staticmethod
+    def _descendants(pid):
+        children = []
+        try:
+            for tid in os.listdir(f"/proc/{pid}/task"):
+                with open(f"/proc/{pid}/task/{tid}/children") as handle:
+                    children.extend(int(c) for c in handle.read().split())
+        except OSError:
+            return []
+        for child in list(children):
+            children.extend(RSSSampler._descendants(child))
+        return children
+
+    def sample(self):
+        pid = os.getpid()
+        total = sum(self._rss(p) for p in [pid] + self._descendants(pid))
+        self.peak = max(self.peak, total)
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self.sample()
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.sample()
+        if not self.peak:
+            # No /proc: fall back to the kernel's high-water mark (KiB on Linux)
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return self.peak
+
+
+def run_session(index, args, records, errors, start):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(args.seed + index)
+    names = list(ACTIONS)
+    weights = [ACTIONS[name][1] for name in names]
+    start.wait()
+
+    at = AppTest.from_file(APP_PATH, default_timeout=args.timeout)
+    steps = [("initial_load", None)] + [
+        (name, ACTIONS[name][0]) for name in rng.choices(names, weights, k=args.actions)
+    ]
+    for name, action in steps:
+        try:
+            if action is not None and action(at, rng) is None:
+                continue
+            started = time.perf_counter()
+            at.run()
+            elapsed = time.perf_counter() - started
+        except Exception:
+            errors.append({"session": index, "action": name, "error": traceback.format_exc()})
+            continue
+        records.append({"session": index, "action": name, "seconds": elapsed})
+        if at.exception:
+            errors.append(
+                {"session": index, "action": name, "error": at.exception[0].value}
+            )
+        if args.think_time:
+            time.sleep(rng.uniform(0, args.think_time))
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    return {
+        "count": len(ordered),
+        "mean_s": statistics.fmean(ordered),
+        "p50_s": pick(0.50),
+        "p95_s": pick(0.95),
+        "p99_s": pick(0.99),
+        "max_s": ordered[-1],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard concurrent-session load test")
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--actions", type=int, default=15, help="Steps per session")
+    parser.add_argument(
+        "--data", help="Dataset for PLE_DATA_PATH (default: a generated digest)"
+    )
+    parser.add_argument(
+        "--scale",
+        default="136x4x1",
+        help="DISTRICTSxYEARSxSCHOOLS of the generated digest",
+    )
+    parser.add_argument(
+        "--think-time", type=float, default=0.0, help="Max pause between steps (s)"
+    )
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="load-test-results.json")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="ple-load-")
+    try:
+        if args.data:
+            # Work on a copy: the app writes its Arrow conversion next to the source
+            data_path = os.path.join(workdir, os.path.basename(args.data))
+            shutil.copy(args.data, data_path)
+        else:
+            from ple.synthetic import write_digest
+
+            districts, years, schools = (int(p) for p in args.scale.split("x"))
+            data_path = os.path.join(workdir, "synthetic.csv")
+            write_digest(data_path, districts, years, schools)
+        os.environ["PLE_DATA_PATH"] = data_path
+        for var in ("PLE_SOURCES_MANIFEST", "PLE_SHARED_DATASET_DIR"):
+            os.environ.pop(var, None)
+
+        from streamlit import logger
+
+        logger.set_log_level("error")
+        warnings.simplefilter("ignore")
+
+        records, errors = [], []
+        start = threading.Barrier(args.sessions + 1)
+        sessions = [
+            threading.Thread(target=run_session, args=(i, args, records, errors, start))
+            for i in range(args.sessions)
+        ]
+        sampler = RSSSampler()
+        sampler.start()
+        for session in sessions:
+            session.start()
+        start.wait()
+        began = time.perf_counter()
+        for session in sessions:
+            session.join()
+        wall = time.perf_counter() - began
+        peak_rss = sampler.stop()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    by_action = {}
+    for record in records:
+        by_action.setdefault(record["action"], []).append(record["seconds"])
+    report = {
+        "sessions": args.sessions,
+        "actions_per_session": args.actions,
+        "data": args.data or f"synthetic {args.scale}",
+        "wall_s": wall,
+        "reruns": len(records),
+        "throughput_reruns_per_s": len(records) / wall if wall else 0.0,
+        "peak_rss_bytes": peak_rss,
+        "latency": percentiles([r["seconds"] for r in records]),
+        "latency_by_action": {
+            name: percentiles(values) for name, values in sorted(by_action.items())
+        },
+        "errors": errors,
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+
+    latency = report["latency"]
+    print(
+        f"{args.sessions} sessions, {len(records)} reruns in {wall:.1f}s "
+        f"({report['throughput_reruns_per_s']:.2f} reruns/s)"
+    )
+    if latency:
+        print(
+            f"latency p50 {latency['p50_s'] * 1000:.0f} ms, "
+            f"p95 {latency['p95_s'] * 1000:.0f} ms, p99 {latency['p99_s'] * 1000:.0f} ms"
+        )
+    print(f"peak RSS {peak_rss / 2**20:.0f} MiB, {len(errors)} errors")
+    print(f"wrote {args.output}")
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
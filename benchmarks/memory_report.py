@@ -0,0 +1,132 @@
+"""
+Cache memory report
+Fills the derived-results cache with many filter combinations under a
+byte budget and compares its own accounting with what tracemalloc sees:
+growth of traced memory, the peak, and the top allocation sites.
+
+    python benchmarks/memory_report.py --budget-mb 16 --scale 1000x10x1
+
+Exits non-zero if the cache ever reports more bytes than its budget.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def combinations(data):
+    years = sorted(data["Year"].unique().tolist())
+    selections = [(tuple(years), "All", "All", "All")]
+    selections += [((year,), "All", "All", "All") for year in years]
+    selections += [
+        (tuple(years), region, "All", "All")
+        for region in sorted(data["Sub Region"].dropna().unique())
+    ]
+    selections += [
+        ((years[-1],), "All", "All", district)
+        for district in data["District"].drop_duplicates().head(200)
+    ]
+    return selections
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cache memory accounting report")
+    parser.add_argument("--budget-mb", type=float, default=16)
+    parser.add_argument("--scale", default="1000x10x1", help="DISTRICTSxYEARSxSCHOOLS")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", default="memory-report.json")
+    args = parser.parse_args(argv)
+
+    os.environ["PLE_CACHE_BUDGET_MB"] = str(args.budget_mb)
+    from streamlit import logger
+
+    import app
+    from ple import processing
+    from ple.synthetic import generate_digest
+
+    logger.set_log_level("error")
+    warnings.simplefilter("ignore")
+
+    districts, years, schools = (int(p) for p in args.scale.split("x"))
+    data = processing.clean_and_process_data(
+        generate_digest(districts, years, schools)
+    )
+    version = app.get_data_version(data)
+    cache = app.get_memory_cache()
+    cache.clear()
+
+    tracemalloc.start(25)
+    baseline = tracemalloc.take_snapshot()
+    start_traced, _ = tracemalloc.get_traced_memory()
+    over_budget = 0
+    for selection in combinations(data):
+        years, sub_region, zone, district = selection
+        pipeline = app.PIPELINE.run(
+            dataset=data,
+            data_version=version,
+            years=years,
+            sub_region=sub_region,
+            zone=zone,
+            district=district,
+            grades=tuple(app.DEFAULT_GRADES),
+            **app.index_params(version, data),
+        )
+        if pipeline["view"].empty:
+            continue
+        for gender in ("All", "Boys Only", "Girls Only"):
+            pipeline.update(gender=gender)
+            pipeline["kpis"]
+            pipeline["overview_summary"]
+        pipeline["yearly_summary"]
+        pipeline["regional_summary"]
+        if cache.usage()["bytes"] > cache.budget_bytes:
+            over_budget += 1
+    traced, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    top = snapshot.compare_to(baseline, "lineno")[: args.top]
+    usage = cache.usage()
+    report = {
+        "scale": args.scale,
+        "rows": len(data),
+        "cache": usage,
+        "traced_growth_bytes": traced - start_traced,
+        "traced_peak_bytes": peak,
+        "checks_over_budget": over_budget,
+        "top_allocations": [
+            {"site": str(stat.traceback[0]), "size_diff_bytes": stat.size_diff, "count_diff": stat.count_diff}
+            for stat in top
+        ],
+    }
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+
+    mib = 2**20
+    print(
+        f"cache: {usage['entries']} entries, {usage['bytes'] / mib:.1f} of "
+        f"{usage['budget_bytes'] / mib:.1f} MiB, {usage['evictions']} evictions, "
+        f"{usage['hits']} hits / {usage['misses']} misses"
+    )
+    for kind, stats in usage["by_kind"].items():
+        print(f"  {kind:<8} {stats['entries']:>6} entries {stats['bytes'] / mib:8.2f} MiB")
+    print(
+        f"tracemalloc: growth {report['traced_growth_bytes'] / mib:.1f} MiB, "
+        f"peak {peak / mib:.1f} MiB"
+    )
+    for stat in top:
+        print(f"  {stat.size_diff / 1024:10.1f} KiB  {stat.traceback[0]}")
+    print(f"wrote {args.output}")
+    if over_budget:
+        print(f"cache exceeded its budget at {over_budget} checks")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
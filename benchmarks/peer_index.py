@@ -0,0 +1,66 @@
+"""
+Peer index benchmark
+Builds the peer KD-trees over a synthetic digest and times k-nearest peer
+lookups against a brute-force distance scan over the same year.
+
+    python benchmarks/peer_index.py --districts 20000 --years 4
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ple import processing  # noqa: E402
+from ple.peers import PeerIndex  # noqa: E402
+from ple.synthetic import generate_digest  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Peer index benchmark")
+    parser.add_argument("--districts", type=int, default=20_000)
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument("--peers", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    data = processing.clean_and_process_data(
+        generate_digest(args.districts, args.years, seed=args.seed)
+    )
+    started = time.perf_counter()
+    index = PeerIndex(data)
+    print(f"indexed {len(data):,} district-years in {time.perf_counter() - started:.2f} s")
+
+    rng = np.random.default_rng(args.seed)
+    rows = rng.choice(data.index, args.queries)
+    tree_ms, scan_ms = [], []
+    for row in rows:
+        started = time.perf_counter()
+        found = index.peers(row, args.peers)
+        tree_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        position = data.index.get_loc(row)
+        same = np.flatnonzero(data["Year"].to_numpy() == data["Year"].iloc[position])
+        distance = np.sqrt(((index._scaled[same] - index._scaled[position]) ** 2).sum(axis=1))
+        nearest = np.sort(distance)[1 : args.peers + 1]
+        scan_ms.append((time.perf_counter() - started) * 1000)
+        if not np.allclose(found.to_numpy(), nearest):
+            print(f"mismatch for row {row}")
+            return 1
+    print(
+        f"k={args.peers}: tree {statistics.median(tree_ms):.3f} ms, "
+        f"scan {statistics.median(scan_ms):.3f} ms (median of {args.queries})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
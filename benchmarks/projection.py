@@ -0,0 +1,64 @@
+"""
+Projection benchmark
+Builds the District x Year panel of a synthetic digest and times the batch
+fit of both projection models for every district and metric. The refit
+(models only) should stay under a second for thousands of districts.
+
+    python benchmarks/projection.py --districts 5000 --years 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ple import processing  # noqa: E402
+from ple.projection import Projections  # noqa: E402
+from ple.ranking import RankPanel  # noqa: E402
+from ple.synthetic import generate_digest  # noqa: E402
+
+METRICS = ["Pass_Rate", "Excellence_Rate", "Registered - Total"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch projection benchmark")
+    parser.add_argument("--districts", type=int, default=5000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    data = processing.clean_and_process_data(
+        generate_digest(args.districts, args.years, seed=args.seed)
+    )
+    started = time.perf_counter()
+    panel = RankPanel(
+        data,
+        METRICS,
+        keys=data["District"],
+        totals=["Registered - Total"],
+        weights=data["Registered - Total"],
+    )
+    print(
+        f"panel of {len(panel.labels):,} districts x {len(panel.years)} years "
+        f"built in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+    samples = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        projections = Projections(panel, METRICS)
+        samples.append(time.perf_counter() - started)
+    fit_ms = statistics.median(samples) * 1000
+    print(f"fit {len(METRICS)} metrics x 2 models: {fit_ms:.1f} ms (median of {args.repeat})")
+    table = projections.table("Pass_Rate")
+    print(f"{len(table):,} districts projected for {projections.next_year}")
+    return 0 if fit_ms < 1000 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
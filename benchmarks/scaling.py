@@ -0,0 +1,251 @@
+"""
+Scaling benchmark
+Times each dashboard stage on synthetic digests of increasing size and
+records the results as JSON, so runs on different commits can be compared.
+
+    python benchmarks/scaling.py --scales 136x4x1 1000x10x10 --output results.json
+    python benchmarks/scaling.py --baseline results.json
+
+A scale is ``DISTRICTSxYEARSxSCHOOLS``. The sheet download is served from a
+local HTTP stand-in, so no network access is needed.
+"""
+
+import argparse
+import functools
+import http.server
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_SCALES = ["136x4x1", "1000x10x1", "1000x10x10", "1000x10x100"]
+
+
+def parse_scale(text):
+    districts, years, schools = (int(part) for part in text.lower().split("x"))
+    return {"districts": districts, "years": years, "schools": schools}
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_directory(directory):
+    """Serve ``directory`` over HTTP on a free local port; returns the server"""
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed(func, repeat, setup=None):
+    """Run ``func`` ``repeat`` times, each after ``setup``; returns timings and last result"""
+    runs = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        result = func()
+        runs.append(time.perf_counter() - started)
+    return {
+        "median_s": statistics.median(runs),
+        "min_s": min(runs),
+        "runs": runs,
+    }, result
+
+
+def bench_scale(app, st, sheet_id, repeat):
+    """Time every stage for one generated digest (cold caches each run)"""
+    stages = {}
+
+    def clear():
+        st.cache_data.clear()
+        app.get_memory_cache().clear()
+
+    stages["load_from_google_sheet"], raw = timed(
+        lambda: app.load_from_google_sheet(sheet_id, "Sheet1"), repeat, clear
+    )
+    stages["clean_and_process_data"], data = timed(
+        lambda: app.clean_and_process_data(raw), repeat, clear
+    )
+    stages["get_data_version"], version = timed(
+        lambda: app.get_data_version(data), repeat
+    )
+
+    years = sorted(data["Year"].unique().tolist())
+    district = data["District"].iloc[0]
+    sub_region = data["Sub Region"].dropna().iloc[0]
+    filters = {
+        "all": (tuple(years), "All", "All", "All"),
+        "latest_year": ((years[-1],), "All", "All", "All"),
+        "sub_region": (tuple(years), sub_region, "All", "All"),
+        "district": (tuple(years), "All", "All", district),
+    }
+    for name, selection in filters.items():
+        stages[f"filter_data[{name}]"], _ = timed(
+            lambda: app.filter_data(data, *selection), repeat
+        )
+
+    grades = tuple(app.DEFAULT_GRADES)
+
+    def pipeline():
+        return app.PIPELINE.run(
+            dataset=data,
+            data_version=version,
+            years=tuple(years),
+            sub_region="All",
+            zone="All",
+            district="All",
+            gender="All",
+            grades=grades,
+            **app.index_params(version, data),
+        )
+
+    view = app.filter_data(data, tuple(years), "All", "All", "All")
+    stages["compute_kpis"], _ = timed(
+        lambda: app.compute_kpis(view, "All", grades), repeat
+    )
+
+    tabs = {
+        "show_overview": lambda: app.show_overview(view, "All", grades, pipeline()),
+        "show_performance": lambda: app.show_performance(view, "All", pipeline()),
+        "show_gender_analysis": lambda: app.show_gender_analysis(view, grades, pipeline()),
+        "show_rankings": lambda: app.show_rankings(view, "All", pipeline()),
+        "show_trends": lambda: app.show_trends(view, "All", grades, pipeline()),
+        "show_geographical_analysis": lambda: app.show_geographical_analysis(
+            view, pipeline()
+        ),
+        "show_data_quality": lambda: app.show_data_quality(view, pipeline()),
+    }
+    for name, render in tabs.items():
+        stages[name], _ = timed(render, repeat, clear)
+
+    return len(raw), stages
+
+
+def environment():
+    import numpy
+    import pandas
+    import streamlit
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "streamlit": streamlit.__version__,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print per-stage ratios against a baseline run; returns the regressions"""
+    previous = {
+        (r["scale_name"], stage): timing["median_s"]
+        for r in baseline["results"]
+        for stage, timing in r["stages"].items()
+    }
+    regressions = []
+    for r in results:
+        for stage, timing in r["stages"].items():
+            before = previous.get((r["scale_name"], stage))
+            if not before:
+                continue
+            ratio = timing["median_s"] / before
+            flag = ""
+            if ratio > 1 + tolerance:
+                flag = "  REGRESSION"
+                regressions.append((r["scale_name"], stage, ratio))
+            print(f"{r['scale_name']:>14} {stage:<36} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard scaling benchmark")
+    parser.add_argument("--scales", nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare with")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Slowdown over the baseline reported as a regression (default 20%%)",
+    )
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="ple-bench-")
+    server = serve_directory(workdir)
+    # Must be set before the app (and ple.ingest) is imported
+    os.environ["PLE_SHEET_EXPORT_URL"] = (
+        f"http://127.0.0.1:{server.server_port}/{{sheet_id}}.csv?sheet={{sheet_name}}"
+    )
+    for var in ("PLE_DATA_PATH", "PLE_SOURCES_MANIFEST", "PLE_SHARED_DATASET_DIR"):
+        os.environ.pop(var, None)
+
+    import streamlit as st
+    from streamlit import logger
+
+    import app
+    from ple.synthetic import write_digest
+
+    # Bare-mode calls warn about the missing script context on every element
+    logger.set_log_level("error")
+    warnings.simplefilter("ignore")
+
+    results = []
+    try:
+        for name in args.scales:
+            scale = parse_scale(name)
+            path = os.path.join(workdir, f"{name}.csv")
+            rows = write_digest(path, seed=args.seed, **scale)
+            print(f"{name}: {rows:,} rows", flush=True)
+            rows, stages = bench_scale(app, st, name, args.repeat)
+            for stage, timing in stages.items():
+                print(f"  {stage:<36} {timing['median_s'] * 1000:10.1f} ms", flush=True)
+            results.append(
+                {"scale_name": name, "scale": scale, "rows": rows, "stages": stages}
+            )
+            os.unlink(path)
+    finally:
+        server.shutdown()
+        app.get_offload_executor().shutdown()
+
+    report = {"environment": environment(), "repeat": args.repeat, "results": results}
+    with open(args.output, "w") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Search index benchmark
+Builds the Data Explorer name index over synthetic school-like names and
+times prefix, substring and misspelled lookups against the pandas
+``str.contains`` scan it replaced.
+
+    python benchmarks/search_index.py --names 300000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ple.search import NameIndex  # noqa: E402
+
+SYLLABLES = [
+    "ka", "mu", "la", "ba", "na", "go", "ru", "ki", "bu", "nyo",
+    "te", "so", "mpa", "ri", "we", "ge", "zi", "lu", "ko", "ra",
+]
+SUFFIXES = ["Primary School", "P/S", "Parents School", "Junior School", "Centre"]
+
+
+def synthetic_names(count, seed=0):
+    rng = np.random.default_rng(seed)
+    words = rng.choice(SYLLABLES, (count, 4))
+    lengths = rng.integers(2, 5, count)
+    suffixes = rng.choice(SUFFIXES, count)
+    return [
+        f"{''.join(row[:n]).title()} {suffix} {i}"
+        for i, (row, n, suffix) in enumerate(zip(words, lengths, suffixes))
+    ]
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Name search index benchmark")
+    parser.add_argument("--names", type=int, default=300_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    names = synthetic_names(args.names, args.seed)
+    column = pd.Series(names)
+    started = time.perf_counter()
+    index = NameIndex(names)
+    print(f"built index over {len(index):,} names in {time.perf_counter() - started:.1f} s")
+
+    queries = {
+        "prefix": "kamu",
+        "substring": "murib",
+        "word prefix": "junior",
+        "typo": "kamulaba primery",
+    }
+    print(f"{'query':<12} {'index ms':>9} {'scan ms':>9} {'matches':>8}")
+    for label, query in queries.items():
+        index_ms, matches = timed(lambda: index.search(query, limit=50), args.repeat)
+        scan_ms, _ = timed(
+            lambda: column[column.str.contains(query, case=False, regex=False)],
+            max(1, args.repeat // 10),
+        )
+        print(f"{label:<12} {index_ms:9.3f} {scan_ms:9.1f} {len(matches):8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+"""
+PLE data pipeline helpers
+Streamlit-free code shared by the dashboard, worker processes and tooling
+"""
@@ -0,0 +1,165 @@
+"""
+Bootstrap intervals
+Percentile confidence intervals for pass rates and the boys-girls pass-rate
+gap. National and regional figures resample districts within each group (a
+stratified cluster bootstrap). Each batch of replicates comes from a single
+NumPy draw, and batches are independent so they can be spread over a
+process pool. Per-district figures have one binomial sample each, so they
+use closed-form Wilson score intervals instead of resampling.
+"""
+
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+STATISTICS = ["Boys_Pass_Rate", "Girls_Pass_Rate", "Gender_Gap", "Pass_Rate"]
+
+# Two-sided interval coverage
+LEVEL = 0.95
+
+# Random draws per batch; bounds the memory of one vectorized step
+BATCH_DRAWS = 500_000
+
+_PASSING = [f"Division {d}" for d in ("1", "2", "3", "4")]
+_COUNTS = ["boys_passed", "boys", "girls_passed", "girls", "passed", "total"]
+
+
+def gap_counts(data, group_col=None):
+    """Narrow frame of the counts the bootstrap needs, one row per data row.
+
+    Rows with no ``group_col`` value are dropped.
+    """
+
+    def total(columns):
+        present = [col for col in columns if col in data.columns]
+        return data[present].sum(axis=1).to_numpy(dtype=float)
+
+    counts = pd.DataFrame(
+        {
+            "boys_passed": total([f"{d} - Boys" for d in _PASSING]),
+            "boys": total(["Registered - Boys"]),
+            "girls_passed": total([f"{d} - Girls" for d in _PASSING]),
+            "girls": total(["Registered - Girls"]),
+            "passed": total([f"{d} - Total" for d in _PASSING]),
+            "total": total(["Registered - Total"]),
+            "group": data[group_col].to_numpy() if group_col else "National",
+            "District": data["District"].to_numpy() if "District" in data.columns else "",
+            "Year": data["Year"].to_numpy() if "Year" in data.columns else np.nan,
+        }
+    )
+    return counts[counts["group"].notna()].reset_index(drop=True)
+
+
+def _rates(sums):
+    """Statistics (%) from summed counts, last axis ordered as ``_COUNTS``"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        boys = sums[..., 0] / sums[..., 1] * 100
+        girls = sums[..., 2] / sums[..., 3] * 100
+        overall = sums[..., 4] / sums[..., 5] * 100
+    return np.stack([boys, girls, boys - girls, overall], axis=-1)
+
+
+def _table(estimates, replicates, level, index):
+    tail = (1 - level) / 2 * 100
+    low = high = np.full(estimates.shape, np.nan)
+    if replicates.size:
+        low, high = np.percentile(replicates, [tail, 100 - tail], axis=0)
+        # Replicates that drew no boys or girls have no rate; the slower
+        # nan-aware percentile is only needed where some, not all, are missing
+        missing = np.isnan(replicates)
+        partial = missing.any(axis=0) & ~missing.all(axis=0)
+        if partial.any():
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                low[partial], high[partial] = np.nanpercentile(
+                    replicates[:, partial], [tail, 100 - tail], axis=0
+                )
+    table = pd.DataFrame(estimates, columns=STATISTICS, index=index)
+    for i, name in enumerate(STATISTICS):
+        table[f"{name}_Low"] = low[:, i]
+        table[f"{name}_High"] = high[:, i]
+    return table
+
+
+def split(total, parts):
+    """``total`` as ``parts`` near-equal positive sizes"""
+    parts = max(1, min(parts, total))
+    return [total // parts + (i < total % parts) for i in range(parts)]
+
+
+def seeds(seed, parts):
+    """Independent child seeds for batches run in parallel"""
+    return [
+        int(child.generate_state(1)[0])
+        for child in np.random.SeedSequence(seed).spawn(parts)
+    ]
+
+
+def group_replicates(counts, replicates, seed):
+    """(replicates, groups, statistics) array of group rates, districts
+    resampled with replacement within their group; groups in sorted order"""
+    counts = counts.sort_values("group", kind="stable")
+    codes, _ = pd.factorize(counts["group"], sort=True)
+    sizes = np.bincount(codes)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    values = counts[_COUNTS].to_numpy(dtype=float)
+    rng = np.random.default_rng(seed)
+    batch = max(1, BATCH_DRAWS // max(len(values), 1))
+    results = []
+    for size in split(replicates, -(-replicates // batch)):
+        # One uniform draw picks every resampled row of every replicate
+        picks = starts[codes] + (rng.random((size, len(values))) * sizes[codes]).astype(
+            np.int64
+        )
+        results.append(_rates(np.add.reduceat(values[picks], starts, axis=1)))
+    return np.concatenate(results)
+
+
+def group_intervals(counts, replicates, level=LEVEL):
+    """Pooled rates per group with intervals from ``group_replicates`` output"""
+    sums = counts.groupby("group", sort=True)[_COUNTS].sum()
+    return _table(_rates(sums.to_numpy(dtype=float)), replicates, level, sums.index)
+
+
+def _wilson(passed, trials, z):
+    """Rate and Wilson score bounds (fractions); NaN where there are no trials"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.minimum(passed, trials) / trials
+        centre = (rate + z**2 / (2 * trials)) / (1 + z**2 / trials)
+        half = z / (1 + z**2 / trials) * np.sqrt(
+            rate * (1 - rate) / trials + z**2 / (4 * trials**2)
+        )
+    return rate, centre - half, centre + half
+
+
+def district_intervals(counts, level=LEVEL):
+    """Rates per row of ``counts`` with Wilson score intervals; the gender
+    gap uses Newcombe's hybrid score interval for a difference of rates"""
+    values = counts[_COUNTS].to_numpy(dtype=float)
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+    rates, lows, highs = (
+        np.stack(parts, axis=-1)
+        for parts in zip(*(_wilson(values[:, i], values[:, i + 1], z) for i in (0, 2, 4)))
+    )
+    boys, girls, overall = rates.T
+    gap = boys - girls
+    gap_low = gap - np.hypot(boys - lows[:, 0], highs[:, 1] - girls)
+    gap_high = gap + np.hypot(highs[:, 0] - boys, girls - lows[:, 1])
+
+    table = pd.DataFrame(
+        np.column_stack([boys, girls, gap, overall]) * 100,
+        columns=STATISTICS,
+        index=counts.index,
+    )
+    bounds = {
+        "Boys_Pass_Rate": (lows[:, 0], highs[:, 0]),
+        "Girls_Pass_Rate": (lows[:, 1], highs[:, 1]),
+        "Gender_Gap": (gap_low, gap_high),
+        "Pass_Rate": (lows[:, 2], highs[:, 2]),
+    }
+    for name in STATISTICS:
+        table[f"{name}_Low"] = bounds[name][0] * 100
+        table[f"{name}_High"] = bounds[name][1] * 100
+    return pd.concat([counts[["District", "Year"]], table], axis=1)
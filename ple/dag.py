@@ -0,0 +1,120 @@
+"""
+Computation graph
+Named computations with declared inputs. A node's cache key is built from
+the keys of its inputs alone, so a rerun re-executes only the nodes whose
+inputs changed and reuses the rest without touching their upstream nodes.
+Each ``Run`` records which nodes ran and which were reused.
+"""
+
+from ple.memcache import MISSING, _freeze
+
+
+class Node:
+    def __init__(self, name, func, inputs, kind):
+        self.name = name
+        self.func = func
+        self.inputs = inputs
+        self.kind = kind
+
+
+class Graph:
+    """Registry of nodes; inputs are run parameters or earlier nodes.
+
+    ``opaque`` maps parameters that cannot be keyed by value (frames) to the
+    parameter that identifies them, e.g. ``{"dataset": "data_version"}``.
+    """
+
+    def __init__(self, get_cache, opaque=None):
+        self.get_cache = get_cache
+        self.opaque = dict(opaque or {})
+        self.nodes = {}
+
+    def node(self, name, inputs, kind="object"):
+        """Register ``func`` as node ``name``; the function itself is unchanged"""
+
+        def register(func):
+            if name in self.nodes:
+                raise ValueError(f"node {name!r} already defined")
+            self.nodes[name] = Node(name, func, tuple(inputs), kind)
+            return func
+
+        return register
+
+    def dependencies(self, name):
+        """Run parameters ``name`` depends on, directly or through other nodes"""
+        if name not in self.nodes:
+            return {name}
+        params = set()
+        for upstream in self.nodes[name].inputs:
+            params |= self.dependencies(upstream)
+        return params
+
+    def run(self, **params):
+        return Run(self, params)
+
+
+class Run:
+    """One evaluation context, e.g. one rerun of the script.
+
+    Values passed as parameters take precedence over nodes of the same
+    name, so a caller that already holds a node's result can supply it.
+    """
+
+    def __init__(self, graph, params):
+        self.graph = graph
+        self.params = params
+        self.results = {}
+        self.ran = []
+        self.reused = []
+
+    def update(self, **params):
+        """Add or change parameters, e.g. tab-local widget values.
+
+        Parameters are compared by key, so frames compare by the parameter
+        that identifies them (see ``Graph.opaque``), never by value.
+        """
+        before = {name: self._param_key(name) for name in self.params}
+        self.params.update(params)
+        changed = {
+            name
+            for name in self.params
+            if before.get(name, MISSING) != self._param_key(name)
+        }
+        for name in list(self.results):
+            if self.graph.dependencies(name) & changed:
+                del self.results[name]
+        return self
+
+    def _param_key(self, name):
+        # An opaque parameter whose identifying parameter is missing
+        # cannot be keyed yet
+        ident = self.graph.opaque.get(name, name)
+        return self.key(name) if ident in self.params else MISSING
+
+    def key(self, name):
+        if name in self.params:
+            if name in self.graph.opaque:
+                return (name, _freeze(self.params[self.graph.opaque[name]]))
+            return (name, _freeze(self.params[name]))
+        node = self.graph.nodes.get(name)
+        if node is None:
+            raise KeyError(f"missing parameter {name!r}")
+        return (name,) + tuple(self.key(i) for i in node.inputs)
+
+    def __getitem__(self, name):
+        if name in self.params:
+            return self.params[name]
+        if name in self.results:
+            return self.results[name]
+        node = self.graph.nodes[name]
+        key = self.key(name)
+        cache = self.graph.get_cache()
+        value = cache.get(key)
+        if value is MISSING:
+            value = node.func(*(self[i] for i in node.inputs))
+            cache.put(key, value, node.kind)
+            self.ran.append(name)
+        else:
+            self.reused.append(name)
+        self.results[name] = value
+        return value
@@ -0,0 +1,98 @@
+"""
+District identity
+Integer IDs for districts across digests whose spellings, casing and
+boundaries change between years. Names are normalized (case, punctuation,
+spacing), resolved through an alias table, and municipal councils, cities
+and other areas split off a district keep a link to their parent, so
+cross-year comparisons can join on integers and optionally roll splits up.
+"""
+
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Normalized spelling variants seen in the digests -> preferred spelling
+ALIASES = {
+    "bukwe": "bukwo",
+    "bulisa": "buliisa",
+    "luwero": "luweero",
+    "mitiyana": "mityana",
+    "napakiripirit": "nakapiripirit",
+}
+
+# Areas reported separately from a given year -> district they split from.
+# "<district> m c" and "<district> city" link to <district> without an entry.
+SPLITS = {
+    "fortportal": "kabarole",
+    "kira m c": "wakiso",
+    "nansana m c": "wakiso",
+    "entebbe m c": "wakiso",
+    "makindye": "wakiso",
+    "ssabagabo": "wakiso",
+    "njeru m c": "buikwe",
+    "lugazi m c": "buikwe",
+}
+
+_SEPARATORS = re.compile(r"[^0-9a-z]+")
+_SUFFIX = re.compile(r"^(.*?) (m c|city)$")
+
+
+def normalize(name, aliases=ALIASES):
+    """Canonical key of a district name: folded, aliased spelling"""
+    key = _SEPARATORS.sub(" ", str(name).casefold()).strip()
+    match = _SUFFIX.match(key)
+    if match:
+        base, suffix = match.groups()
+        return f"{aliases.get(base, base)} {suffix}"
+    return aliases.get(key, key)
+
+
+class DistrictRegistry:
+    """Process-wide name -> ID table; IDs are assigned on first sight.
+
+    Raw spellings are cached, so mapping a column costs one dictionary
+    lookup per distinct name.
+    """
+
+    def __init__(self, aliases=None, splits=None):
+        self.aliases = dict(ALIASES if aliases is None else aliases)
+        self.splits = dict(SPLITS if splits is None else splits)
+        self._keys = {}
+        self._spellings = {}
+        self._parents = []
+        self._lock = threading.Lock()
+
+    def _id(self, key):
+        existing = self._keys.get(key)
+        if existing is not None:
+            return existing
+        match = _SUFFIX.match(key)
+        parent_key = self.splits.get(key) or (match.group(1) if match else None)
+        new = len(self._parents)
+        self._keys[key] = new
+        self._parents.append(new)
+        if parent_key is not None:
+            self._parents[new] = self._id(parent_key)
+        return new
+
+    def id(self, name):
+        """ID of a raw district name"""
+        cached = self._spellings.get(name)
+        if cached is None:
+            with self._lock:
+                cached = self._spellings[name] = self._id(normalize(name, self.aliases))
+        return cached
+
+    def ids(self, names):
+        """IDs for a column of names (-1 for missing values)"""
+        codes, uniques = pd.factorize(pd.Series(names))
+        lookup = np.array([self.id(name) for name in uniques] + [-1], dtype=np.int32)
+        return lookup[codes]
+
+    def parents(self, ids):
+        """Map split-off areas to the district they were part of"""
+        ids = np.asarray(ids)
+        parents = np.array(self._parents + [-1], dtype=np.int32)
+        return parents[ids]
@@ -0,0 +1,185 @@
+"""
+PLE workbook reader
+Streams every sheet of an XLSX digest in read-only mode (or with the
+calamine engine when installed) and keeps a columnar copy of each sheet,
+keyed by the workbook's content hash, so a workbook is parsed once per
+change rather than on every load.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import python_calamine  # noqa: F401
+
+    # pandas gained the calamine engine in 2.2
+    HAS_CALAMINE = tuple(int(part) for part in pd.__version__.split(".")[:2]) >= (2, 2)
+except ImportError:
+    HAS_CALAMINE = False
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get(
+    "PLE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "ple")
+)
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:32]
+
+
+def _stream_sheets(path):
+    """Yield ``(sheet name, frame)`` using openpyxl's streaming reader"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                yield sheet.title, pd.DataFrame()
+                continue
+            columns = [
+                name if name is not None else f"Unnamed: {i}"
+                for i, name in enumerate(header)
+            ]
+            yield sheet.title, pd.DataFrame.from_records(list(rows), columns=columns)
+    finally:
+        workbook.close()
+
+
+def parse_workbook(path):
+    """Parse every sheet of a workbook into ``{sheet name: frame}``"""
+    if HAS_CALAMINE:
+        return pd.read_excel(path, sheet_name=None, engine="calamine")
+    if path.lower().endswith(".xls"):
+        return pd.read_excel(path, sheet_name=None)
+    return dict(_stream_sheets(path))
+
+
+def _columnar(df):
+    """Make object columns Arrow-friendly without losing numeric values"""
+    df = df.copy()
+    df.columns = [str(c) for c in df.columns]
+    for col in df.columns[df.dtypes == object]:
+        numeric = pd.to_numeric(df[col], errors="coerce")
+        if numeric.notna().sum() == df[col].notna().sum():
+            df[col] = numeric
+        else:
+            df[col] = df[col].map(lambda v: v if v is None or pd.isna(v) else str(v))
+    return df
+
+
+def _load_index(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, "index.json")) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_index(cache_dir, index):
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "w") as handle:
+        json.dump(index, handle)
+    os.replace(tmp_path, os.path.join(cache_dir, "index.json"))
+
+
+def _save_sheets(sheets_dir, tables):
+    """Publish a workbook's sheet tables as ``sheets_dir`` in one rename.
+
+    Files are written into a private directory first, so concurrent first
+    reads never map a half-written sheet or see a partial listing; when
+    another process published first, its copy is kept.
+    """
+    parent = os.path.dirname(sheets_dir)
+    tmp_dir = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+    try:
+        for i, table in enumerate(tables.values()):
+            with pa.OSFile(os.path.join(tmp_dir, f"{i}.arrow"), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        with open(os.path.join(tmp_dir, "sheets.json"), "w") as handle:
+            json.dump(list(tables), handle)
+        os.replace(tmp_dir, sheets_dir)
+    except OSError as e:
+        # The sheets parsed here are still returned, just not cached
+        if not os.path.exists(os.path.join(sheets_dir, "sheets.json")):
+            logger.warning("could not cache workbook sheets in %s: %s", sheets_dir, e)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def read_workbook(path, cache_dir=None):
+    """All sheets of a workbook as ``{sheet name: frame}``, via the columnar cache.
+
+    The file is hashed only when its mtime or size changed since the last
+    read; an unchanged hash reuses the cached sheets without parsing.
+    """
+    cache_dir = cache_dir or os.path.join(CACHE_DIR, "xlsx")
+    os.makedirs(cache_dir, exist_ok=True)
+    stat = os.stat(path)
+    index = _load_index(cache_dir)
+    key = os.path.abspath(path)
+    entry = index.get(key)
+
+    if entry and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+        digest = entry["digest"]
+    else:
+        digest = _file_digest(path)
+
+    sheets_dir = os.path.join(cache_dir, digest)
+    listing = os.path.join(sheets_dir, "sheets.json")
+    if os.path.exists(listing):
+        with open(listing) as handle:
+            names = json.load(handle)
+        sheets = {}
+        for i, name in enumerate(names):
+            with pa.memory_map(os.path.join(sheets_dir, f"{i}.arrow")) as source:
+                sheets[name] = pa.ipc.open_file(source).read_pandas()
+    else:
+        # Sheets come back through Arrow on every path, so a first read has
+        # the same columns and dtypes as a cached one
+        tables = {
+            name: pa.Table.from_pandas(_columnar(df), preserve_index=False)
+            for name, df in parse_workbook(path).items()
+        }
+        _save_sheets(sheets_dir, tables)
+        sheets = {name: table.to_pandas() for name, table in tables.items()}
+
+    if entry is None or entry.get("digest") != digest or entry["mtime_ns"] != stat.st_mtime_ns:
+        index[key] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "digest": digest,
+        }
+        _save_index(cache_dir, index)
+    return sheets
+
+
+def read_excel_source(path, sheet=None):
+    """Raw frame from a workbook: one named sheet, or every district-level
+    sheet (those with a District or Area column) stacked together"""
+    sheets = read_workbook(path)
+    if sheet is not None:
+        return sheets[sheet]
+    district_sheets = [
+        df
+        for df in sheets.values()
+        if any(str(c) in ("District", "Area") for c in df.columns)
+    ]
+    if not district_sheets:
+        return next(iter(sheets.values()))
+    return pd.concat(district_sheets, ignore_index=True, sort=False)
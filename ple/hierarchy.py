@@ -0,0 +1,89 @@
+"""
+Geography hierarchy index
+Observed combinations of the geography levels (Zone, Sub Region, District,
+and any finer levels added later) per year, precomputed so that dependent
+option lists and emptiness checks are dictionary lookups. The data is not
+strictly hierarchical (a Sub Region can span Zones, and 2025 has no Zone),
+so options are derived from the combinations that actually occur rather
+than from an assumed tree.
+"""
+
+import itertools
+
+import pandas as pd
+
+ALL = "All"
+
+
+def _value(value):
+    return None if pd.isna(value) else value
+
+
+class HierarchyIndex:
+    """Row counts and child options for every prefix of ``levels``.
+
+    Selections are tuples aligned with ``levels``; ``"All"`` (or ``None``)
+    leaves a level unconstrained.
+    """
+
+    def __init__(self, data, levels, year_col="Year"):
+        self.levels = tuple(level for level in levels if level in data.columns)
+        has_year = year_col in data.columns
+        columns = ([year_col] if has_year else []) + list(self.levels)
+        paths = data.groupby(columns, dropna=False, sort=False).size()
+        self.years = (
+            sorted(data[year_col].dropna().unique().tolist(), reverse=True)
+            if has_year
+            else []
+        )
+        # year -> masked path -> rows; year -> (level, masked prefix) -> values
+        self._counts = {}
+        self._children = {}
+        self._merged = {}
+        width = len(self.levels)
+        for key, rows in paths.items():
+            key = key if isinstance(key, tuple) else (key,)
+            year = _value(key[0]) if has_year else None
+            path = tuple(_value(v) for v in key[len(key) - width :])
+            counts = self._counts.setdefault(year, {})
+            children = self._children.setdefault(year, {})
+            # A missing value already reads as "All"; count each mask once
+            masks = {
+                tuple(v if keep else None for v, keep in zip(path, mask))
+                for mask in itertools.product((False, True), repeat=width)
+            }
+            for masked in masks:
+                counts[masked] = counts.get(masked, 0) + int(rows)
+                for depth, value in enumerate(path):
+                    if value is not None:
+                        children.setdefault((depth, masked[:depth]), set()).add(value)
+
+    def _normalize(self, selection):
+        selection = tuple(selection) + (ALL,) * (len(self.levels) - len(selection))
+        return tuple(None if v == ALL else v for v in selection)
+
+    def _years(self, years):
+        if not years:
+            return tuple(self._counts)
+        return tuple(y for y in years if y in self._counts)
+
+    def options(self, level, selection=(), years=None):
+        """Sorted values of ``level`` under the selections of the levels above it"""
+        depth = self.levels.index(level)
+        prefix = self._normalize(selection)[:depth]
+        key = (depth, prefix, tuple(sorted(self._years(years), key=repr)))
+        options = self._merged.get(key)
+        if options is None:
+            values = set()
+            for year in key[2]:
+                values |= self._children[year].get((depth, prefix), set())
+            options = self._merged[key] = sorted(values)
+        return options
+
+    def count(self, selection=(), years=None):
+        """Rows matching ``selection`` in ``years`` (all years if empty)"""
+        masked = self._normalize(selection)
+        return sum(self._counts[year].get(masked, 0) for year in self._years(years))
+
+    def exists(self, selection=(), years=None):
+        return self.count(selection, years) > 0
@@ -0,0 +1,303 @@
+"""
+PLE data ingestion
+Fetch and parse many sources (sheet tabs, local CSV/Excel files) at once,
+and append a new results year, or a batch of corrected district rows, to a
+partitioned dataset without reprocessing the years already stored.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import requests
+from requests.adapters import HTTPAdapter
+
+from ple import processing
+from ple.offload import OffloadError, process_context
+from ple.storage import (
+    delete_partitions,
+    read_partitioned,
+    read_source,
+    read_summary,
+    summarize_partitions,
+    summary_schema,
+    write_arrow,
+    write_partition_files,
+    write_partitioned,
+    write_summary,
+)
+
+# Rows in a batch replace stored rows with the same values in these columns
+REPLACE_KEYS = ("Year", "District")
+
+# CSV export of a public sheet tab; override to point at a mirror or stub
+SHEET_EXPORT_URL = os.environ.get(
+    "PLE_SHEET_EXPORT_URL",
+    "https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:csv&sheet={sheet_name}",
+)
+
+
+class SourceError(RuntimeError):
+    """Raised when one source of a manifest cannot be fetched or parsed"""
+
+
+def sheet_export_url(sheet_id, sheet_name="Sheet1"):
+    """CSV export URL of one tab of a public Google Sheet"""
+    return SHEET_EXPORT_URL.format(sheet_id=sheet_id, sheet_name=quote(sheet_name))
+
+
+def load_manifest(path):
+    """Read a JSON manifest: a list of sources, or ``{"sources": [...]}``.
+
+    Each source is ``{"sheet_id": ..., "sheet_name": ...}`` for a sheet tab
+    or ``{"path": ..., "sheet": ...}`` for a local file (relative paths are
+    resolved against the manifest). ``"columns"`` adds constant columns,
+    e.g. ``{"Year": 2023}`` for a per-year digest without a Year column.
+    """
+    with open(path) as handle:
+        manifest = json.load(handle)
+    sources = manifest["sources"] if isinstance(manifest, dict) else manifest
+    base = os.path.dirname(os.path.abspath(path))
+    for source in sources:
+        if "path" in source:
+            source["path"] = os.path.join(base, source["path"])
+    return sources
+
+
+def source_label(source):
+    if "path" in source:
+        label = os.path.basename(source["path"])
+        return f"{label} [{source['sheet']}]" if source.get("sheet") else label
+    return f"sheet {source['sheet_id']} [{source.get('sheet_name', 'Sheet1')}]"
+
+
+def clean_file_source(source):
+    """Worker task: parse and clean one local file"""
+    raw = read_source(source["path"], source.get("sheet"))
+    return processing.clean_and_process_data(raw.assign(**source.get("columns", {})))
+
+
+def clean_sheet_content(content, columns=None):
+    """Worker task: parse and clean one downloaded sheet tab"""
+    raw = pd.read_csv(io.BytesIO(content))
+    return processing.clean_and_process_data(raw.assign(**(columns or {})))
+
+
+async def _clean(loop, workers, threads, func, *args):
+    try:
+        return await loop.run_in_executor(workers, func, *args)
+    except OffloadError:
+        # Shared pool saturated or a worker died: clean on a thread instead
+        return await loop.run_in_executor(threads, func, *args)
+
+
+async def _load_source(source, loop, session, threads, workers, timeout):
+    try:
+        if "path" in source:
+            return await _clean(loop, workers, threads, clean_file_source, source)
+        url = sheet_export_url(source["sheet_id"], source.get("sheet_name", "Sheet1"))
+        response = await loop.run_in_executor(
+            threads, partial(session.get, url, timeout=timeout)
+        )
+        response.raise_for_status()
+        return await _clean(
+            loop, workers, threads, clean_sheet_content, response.content, source.get("columns")
+        )
+    except Exception as e:
+        raise SourceError(f"{source_label(source)}: {e}") from e
+
+
+async def load_sources_async(
+    sources, max_connections=8, max_workers=None, timeout=60, workers=None
+):
+    """Fetch every source concurrently and return their cleaned frames in order.
+
+    Remote tabs share one pooled HTTP session; parsing and cleaning run in
+    a process pool so large files are handled in parallel. ``workers`` is
+    an existing pool to use (e.g. the app's ``OffloadExecutor``); without
+    one a pool of ``max_workers`` processes is started for this call.
+    """
+    loop = asyncio.get_running_loop()
+    adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+    with ExitStack() as stack:
+        session = stack.enter_context(requests.Session())
+        threads = stack.enter_context(ThreadPoolExecutor(max_connections))
+        if workers is None:
+            workers = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers, mp_context=process_context(["ple.processing", "ple.storage"])
+                )
+            )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return await asyncio.gather(
+            *(
+                _load_source(source, loop, session, threads, workers, timeout)
+                for source in sources
+            )
+        )
+
+
+def combine_sources(frames, dedupe_keys=REPLACE_KEYS):
+    """Align cleaned frames to one schema and stack them.
+
+    Counts missing from a source are 0, as cleaning does for blank cells.
+    Where sources overlap on ``dedupe_keys`` the later source wins.
+    """
+    combined = pd.concat(
+        [f for f in frames if f is not None], ignore_index=True, sort=False
+    )
+    numeric = combined.select_dtypes("number").columns
+    combined[numeric] = combined[numeric].fillna(0)
+    keys = [k for k in dedupe_keys if k in combined.columns]
+    if keys:
+        combined = combined.drop_duplicates(keys, keep="last", ignore_index=True)
+    return combined
+
+
+def ingest_sources(sources, **options):
+    """Load, clean and combine a list of sources (see ``load_manifest``)"""
+    return combine_sources(asyncio.run(load_sources_async(sources, **options)))
+
+
+def align_to_schema(df, schema):
+    """Reorder and cast a cleaned batch to the stored dataset's schema"""
+    df = df.copy()
+    for field in schema:
+        if field.name in df.columns:
+            continue
+        # Cleaning fills missing counts with 0; match that for absent columns
+        numeric = pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+        df[field.name] = 0 if numeric else None
+    return pa.Table.from_pandas(
+        df[schema.names], schema=schema, preserve_index=False, safe=False
+    )
+
+
+def _partition_key(entry):
+    return tuple(sorted(entry["values"].items(), key=str))
+
+
+def ingest_batch(raw, root, replace_keys=REPLACE_KEYS):
+    """Clean ``raw`` on its own and merge it into the partitioned dataset.
+
+    Only partitions that receive rows or lose replaced ones are rewritten
+    (partitions left empty are deleted), and only their summary entries get
+    new versions; caches keyed on the versions of other partitions stay
+    valid. Returns the updated summary.
+    """
+    summary = read_summary(root)
+    if summary is None:
+        raise FileNotFoundError(f"{root} is not a partitioned PLE dataset")
+    partition_cols = summary["partition_cols"]
+    schema = summary_schema(summary)
+
+    # Cleaning is row-wise, so a batch cleans the same on its own as in
+    # the full dataset
+    batch = align_to_schema(
+        processing.clean_and_process_data(raw), schema
+    ).to_pandas()
+    touched = batch[partition_cols].drop_duplicates()
+    keys = [k for k in replace_keys if k in batch.columns]
+
+    # A replaced row can sit in any partition sharing the batch's key values,
+    # under another Zone or a null one, so read all of them
+    selected = {
+        col: batch[col].unique().tolist()
+        for col in partition_cols
+        if col in keys and batch[col].notna().all()
+    }
+    existing = read_partitioned(root, summary, **selected).reset_index(drop=True)
+    replaced = np.zeros(len(existing), dtype=bool)
+    if keys:
+        matches = existing[keys].merge(
+            batch[keys].drop_duplicates(), on=keys, how="left", indicator=True
+        )
+        replaced = (matches["_merge"] == "both").to_numpy()
+
+    # Rewrite the partitions receiving rows or losing replaced ones
+    changed = pd.concat([touched, existing.loc[replaced, partition_cols]]).drop_duplicates()
+    kept = existing[~replaced]
+    if partition_cols:
+        kept = kept.merge(changed, on=partition_cols, how="inner")
+    combined = pd.concat([kept, batch], ignore_index=True)
+    write_partition_files(align_to_schema(combined, schema), root, partition_cols)
+
+    written = summarize_partitions(combined, partition_cols)
+    emptied = {
+        _partition_key(e) for e in summarize_partitions(changed, partition_cols)
+    } - {_partition_key(e) for e in written}
+    delete_partitions(root, summary, emptied)
+
+    entries = {_partition_key(p): p for p in summary["partitions"]}
+    for key in emptied:
+        entries.pop(key, None)
+    for entry in written:
+        entries[_partition_key(entry)] = entry
+    summary["partitions"] = sorted(
+        entries.values(), key=lambda p: [str(v) for v in p["values"].values()]
+    )
+    return write_summary(root, summary)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest PLE results")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    append = commands.add_parser(
+        "append", help="Append or correct rows in a partitioned dataset"
+    )
+    append.add_argument("source", help="CSV or Excel file with the new rows")
+    append.add_argument("root", help="Partitioned dataset directory")
+
+    manifest = commands.add_parser(
+        "manifest", help="Load every source of a manifest into one dataset"
+    )
+    manifest.add_argument("manifest", help="JSON manifest of sources")
+    manifest.add_argument(
+        "output", help="Arrow file, or directory for a year-partitioned dataset"
+    )
+    manifest.add_argument("--connections", type=int, default=8)
+    manifest.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "manifest":
+        combined = ingest_sources(
+            load_manifest(args.manifest),
+            max_connections=args.connections,
+            max_workers=args.workers,
+        )
+        if args.output.endswith(".arrow"):
+            write_arrow(combined, args.output)
+        else:
+            write_partitioned(combined, args.output)
+        print(f"wrote {len(combined):,} rows to {args.output}")
+        return
+
+    summary = read_summary(args.root)
+    if summary is None:
+        parser.error(
+            f"{args.root} is not a partitioned PLE dataset; create it with "
+            "python -m ple.storage partition SOURCE ROOT"
+        )
+    before = {_partition_key(p): p["version"] for p in summary["partitions"]}
+    summary = ingest_batch(read_source(args.source), args.root)
+    changed = [
+        p["values"]
+        for p in summary["partitions"]
+        if before.get(_partition_key(p)) != p["version"]
+    ]
+    print(f"updated {len(changed)} partition(s): {changed}")
+
+
+if __name__ == "__main__":
+    main()
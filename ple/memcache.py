@@ -0,0 +1,94 @@
+"""
+Memory-budgeted cache
+A process-wide LRU for derived frames, summaries, figures and exports.
+Values are stored pickled, like ``st.cache_data``, so every hit returns a
+private copy and each entry's size is known exactly; the least recently
+used entries are evicted once the total exceeds the byte budget.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+MISSING = object()
+
+
+def _freeze(value):
+    """Hashable form of a cache-key argument (lists from widgets, dicts)"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_freeze(v) for v in value), key=repr))
+    return value
+
+
+class BudgetCache:
+    """Thread-safe LRU of pickled values bounded by total size in bytes"""
+
+    def __init__(self, budget_bytes, ttl=None):
+        self.budget_bytes = int(budget_bytes)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "rejected": 0}
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry["payload"])
+
+    def get(self, key):
+        """Cached value for ``key`` (a fresh copy), or ``MISSING``"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires"] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            payload = entry["payload"]
+        return pickle.loads(payload)
+
+    def put(self, key, value, kind="object", ttl=None):
+        """Store ``value``; entries larger than the whole budget are not kept"""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        ttl = ttl if ttl is not None else self.ttl
+        expires = time.monotonic() + ttl if ttl is not None else float("inf")
+        with self._lock:
+            if len(payload) > self.budget_bytes:
+                self._stats["rejected"] += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {"payload": payload, "kind": kind, "expires": expires}
+            self._bytes += len(payload)
+            while self._bytes > self.budget_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def usage(self):
+        """Bytes and entries in use, overall and per kind, plus hit counters"""
+        with self._lock:
+            by_kind = {}
+            for entry in self._entries.values():
+                kind = by_kind.setdefault(entry["kind"], {"entries": 0, "bytes": 0})
+                kind["entries"] += 1
+                kind["bytes"] += len(entry["payload"])
+            return {
+                "bytes": self._bytes,
+                "budget_bytes": self.budget_bytes,
+                "entries": len(self._entries),
+                "by_kind": by_kind,
+                **self._stats,
+            }
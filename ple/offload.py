@@ -0,0 +1,318 @@
+"""
+Process-pool offload
+Runs heavy pipeline stages outside the Streamlit server process. Frames
+travel through shared memory as Arrow IPC streams instead of being pickled.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import pandas as pd
+import pyarrow as pa
+
+
+class OffloadError(RuntimeError):
+    """Raised when a task cannot be handed to the pool"""
+
+
+class OffloadQueueFull(OffloadError):
+    """Raised when the pool already has the maximum number of pending tasks"""
+
+
+class OffloadTimeout(OffloadError, TimeoutError):
+    """Raised when a task does not finish within the timeout"""
+
+
+class OffloadPoolBroken(OffloadError):
+    """Raised when a worker process died; later tasks get a fresh pool"""
+
+
+def frame_to_shared(df):
+    """Write a frame into a new shared memory block.
+
+    Returns ``(shm, handle)``; the caller owns ``shm`` and must unlink it.
+    Columns are sent positionally so duplicate or non-string labels survive.
+    """
+    labels = list(df.columns)
+    positional = df.set_axis([str(i) for i in range(len(labels))], axis=1)
+    table = pa.Table.from_pandas(positional)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    payload = sink.getvalue()
+
+    shm = shared_memory.SharedMemory(create=True, size=max(payload.size, 1))
+    shm.buf[: payload.size] = payload.to_pybytes()
+    return shm, {"name": shm.name, "size": payload.size, "columns": labels}
+
+
+def _detached(column):
+    # Concatenation allocates new buffers, so the column stops pointing
+    # into the shared block
+    return pa.chunked_array([pa.concat_arrays(column.chunks + [pa.nulls(0, column.type)])])
+
+
+def _frame_from_buffer(buffer):
+    table = pa.ipc.open_stream(buffer).read_all()
+    # Fixed-width columns are copied by the conversion to pandas anyway;
+    # strings and dictionaries would stay Arrow-backed views of the block
+    columns = [
+        col if pa.types.is_primitive(col.type) else _detached(col)
+        for col in table.columns
+    ]
+    return pa.Table.from_arrays(columns, schema=table.schema).to_pandas()
+
+
+def frame_from_shared(handle):
+    """Read a frame written by ``frame_to_shared``, in place from the block"""
+    shm = shared_memory.SharedMemory(name=handle["name"])
+    try:
+        df = _frame_from_buffer(pa.py_buffer(shm.buf[: handle["size"]]))
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            # A failed read still holds views; the block closes on collection
+            pass
+    return df.set_axis(handle["columns"], axis=1)
+
+
+def _run_task(func, handle, args, kwargs):
+    """Worker entry point: load the input frame, run ``func``, share a frame result"""
+    df = frame_from_shared(handle)
+    result = func(df, *args, **kwargs)
+    if isinstance(result, pd.DataFrame):
+        # The parent unlinks the block once it has read the result
+        shm, out = frame_to_shared(result)
+        shm.close()
+        return ("frame", out)
+    return ("value", result)
+
+
+def _release(handle):
+    try:
+        shm = shared_memory.SharedMemory(name=handle["name"])
+    except FileNotFoundError:
+        return
+    _unlink(shm)
+
+
+def _unlink(shm):
+    shm.close()
+    shm.unlink()
+
+
+def process_context(preload):
+    """Multiprocessing context for worker pools started from the app.
+
+    Workers fork from a clean forkserver that has imported only ``preload``,
+    never the Streamlit script or its threads.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(preload)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class OffloadExecutor:
+    """Bounded process pool for frame-in, frame-or-value-out tasks.
+
+    Timeouts and dead workers raise ``OffloadError`` subclasses so callers
+    can fall back to running in-process; a broken pool is replaced.
+    """
+
+    def __init__(self, max_workers=2, max_pending=8, timeout=120):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool = self._new_pool()
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "rejected": 0,
+            "restarts": 0,
+            "in_flight": 0,
+            "peak_in_flight": 0,
+            "busy_seconds": 0.0,
+        }
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=process_context(
+                ["ple.processing", "ple.bootstrap", "ple.ingest", "ple.offload"]
+            ),
+        )
+
+    def _replace_pool(self, broken):
+        """Swap in a fresh pool unless another caller already has"""
+        with self._lock:
+            if self._pool is not broken:
+                return
+            self._pool = self._new_pool()
+            self._stats["restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def metrics(self):
+        """Snapshot of pool counters; ``queue_depth`` counts tasks waiting for a worker"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = max(stats["in_flight"] - self.max_workers, 0)
+        stats["max_workers"] = self.max_workers
+        stats["max_pending"] = self.max_pending
+        return stats
+
+    def _reserve(self, tasks):
+        with self._lock:
+            if self._stats["in_flight"] + tasks > self.max_pending:
+                self._stats["rejected"] += tasks
+                raise OffloadQueueFull(
+                    f"{self._stats['in_flight']} tasks already pending"
+                )
+            self._stats["submitted"] += tasks
+            self._stats["in_flight"] += tasks
+            self._stats["peak_in_flight"] = max(
+                self._stats["peak_in_flight"], self._stats["in_flight"]
+            )
+
+    def _wait(self, future, func, timeout):
+        """Result of ``future``, reading a shared frame result back"""
+        try:
+            kind, result = future.result(timeout=timeout or self.timeout)
+        except FutureTimeout:
+            raise OffloadTimeout(
+                f"{getattr(func, '__name__', func)} did not finish in "
+                f"{timeout or self.timeout}s"
+            ) from None
+        if kind == "frame":
+            result_handle = result
+            try:
+                result = frame_from_shared(result_handle)
+            finally:
+                _release(result_handle)
+        return result
+
+    def submit(self, func, *args, **kwargs):
+        """Submit ``func(*args, **kwargs)``, which takes no shared frame, and
+        return its future (so the pool can back ``loop.run_in_executor``).
+
+        Counts towards ``max_pending`` like ``map``. A dead worker fails the
+        future with ``OffloadPoolBroken`` and replaces the pool.
+        """
+        self._reserve(1)
+        started = time.perf_counter()
+        pool = self._pool
+        try:
+            inner = pool.submit(func, *args, **kwargs)
+        except BrokenProcessPool as e:
+            self._settle([], 0, 1, 0, None, started)
+            self._replace_pool(pool)
+            raise OffloadPoolBroken(f"worker process died: {e}") from e
+        outer = Future()
+
+        def finish(inner):
+            error = None if inner.cancelled() else inner.exception()
+            self._settle([], 0 if inner.cancelled() or error else 1, 1, 0, None, started)
+            if isinstance(error, BrokenProcessPool):
+                self._replace_pool(pool)
+                error = OffloadPoolBroken(f"worker process died: {error}")
+            if not outer.set_running_or_notify_cancel():
+                return
+            if inner.cancelled():
+                error = OffloadError("task was cancelled")
+            if error is not None:
+                outer.set_exception(error)
+            else:
+                outer.set_result(inner.result())
+
+        inner.add_done_callback(finish)
+        return outer
+
+    def run(self, func, df, *args, timeout=None, **kwargs):
+        """Run ``func(df, *args, **kwargs)`` in a worker and wait for the result"""
+        return self.map(func, df, [args], timeout=timeout, **kwargs)[0]
+
+    def map(self, func, df, arguments, timeout=None, **kwargs):
+        """Run ``func(df, *args, **kwargs)`` for each ``args`` tuple in
+        ``arguments`` concurrently and return the results in order.
+
+        ``df`` is written to shared memory once for all tasks, so batches
+        of one computation can be split across workers cheaply.
+        """
+        arguments = list(arguments)
+        self._reserve(len(arguments))
+        started = time.perf_counter()
+        pool = self._pool
+        shm = None
+        futures = []
+        results = []
+        timed_out = 0
+        try:
+            try:
+                shm, handle = frame_to_shared(df)
+            except pa.ArrowException as e:
+                raise OffloadError(f"frame cannot be shared: {e}") from e
+            for args in arguments:
+                futures.append(pool.submit(_run_task, func, handle, args, kwargs))
+            for future in futures:
+                try:
+                    results.append(self._wait(future, func, timeout))
+                except OffloadTimeout:
+                    timed_out = 1
+                    raise
+            return results
+        except BrokenProcessPool as e:
+            self._replace_pool(pool)
+            raise OffloadPoolBroken(f"worker process died: {e}") from e
+        finally:
+            self._settle(futures, len(results), len(arguments), timed_out, shm, started)
+
+    def _settle(self, futures, consumed, tasks, timed_out, shm, started):
+        """Account for the tasks of one ``map`` call and free its blocks.
+
+        Futures whose results were not read (after a timeout or failure)
+        may still be running: they stay in flight, and the input block stays
+        linked, until they finish; a frame they return is released then.
+        """
+        abandoned = futures[consumed:]
+        pending = [len(abandoned)]
+
+        def finish(future):
+            if not future.cancelled() and future.exception() is None:
+                kind, result = future.result()
+                if kind == "frame":
+                    _release(result)
+            with self._lock:
+                self._stats["in_flight"] -= 1
+                pending[0] -= 1
+                last = pending[0] == 0
+            if last and shm is not None:
+                _unlink(shm)
+
+        with self._lock:
+            self._stats["completed"] += consumed
+            self._stats["timed_out"] += timed_out
+            self._stats["failed"] += tasks - consumed - timed_out
+            # Tasks never submitted are settled now, abandoned ones on finish
+            self._stats["in_flight"] -= tasks - len(abandoned)
+            self._stats["busy_seconds"] += time.perf_counter() - started
+        if not abandoned:
+            if shm is not None:
+                _unlink(shm)
+            return
+        for future in abandoned:
+            future.cancel()
+            future.add_done_callback(finish)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
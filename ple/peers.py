@@ -0,0 +1,188 @@
+"""
+Peer groups
+Nearest-neighbour lookup of similar districts. Each district-year is a
+feature vector (size, division profile, gender mix, absenteeism),
+standardized across the dataset; a KD-tree per year, built once per dataset
+version, returns the k districts closest to any district in that year.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+# Rows per KD-tree leaf; leaves are searched with one vectorized distance
+LEAF_SIZE = 64
+
+# Feature -> (numerator columns, denominator column); no denominator means
+# log10 of the numerator
+FEATURES = {
+    "Size (log10 registered)": (["Registered - Total"], None),
+    "Division 1 Share": (["Division 1 - Total"], "Registered - Total"),
+    "Division 2 Share": (["Division 2 - Total"], "Registered - Total"),
+    "Division 3 Share": (["Division 3 - Total"], "Registered - Total"),
+    "Division 4 Share": (["Division 4 - Total"], "Registered - Total"),
+    "Division U Share": (["Division U - Total"], "Registered - Total"),
+    "Girls Share": (["Registered - Girls"], "Registered - Total"),
+    "Absent Share": (["Division X - Total"], "Registered - Total"),
+}
+
+
+class KDTree:
+    """Static KD-tree over the rows of ``points`` for k-nearest queries.
+
+    Nodes split the widest dimension of their bounding box at the median;
+    queries visit nodes nearest-box first and stop once no box can hold a
+    closer point than the current k-th.
+    """
+
+    def __init__(self, points, leaf_size=LEAF_SIZE):
+        self.points = np.asarray(points, dtype=float)
+        self.order = np.arange(len(self.points))
+        # Per node: row range in ``order``, bounding box, children (-1 = leaf)
+        self.start, self.stop, self.lower, self.upper = [], [], [], []
+        self.children = []
+        if len(self.points):
+            self._build(0, len(self.points), leaf_size)
+        self.lower = np.array(self.lower)
+        self.upper = np.array(self.upper)
+
+    def _build(self, start, stop, leaf_size):
+        node = len(self.start)
+        rows = self.points[self.order[start:stop]]
+        self.start.append(start)
+        self.stop.append(stop)
+        self.lower.append(rows.min(axis=0))
+        self.upper.append(rows.max(axis=0))
+        self.children.append((-1, -1))
+        spread = self.upper[node] - self.lower[node]
+        if stop - start <= leaf_size or not spread.any():
+            return node
+        dim = int(np.argmax(spread))
+        middle = (start + stop) // 2
+        part = np.argpartition(rows[:, dim], middle - start)
+        self.order[start:stop] = self.order[start:stop][part]
+        left = self._build(start, middle, leaf_size)
+        right = self._build(middle, stop, leaf_size)
+        self.children[node] = (left, right)
+        return node
+
+    def _box_distance(self, node, x):
+        gap = np.maximum(self.lower[node] - x, 0) + np.maximum(x - self.upper[node], 0)
+        return float(gap @ gap)
+
+    def query(self, x, k):
+        """Positions and Euclidean distances of the ``k`` rows nearest ``x``"""
+        x = np.asarray(x, dtype=float)
+        k = min(k, len(self.points))
+        if k <= 0:
+            return np.empty(0, dtype=int), np.empty(0)
+        best_rows = np.empty(0, dtype=int)
+        best = np.empty(0)
+        queue = [(self._box_distance(0, x), 0)]
+        while queue:
+            bound, node = heapq.heappop(queue)
+            if len(best) == k and bound > best[-1]:
+                break
+            left, right = self.children[node]
+            if left >= 0:
+                for child in (left, right):
+                    heapq.heappush(queue, (self._box_distance(child, x), child))
+                continue
+            rows = self.order[self.start[node] : self.stop[node]]
+            diff = self.points[rows] - x
+            dist = np.einsum("ij,ij->i", diff, diff)
+            if len(best) == k:
+                # Only rows closer than the current k-th can enter
+                closer = dist < best[-1]
+                if not closer.any():
+                    continue
+                rows, dist = rows[closer], dist[closer]
+            rows = np.concatenate([best_rows, rows])
+            dist = np.concatenate([best, dist])
+            keep = np.argsort(dist, kind="stable")[:k]
+            best_rows, best = rows[keep], dist[keep]
+        return best_rows, np.sqrt(best)
+
+
+def features(data):
+    """Feature vectors of the rows of ``data`` (NaN where undefined)"""
+    columns = {}
+    for name, (numerators, denominator) in FEATURES.items():
+        needed = numerators + ([denominator] if denominator else [])
+        if not all(col in data.columns for col in needed):
+            continue
+        top = data[numerators].to_numpy(dtype=float).sum(axis=1)
+        if denominator is None:
+            columns[name] = np.log10(np.where(top > 0, top, np.nan))
+        else:
+            bottom = data[denominator].to_numpy(dtype=float)
+            columns[name] = np.divide(
+                top, bottom, out=np.full(len(data), np.nan), where=bottom > 0
+            )
+    return pd.DataFrame(columns, index=data.index)
+
+
+class PeerIndex:
+    """Nearest peers of each district among the districts of the same year.
+
+    Features are standardized over the whole dataset so each counts
+    equally; rows with an undefined feature are left out of the index. Only
+    ``columns`` (default: District and the feature inputs) are kept for
+    ``compare``, so the index does not hold on to the dataset.
+    """
+
+    def __init__(self, data, year_col="Year", columns=None):
+        if columns is None:
+            columns = ["District"] + [
+                col
+                for numerators, denominator in FEATURES.values()
+                for col in numerators + [denominator]
+                if col is not None
+            ]
+        self._table = data[[col for col in dict.fromkeys(columns) if col in data.columns]].copy()
+        self.features = features(data)
+        values = self.features.to_numpy()
+        scale = np.nanstd(values, axis=0)
+        scale = np.where(scale > 0, scale, 1)
+        self._scaled = (values - np.nanmean(values, axis=0)) / scale
+        complete = ~np.isnan(self._scaled).any(axis=1)
+        years = (
+            data[year_col].to_numpy()
+            if year_col in data.columns
+            else np.zeros(len(data), dtype=int)
+        )
+        self._years = years
+        self._trees = {}
+        self._rows = {}
+        for year in pd.unique(years[complete]):
+            rows = np.flatnonzero(complete & (years == year))
+            self._rows[year] = rows
+            self._trees[year] = KDTree(self._scaled[rows])
+
+    def peers(self, row, k):
+        """The ``k`` nearest districts to dataset row ``row`` (an index
+        label) in its year, nearest first, with their feature distance"""
+        position = self.features.index.get_loc(row)
+        year = self._years[position]
+        tree = self._trees.get(year)
+        if tree is None or np.isnan(self._scaled[position]).any():
+            return pd.Series(dtype=float, name="Distance")
+        # One extra neighbour: the district itself is at distance zero
+        found, distance = tree.query(self._scaled[position], k + 1)
+        positions = self._rows[year][found]
+        keep = positions != position
+        return pd.Series(
+            distance[keep][:k],
+            index=self.features.index[positions[keep][:k]],
+            name="Distance",
+        )
+
+    def compare(self, row, k, columns):
+        """``columns`` of row ``row`` followed by its ``k`` nearest peers,
+        with a Distance column (0 for the district itself); ``columns`` must
+        have been kept when the index was built"""
+        distance = pd.concat([pd.Series([0.0], index=[row]), self.peers(row, k)])
+        group = self._table.loc[distance.index, columns].copy()
+        group["Distance"] = distance.to_numpy()
+        return group
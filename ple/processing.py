@@ -0,0 +1,306 @@
+"""
+PLE data processing
+Cleaning, aggregation and export steps that can run in any process
+"""
+
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+
+def clean_and_process_data(df):
+    """Clean and calculate metrics for PLE data"""
+    if df is None:
+        return None
+
+    df = df.copy()
+
+    # Remove empty rows
+    df = df.dropna(how="all")
+
+    # Reset index to avoid duplicate index issues
+    df = df.reset_index(drop=True)
+
+    # Fix duplicate column names by adding suffix
+    cols = pd.Series(df.columns)
+    for dup in cols[cols.duplicated()].unique():
+        cols[cols[cols == dup].index.values.tolist()] = [
+            dup + "_" + str(i) if i != 0 else dup for i in range(sum(cols == dup))
+        ]
+    df.columns = cols
+
+    # Identify numeric columns
+    numeric_patterns = [
+        "Div",
+        "Division",
+        "Boys",
+        "Girls",
+        "Total",
+        "Registered",
+        "Pass",
+        "Rate",
+        "M",
+        "F",
+    ]
+    numeric_cols = [
+        col
+        for col in df.columns
+        if any(pattern in str(col) for pattern in numeric_patterns)
+    ]
+
+    # Convert to numeric, counting the blank or unreadable cells filled with 0.
+    # Text columns may carry percent signs or thousands separators.
+    missing = np.zeros(len(df), dtype=np.int64)
+    for col in numeric_cols:
+        values = df[col]
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(
+                values.astype("string").str.replace(r"[%,\s]", "", regex=True),
+                errors="coerce",
+            ).astype(float)
+        missing += values.isna().to_numpy()
+        df[col] = values.fillna(0)
+    df["Missing_Values"] = missing
+
+    # Detect if we have standard PLE structure
+    has_divisions = any("Div" in str(col) for col in df.columns)
+
+    if has_divisions:
+        # Map column names to standard format
+        col_mapping = {}
+        for col in df.columns:
+            col_str = str(col)
+            # Map division columns
+            if "Div1" in col_str or "Division 1" in col_str:
+                if "_M" in col_str or "Boys" in col_str:
+                    col_mapping[col] = "Division 1 - Boys"
+                elif "_F" in col_str or "Girls" in col_str:
+                    col_mapping[col] = "Division 1 - Girls"
+                elif "Total" in col_str:
+                    col_mapping[col] = "Division 1 - Total"
+            elif "Div2" in col_str or "Division 2" in col_str:
+                if "_M" in col_str or "Boys" in col_str:
+                    col_mapping[col] = "Division 2 - Boys"
+                elif "_F" in col_str or "Girls" in col_str:
+                    col_mapping[col] = "Division 2 - Girls"
+                elif "Total" in col_str:
+                    col_mapping[col] = "Division 2 - Total"
+            elif "Div3" in col_str or "Division 3" in col_str:
+                if "_M" in col_str or "Boys" in col_str:
+                    col_mapping[col] = "Division 3 - Boys"
+                elif "_F" in col_str or "Girls" in col_str:
+                    col_mapping[col] = "Division 3 - Girls"
+                elif "Total" in col_str:
+                    col_mapping[col] = "Division 3 - Total"
+            elif "Div4" in col_str or "Division 4" in col_str:
+                if "_M" in col_str or "Boys" in col_str:
+                    col_mapping[col] = "Division 4 - Boys"
+                elif "_F" in col_str or "Girls" in col_str:
+                    col_mapping[col] = "Division 4 - Girls"
+                elif "Total" in col_str:
+                    col_mapping[col] = "Division 4 - Total"
+            elif "DivU" in col_str or "Division U" in col_str:
+                if "_M" in col_str or "Boys" in col_str:
+                    col_mapping[col] = "Division U - Boys"
+                elif "_F" in col_str or "Girls" in col_str:
+                    col_mapping[col] = "Division U - Girls"
+                elif "Total" in col_str:
+                    col_mapping[col] = "Division U - Total"
+            elif "DivX" in col_str or "Division X" in col_str:
+                if "_M" in col_str or "Boys" in col_str:
+                    col_mapping[col] = "Division X - Boys"
+                elif "_F" in col_str or "Girls" in col_str:
+                    col_mapping[col] = "Division X - Girls"
+                elif "Total" in col_str:
+                    col_mapping[col] = "Division X - Total"
+            # Map district/area columns
+            if "Area" in col_str and "District" not in col_str:
+                col_mapping[col] = "District"
+
+        df = df.rename(columns=col_mapping)
+
+        # After renaming, check for duplicate column names again and fix
+        if df.columns.duplicated().any():
+            cols = pd.Series(df.columns)
+            for dup in cols[cols.duplicated()].unique():
+                cols[cols[cols == dup].index.values.tolist()] = [
+                    dup + "_dup" + str(i) if i != 0 else dup
+                    for i in range(sum(cols == dup))
+                ]
+            df.columns = cols
+
+        # Calculate totals if not present - using .values to avoid index alignment
+        if "Registered - Total" not in df.columns:
+            if (
+                all(f"Division {i} - Total" in df.columns for i in range(1, 5))
+                and "Division U - Total" in df.columns
+            ):
+                total = (
+                    df["Division 1 - Total"].fillna(0).values
+                    + df["Division 2 - Total"].fillna(0).values
+                    + df["Division 3 - Total"].fillna(0).values
+                    + df["Division 4 - Total"].fillna(0).values
+                    + df["Division U - Total"].fillna(0).values
+                )
+                if "Division X - Total" in df.columns:
+                    total = total + df["Division X - Total"].fillna(0).values
+                df["Registered - Total"] = total
+
+        # Calculate boys and girls totals
+        if "Registered - Boys" not in df.columns:
+            boys_cols = [
+                "Division 1 - Boys",
+                "Division 2 - Boys",
+                "Division 3 - Boys",
+                "Division 4 - Boys",
+                "Division U - Boys",
+                "Division X - Boys",
+            ]
+            total_boys = np.zeros(len(df))
+            for col in boys_cols:
+                if col in df.columns:
+                    total_boys = total_boys + df[col].fillna(0).values
+            df["Registered - Boys"] = total_boys
+
+        if "Registered - Girls" not in df.columns:
+            girls_cols = [
+                "Division 1 - Girls",
+                "Division 2 - Girls",
+                "Division 3 - Girls",
+                "Division 4 - Girls",
+                "Division U - Girls",
+                "Division X - Girls",
+            ]
+            total_girls = np.zeros(len(df))
+            for col in girls_cols:
+                if col in df.columns:
+                    total_girls = total_girls + df[col].fillna(0).values
+            df["Registered - Girls"] = total_girls
+
+        # Calculate performance metrics
+        pass_cols = [
+            "Division 1 - Total",
+            "Division 2 - Total",
+            "Division 3 - Total",
+            "Division 4 - Total",
+        ]
+        passed = np.zeros(len(df))
+        for col in pass_cols:
+            if col in df.columns:
+                passed = passed + df[col].fillna(0).values
+        df["Passed_Total"] = passed
+
+        fail_cols = ["Division U - Total", "Division X - Total"]
+        failed = np.zeros(len(df))
+        for col in fail_cols:
+            if col in df.columns:
+                failed = failed + df[col].fillna(0).values
+        df["Failed_Total"] = failed
+
+        # Calculate rates (avoid division by zero)
+        div1_for_rate = (
+            df["Division 1 - Total"].fillna(0).values
+            if "Division 1 - Total" in df.columns
+            else np.zeros(len(df))
+        )
+        div2_for_rate = (
+            df["Division 2 - Total"].fillna(0).values
+            if "Division 2 - Total" in df.columns
+            else np.zeros(len(df))
+        )
+        div3_for_rate = (
+            df["Division 3 - Total"].fillna(0).values
+            if "Division 3 - Total" in df.columns
+            else np.zeros(len(df))
+        )
+
+        df["Pass_Rate"] = np.where(
+            df["Registered - Total"] > 0,
+            (df["Passed_Total"] / df["Registered - Total"] * 100).round(2),
+            0,
+        )
+        df["Excellence_Rate"] = np.where(
+            df["Registered - Total"] > 0,
+            (div1_for_rate / df["Registered - Total"].values * 100).round(2),
+            0,
+        )
+        df["Strong_Performance_Rate"] = np.where(
+            df["Registered - Total"] > 0,
+            (
+                (div1_for_rate + div2_for_rate + div3_for_rate)
+                / df["Registered - Total"].values
+                * 100
+            ).round(2),
+            0,
+        )
+
+        # Gender metrics
+        boys_pass_cols = [
+            "Division 1 - Boys",
+            "Division 2 - Boys",
+            "Division 3 - Boys",
+            "Division 4 - Boys",
+        ]
+        boys_passed = np.zeros(len(df))
+        for col in boys_pass_cols:
+            if col in df.columns:
+                boys_passed = boys_passed + df[col].fillna(0).values
+
+        girls_pass_cols = [
+            "Division 1 - Girls",
+            "Division 2 - Girls",
+            "Division 3 - Girls",
+            "Division 4 - Girls",
+        ]
+        girls_passed = np.zeros(len(df))
+        for col in girls_pass_cols:
+            if col in df.columns:
+                girls_passed = girls_passed + df[col].fillna(0).values
+
+        df["Boys_Pass_Rate"] = np.where(
+            df["Registered - Boys"] > 0,
+            (boys_passed / df["Registered - Boys"].values * 100).round(2),
+            0,
+        )
+        df["Girls_Pass_Rate"] = np.where(
+            df["Registered - Girls"] > 0,
+            (girls_passed / df["Registered - Girls"].values * 100).round(2),
+            0,
+        )
+        df["Gender_Gap"] = (df["Boys_Pass_Rate"] - df["Girls_Pass_Rate"]).round(2)
+
+    return df
+
+
+def summarize_by_year(df):
+    """Per-year totals and mean rates"""
+    yearly_data = (
+        df.groupby("Year")
+        .agg(
+            {
+                "Registered - Total": "sum",
+                "Registered - Boys": "sum",
+                "Registered - Girls": "sum",
+                "Pass_Rate": "mean",
+                "Boys_Pass_Rate": "mean",
+                "Girls_Pass_Rate": "mean",
+                "Excellence_Rate": "mean",
+                "Division 1 - Total": "sum",
+                "Division 2 - Total": "sum",
+                "Division 3 - Total": "sum",
+                "Division 4 - Total": "sum",
+                "Division U - Total": "sum",
+            }
+        )
+        .reset_index()
+    )
+    return yearly_data.sort_values("Year")
+
+
+def to_excel_bytes(df, sheet_name="PLE Data"):
+    """Render a frame as an XLSX workbook"""
+    excel_buffer = BytesIO()
+    with pd.ExcelWriter(excel_buffer, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name=sheet_name)
+    return excel_buffer.getvalue()
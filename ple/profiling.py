@@ -0,0 +1,194 @@
+"""
+Rerun profiling
+Collects stage timings, cache outcomes, row counts and chart payload sizes
+for one script run. A profile is bound to the running thread, so helpers
+are no-ops (and nearly free) when no profile is active. Stages and charts
+are also emitted as tracing spans when a trace sink is configured.
+"""
+
+import functools
+import math
+import re
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+from ple import tracing
+
+_local = threading.local()
+
+
+class Profile:
+    """Timings of one rerun; stages nest, charts belong to the open stage"""
+
+    def __init__(self, measure_payload=True):
+        # Sizing a chart serializes it once more, so only the profiler
+        # panel asks for it
+        self.measure_payload = measure_payload
+        self.started = time.perf_counter()
+        self.stages = []
+        self.charts = []
+        self.total = None
+        self._open = []
+        self._lap = self.started
+
+    @contextmanager
+    def stage(self, name, rows=None, cached=False, kind=None, **attributes):
+        record = {
+            "stage": name,
+            "depth": len(self._open),
+            "seconds": None,
+            "rows": rows,
+            "cache": "hit" if cached else None,
+        }
+        self.stages.append(record)
+        self._open.append(record)
+        with tracing.span(name, kind=kind, **attributes) as span:
+            started = self._lap = time.perf_counter()
+            try:
+                yield record
+            finally:
+                record["seconds"] = time.perf_counter() - started
+                self._open.pop()
+                self._lap = time.perf_counter()
+                span.set(rows=record["rows"], cache=record["cache"])
+
+    def mark_computed(self):
+        """Called from inside a cached function body: the enclosing stage missed"""
+        if self._open and self._open[-1]["cache"] is not None:
+            self._open[-1]["cache"] = "miss"
+
+    @contextmanager
+    def chart(self, fig):
+        """Time rendering of a figure; build time is the time since the last
+        stage boundary or chart in the same stage"""
+        started = time.perf_counter()
+        build = started - self._lap
+        title = re.sub(r"<[^>]+>", "", fig.layout.title.text or "")
+        with tracing.span(
+            "figure.build", start_time=time.time() - build, kind="figure-build", chart=title
+        ):
+            pass
+        with tracing.span("figure.serialize", kind="serialize", chart=title) as span:
+            payload = len(fig.to_json()) if self.measure_payload else None
+            span.set(bytes=payload, traces=len(fig.data))
+            yield
+        now = self._lap = time.perf_counter()
+        self.charts.append(
+            {
+                "stage": self._open[-1]["stage"] if self._open else None,
+                "chart": title or f"chart {len(self.charts) + 1}",
+                "build_ms": build * 1000,
+                "render_ms": (now - started) * 1000,
+                "payload_bytes": payload,
+            }
+        )
+
+    def finish(self):
+        self.total = time.perf_counter() - self.started
+        return self
+
+    def cache_counts(self):
+        counts = {"hit": 0, "miss": 0}
+        for record in self.stages:
+            if record["cache"] in counts:
+                counts[record["cache"]] += 1
+        return counts
+
+    def summary(self):
+        """Compact record kept in the rolling history"""
+        return {
+            "at": time.time(),
+            "total_s": self.total,
+            "stages": {r["stage"]: r["seconds"] for r in self.stages},
+            "cache": self.cache_counts(),
+            "payload_bytes": (
+                sum(c["payload_bytes"] for c in self.charts) if self.measure_payload else None
+            ),
+        }
+
+
+def start(measure_payload=True):
+    """Begin profiling the current thread's rerun; ``measure_payload`` sizes
+    each chart's serialized figure"""
+    _local.profile = Profile(measure_payload)
+    return _local.profile
+
+
+def stop():
+    profile = current()
+    _local.profile = None
+    return profile.finish() if profile else None
+
+
+def current():
+    return getattr(_local, "profile", None)
+
+
+def stage(name, rows=None, cached=False, kind=None, **attributes):
+    """Time a block as a stage of the current profile, if any.
+
+    ``kind`` and ``attributes`` only go to the tracing span.
+    """
+    profile = current()
+    if profile is None:
+        return nullcontext({})
+    return profile.stage(name, rows, cached, kind, **attributes)
+
+
+def chart(fig):
+    profile = current()
+    if profile is None:
+        return nullcontext()
+    return profile.chart(fig)
+
+
+def computes(func):
+    """Mark cache misses: wrap a function *inside* its cache decorator"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = current()
+        if profile is not None:
+            profile.mark_computed()
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+class ProfileHistory:
+    """Rolling window of rerun summaries, shared by all sessions"""
+
+    def __init__(self, size=50):
+        self._runs = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        with self._lock:
+            self._runs.append(profile.summary())
+
+    def runs(self):
+        with self._lock:
+            return list(self._runs)
+
+    def stage_stats(self):
+        """Per-stage count, median, p95 and max seconds over the window"""
+        samples = {}
+        for run in self.runs():
+            for name, seconds in run["stages"].items():
+                samples.setdefault(name, []).append(seconds)
+        stats = []
+        for name, values in samples.items():
+            values.sort()
+            stats.append(
+                {
+                    "stage": name,
+                    "runs": len(values),
+                    "median_ms": statistics.median(values) * 1000,
+                    "p95_ms": values[math.ceil(0.95 * len(values)) - 1] * 1000,
+                    "max_ms": values[-1] * 1000,
+                }
+            )
+        return sorted(stats, key=lambda s: s["median_ms"], reverse=True)
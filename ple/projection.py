@@ -0,0 +1,163 @@
+"""
+Projections
+Next-year projections of every entity's yearly series, fitted in one batch.
+Series are rows of an entity x year matrix (missing years are NaN), so each
+model is a handful of array operations over all rows at once instead of a
+fit per district. Two models are fitted: a linear trend weighted towards
+recent years, and Holt's damped-trend exponential smoothing.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Two-sided 95% prediction intervals (normal approximation)
+Z = 1.96
+
+# Linear trend: a year's weight halves every HALF_LIFE years back
+HALF_LIFE = 2.0
+
+# Damped smoothing: level and trend smoothing, and the trend damping factor
+ALPHA = 0.5
+BETA = 0.3
+PHI = 0.8
+
+MODELS = {"Damped": "Damped smoothing", "Linear": "Weighted linear trend"}
+
+
+def linear_trend(values, years, half_life=HALF_LIFE):
+    """Weighted least-squares line per row, evaluated one year after the last.
+
+    Returns ``(forecast, se)``; rows need two observed years for a forecast
+    and three for an interval.
+    """
+    values = np.asarray(values, dtype=float)
+    x = np.asarray(years, dtype=float)
+    x0 = x[-1] + 1
+    observed = ~np.isnan(values)
+    y = np.where(observed, values, 0.0)
+    w = np.where(observed, 0.5 ** ((x[-1] - x) / half_life), 0.0)
+
+    n = observed.sum(axis=1)
+    sw = w.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = (w * x).sum(axis=1) / sw
+        mean_y = (w * y).sum(axis=1) / sw
+        dx = np.where(observed, x - mean_x[:, None], 0.0)
+        sxx = (w * dx**2).sum(axis=1)
+        slope = (w * dx * (y - mean_y[:, None])).sum(axis=1) / sxx
+        forecast = mean_y + slope * (x0 - mean_x)
+        residuals = np.where(observed, y - (mean_y[:, None] + slope[:, None] * dx), 0.0)
+        # Weights act as precisions relative to the latest year (weight 1)
+        variance = (w * residuals**2).sum(axis=1) / (n - 2)
+        se = np.sqrt(variance * (1 + 1 / sw + (x0 - mean_x) ** 2 / sxx))
+    forecast = np.where(n >= 2, forecast, np.nan)
+    se = np.where(n >= 3, se, np.nan)
+    return forecast, se
+
+
+def damped_trend(values, alpha=ALPHA, beta=BETA, phi=PHI):
+    """Holt's damped-trend smoothing per row, one step past the last column.
+
+    The loop runs over years; every row is updated at once. Missing years
+    advance the state without an update. Returns ``(forecast, se)`` with
+    ``se`` from the one-step-ahead errors; rows need two observed years for a
+    forecast and three for an interval.
+    """
+    values = np.asarray(values, dtype=float)
+    rows = len(values)
+    level = np.full(rows, np.nan)
+    trend = np.zeros(rows)
+    seen = np.zeros(rows, dtype=int)
+    last = np.zeros(rows)
+    squared = np.zeros(rows)
+    for column, y in enumerate(values.T):
+        ok = ~np.isnan(y)
+        first = ok & (seen == 0)
+        second = ok & (seen == 1)
+        later = ok & (seen >= 2)
+
+        # Initial state: first value, then the first difference per
+        # elapsed column as trend
+        level[first] = y[first]
+        trend[second] = (y[second] - level[second]) / (column - last[second])
+        level[second] = y[second]
+
+        predicted = level + phi * trend
+        error = y - predicted
+        squared[later] += error[later] ** 2
+        new_level = predicted + alpha * error
+        trend[later] = (phi * trend + beta * (new_level - level))[later]
+        level[later] = new_level[later]
+
+        # Unobserved years still move the state along the damped trend
+        gap = ~ok & (seen >= 1)
+        level[gap] = predicted[gap]
+        trend[gap] = phi * trend[gap]
+        seen += ok
+        last[ok] = column
+
+    forecast = np.where(seen >= 2, level + phi * trend, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        se = np.where(seen >= 3, np.sqrt(squared / (seen - 2)), np.nan)
+    return forecast, se
+
+
+def project(values, years, lower=None, upper=None, z=Z):
+    """Both models' projections with prediction intervals, one row per entity.
+
+    ``lower``/``upper`` clip forecasts and bounds to the metric's range.
+    """
+    values = np.asarray(values, dtype=float)
+    observed = ~np.isnan(values)
+    latest = observed.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+    last = np.where(observed.any(axis=1), values[np.arange(len(values)), latest], np.nan)
+    result = {"Last": last, "Years_Observed": observed.sum(axis=1)}
+    for name, (forecast, se) in (
+        ("Linear", linear_trend(values, years)),
+        ("Damped", damped_trend(values)),
+    ):
+        result[name] = _clip(forecast, lower, upper)
+        result[f"{name}_Low"] = _clip(forecast - z * se, lower, upper)
+        result[f"{name}_High"] = _clip(forecast + z * se, lower, upper)
+    return pd.DataFrame(result)
+
+
+def _clip(values, lower, upper):
+    # Older NumPy rejects np.clip with neither bound
+    if lower is None and upper is None:
+        return values
+    return np.clip(values, lower, upper)
+
+
+class Projections:
+    """Projections of a RankPanel's metrics for the year after its last.
+
+    ``bounds`` maps a metric to its ``(lower, upper)`` range.
+    """
+
+    def __init__(self, panel, metrics, bounds=None):
+        self.panel = panel
+        self.years = panel.years
+        self.next_year = panel.years[-1] + 1 if panel.years else None
+        bounds = bounds or {}
+        self.tables = {
+            metric: project(
+                panel.values[metric], panel.years, *bounds.get(metric, (None, None))
+            )
+            for metric in metrics
+            if metric in panel.values
+        }
+        self.metrics = list(self.tables)
+
+    def table(self, metric, view=None):
+        """Projections for the entities in ``view`` that have one"""
+        ids = self.panel.entities(view)
+        table = self.tables[metric].iloc[ids].copy()
+        table.insert(0, "District", self.panel.labels[ids])
+        projected = table["Linear"].notna() | table["Damped"].notna()
+        return table[projected].reset_index(drop=True)
+
+    def history(self, metric, district):
+        """Yearly values of the entity labelled ``district``"""
+        ids = np.flatnonzero(self.panel.labels == district)
+        return pd.Series(self.panel.values[metric][ids[0]], index=self.years)
@@ -0,0 +1,232 @@
+"""
+Data quality scan
+Row-level checks run once per dataset version: totals reported by the sheet
+against the totals derived from its division columns, cells that cleaning
+had to fill, and robust z-scores of key metrics against each district's own
+history and against its Sub Region peers in the same year. Every check is a
+column operation over the whole frame; findings come back as one long table.
+"""
+
+import numpy as np
+import pandas as pd
+
+# |robust z| above which a value is flagged (Iglewicz & Hoaglin)
+THRESHOLD = 3.5
+
+# Reported pass rates are rounded; larger differences are flagged
+RATE_TOLERANCE = 0.01
+
+# Years of history a district needs before its own series is used
+MIN_HISTORY = 3
+
+# Reported column -> columns whose sum it should equal
+TOTALS = {
+    "Registered - Total": [f"Division {d} - Total" for d in "1234UX"],
+    "Registered - Boys": [f"Division {d} - Boys" for d in "1234UX"],
+    "Registered - Girls": [f"Division {d} - Girls" for d in "1234UX"],
+    "Sat - Total": [f"Division {d} - Total" for d in "1234U"],
+    "Passed - Total": [f"Division {d} - Total" for d in "1234"],
+}
+
+# Reported rate -> (numerator, denominator) it should equal in percent
+RATES = {
+    "Pass Rate - Total": ("Passed - Total", "Sat - Total"),
+    "Pass Rate - Boys": ("Passed - Boys", "Sat - Boys"),
+    "Pass Rate - Girls": ("Passed - Girls", "Sat - Girls"),
+}
+
+# Metrics scored against history and peers; counts are scored on a log
+# scale so a jump is judged relative to the district's size
+METRICS = {
+    "Pass_Rate": False,
+    "Excellence_Rate": False,
+    "Registered - Total": True,
+}
+
+COLUMNS = ["Row", "Year", "District", "Check", "Field", "Value", "Expected", "Score"]
+
+
+def _findings(data, rows, check, field, value, expected, score):
+    return pd.DataFrame(
+        {
+            "Row": data.index[rows],
+            "Year": data["Year"].to_numpy()[rows] if "Year" in data.columns else np.nan,
+            "District": (
+                data["District"].to_numpy()[rows] if "District" in data.columns else ""
+            ),
+            "Check": check,
+            "Field": field,
+            "Value": value[rows],
+            "Expected": expected[rows],
+            "Score": score[rows],
+        }
+    )
+
+
+def robust_z(values, groups, min_size=1):
+    """Robust z-scores of each column of ``values`` within ``groups``.
+
+    Scores use the group median and 1.4826 x the median absolute deviation.
+    A group's scale is floored at the median scale of all groups, so groups
+    whose values barely vary do not turn small differences into outliers.
+    Groups smaller than ``min_size`` score NaN.
+    """
+    grouped = values.groupby(groups, sort=False)
+    median = grouped.transform("median")
+    deviation = (values - median).abs()
+    scale = 1.4826 * deviation.groupby(groups, sort=False).transform("median")
+    size = grouped.transform("count")
+    scale = scale.where(size >= min_size)
+    floor = scale.groupby(groups, sort=False).first().median()
+    scale = scale.clip(lower=floor.where(floor > 0), axis=1)
+    return (values - median) / scale.where(scale > 0), median
+
+
+def _cells(keys, years, rows, label_rows=None):
+    """Code of each row's (key, year) cell (-1 without one) and, per cell,
+    the row its findings are reported on: its first ``label_rows`` row, else
+    its first row"""
+    valid = ~(pd.isna(keys) | pd.isna(years))
+    cells = np.full(rows, -1)
+    cells[valid] = pd.factorize(pd.MultiIndex.from_arrays([keys[valid], years[valid]]))[0]
+    preferred = np.ones(rows, dtype=bool) if label_rows is None else np.asarray(label_rows)
+    order = np.lexsort((np.arange(rows), ~preferred))
+    order = order[cells[order] >= 0]
+    _, first = np.unique(cells[order], return_index=True)
+    return cells, order[first]
+
+
+def _aggregate(values, cells, count, totals=(), weights=None):
+    """``values`` per cell: ``totals`` summed, other columns averaged weighted
+    by ``weights`` (equally if None); NaN values are left out"""
+    weights = (
+        np.ones(len(values))
+        if weights is None
+        else np.nan_to_num(np.asarray(weights, dtype=float))
+    )
+    result = {}
+    for metric in values.columns:
+        column = values[metric].to_numpy(dtype=float)
+        ok = (cells >= 0) & ~np.isnan(column)
+        if metric in totals:
+            sums = np.bincount(cells[ok], column[ok], minlength=count)
+            rows = np.bincount(cells[ok], minlength=count)
+            result[metric] = np.where(rows > 0, sums, np.nan)
+        else:
+            w = weights[ok]
+            sums = np.bincount(cells[ok], column[ok] * w, minlength=count)
+            total = np.bincount(cells[ok], w, minlength=count)
+            result[metric] = np.divide(sums, total, out=np.full(count, np.nan), where=total > 0)
+    return pd.DataFrame(result, columns=values.columns)
+
+
+def scan(
+    data,
+    keys=None,
+    peer_col="Sub Region",
+    year_col="Year",
+    threshold=THRESHOLD,
+    totals=(),
+    weights=None,
+    label_rows=None,
+):
+    """Findings for every row of ``data`` that fails a check.
+
+    ``keys`` identify a district across years (default: the District
+    column). History is scored per district and year: several rows sharing
+    a key in one year (areas split off a parent district) are combined, as
+    in ``RankPanel``, by summing ``totals`` and averaging other metrics
+    weighted by ``weights``; their findings are reported on the first of
+    their ``label_rows``. Peers are rows of the same ``peer_col`` and year,
+    or of the same year when ``peer_col`` is missing. Returns one row per
+    finding with the value, the value expected by the check and a score
+    (the difference for consistency checks, the robust z otherwise).
+    """
+    findings = []
+
+    def add(rows, check, field, value, expected, score):
+        findings.append(_findings(data, rows, check, field, value, expected, score))
+
+    for reported, parts in TOTALS.items():
+        if reported not in data.columns or not all(p in data.columns for p in parts):
+            continue
+        value = data[reported].to_numpy(dtype=float)
+        expected = data[parts].to_numpy(dtype=float).sum(axis=1)
+        rows = np.flatnonzero(value != expected)
+        add(rows, "Inconsistent total", reported, value, expected, value - expected)
+
+    for reported, (numerator, denominator) in RATES.items():
+        if not {reported, numerator, denominator} <= set(data.columns):
+            continue
+        value = data[reported].to_numpy(dtype=float)
+        sat = data[denominator].to_numpy(dtype=float)
+        expected = np.divide(
+            data[numerator].to_numpy(dtype=float) * 100,
+            sat,
+            out=np.full(len(data), np.nan),
+            where=sat > 0,
+        )
+        rows = np.flatnonzero(np.abs(value - expected) > RATE_TOLERANCE)
+        add(rows, "Inconsistent rate", reported, value, expected, value - expected)
+
+    if "Missing_Values" in data.columns:
+        value = data["Missing_Values"].to_numpy(dtype=float)
+        rows = np.flatnonzero(value > 0)
+        add(rows, "Filled cells", "Missing_Values", value, np.zeros(len(data)), value)
+
+    if "Registered - Total" in data.columns:
+        value = data["Registered - Total"].to_numpy(dtype=float)
+        rows = np.flatnonzero(value <= 0)
+        add(rows, "No candidates", "Registered - Total", value, value, value)
+
+    metrics = [m for m in METRICS if m in data.columns]
+    if metrics and year_col in data.columns:
+        raw = data[metrics].astype(float).reset_index(drop=True)
+        years = data[year_col].to_numpy()
+        if keys is None:
+            keys = data["District"].to_numpy() if "District" in data.columns else None
+        peers = (
+            data[peer_col].astype(object).where(data[peer_col].notna(), "").to_numpy()
+            if peer_col in data.columns
+            else np.full(len(data), "")
+        )
+        comparisons = []
+        if keys is not None:
+            keys = np.asarray(keys)
+            cells, reported = _cells(keys, years, len(data), label_rows)
+            history = _aggregate(raw, cells, len(reported), totals, weights)
+            comparisons.append(
+                ("History outlier", history, keys[reported], MIN_HISTORY, cells, reported)
+            )
+        rows = np.arange(len(data))
+        comparisons.append(
+            ("Peer outlier", raw, pd.MultiIndex.from_arrays([years, peers]), 1, rows, rows)
+        )
+        for check, values, groups, min_size, cells, reported in comparisons:
+            scaled = values.copy()
+            for metric in metrics:
+                if METRICS[metric]:
+                    scaled[metric] = np.log1p(values[metric].clip(lower=0))
+            z, median = robust_z(scaled, groups, min_size)
+            for metric in metrics:
+                score = z[metric].to_numpy()
+                expected = median[metric].to_numpy()
+                value = values[metric].to_numpy()
+                if METRICS[metric]:
+                    expected = np.expm1(expected)
+                flagged = reported[np.abs(np.nan_to_num(score)) > threshold]
+                # Row-level arrays; rows outside any cell are never flagged
+                add(
+                    np.sort(flagged),
+                    check,
+                    metric,
+                    *(np.append(a, np.nan)[cells] for a in (value, expected, score)),
+                )
+
+    if not findings:
+        return pd.DataFrame(columns=COLUMNS)
+    report = pd.concat(findings, ignore_index=True)
+    # Checks in the order above, largest scores first within each
+    checks, _ = pd.factorize(report["Check"])
+    order = np.lexsort((-report["Score"].abs().to_numpy(), checks))
+    return report.iloc[order].reset_index(drop=True)
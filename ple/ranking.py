@@ -0,0 +1,233 @@
+"""
+Ranking index
+Per-metric sort orders, dense ranks and national percentiles computed once
+per dataset version. Top and bottom N of any filtered view are read off the
+precomputed order by masking it with the view's rows, instead of sorting
+the view again on every rerun. A District x Year panel of ranks backs the
+year-over-year mobility views.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _positions(index, view):
+    """Row positions in the indexed dataset of the rows of ``view``"""
+    positions = index.get_indexer(view.index)
+    return positions[positions >= 0]
+
+
+class RankPanel:
+    """Entity x Year matrices of metric values and national ranks.
+
+    Rows of the dataset sharing an integer ``keys`` value (one district
+    across spellings, years and boundary changes) form one entity. Several
+    rows of an entity in one year are summed for ``totals`` and otherwise
+    averaged, weighted by ``weights`` if given. Entities are labelled with
+    their most recent spelling among ``label_rows`` (default: all rows).
+    Ranks are ordinal, 1 = highest, among all entities with a value that
+    year.
+    """
+
+    def __init__(
+        self,
+        data,
+        metrics,
+        keys,
+        year_col="Year",
+        label_col="District",
+        totals=(),
+        weights=None,
+        label_rows=None,
+    ):
+        self._index = data.index
+        self.years = sorted(data[year_col].dropna().unique().tolist())
+        codes, _ = pd.factorize(keys)
+        year_codes = np.searchsorted(self.years, data[year_col].to_numpy())
+        valid = (codes >= 0) & data[year_col].notna().to_numpy()
+        self._codes = np.where(valid, codes, -1)
+        entities = codes.max() + 1 if len(codes) else 0
+
+        # Label each entity with its most recent spelling
+        latest = np.lexsort((year_codes,))
+        latest = latest[valid[latest]]
+        names = pd.Series(data[label_col].to_numpy()[latest])
+        labels = names.groupby(codes[latest]).last()
+        if label_rows is not None:
+            preferred = np.asarray(label_rows)[latest]
+            labels = (
+                names[preferred].groupby(codes[latest][preferred]).last().combine_first(labels)
+            )
+        self.labels = labels.reindex(range(entities)).to_numpy()
+        weights = (
+            np.ones(len(data))
+            if weights is None
+            else np.nan_to_num(np.asarray(weights, dtype=float))
+        )
+
+        self.values = {}
+        self.ranks = {}
+        shape = (entities, len(self.years))
+        for metric in metrics:
+            metric_values = pd.to_numeric(data[metric], errors="coerce").to_numpy(dtype=float)
+            ok = valid & ~np.isnan(metric_values)
+            cells = codes[ok] * len(self.years) + year_codes[ok]
+            size = entities * len(self.years)
+            rows = np.bincount(cells, minlength=size).reshape(shape)
+            if metric in totals:
+                sums = np.bincount(cells, metric_values[ok], minlength=size)
+                values = np.where(rows > 0, sums.reshape(shape), np.nan)
+            else:
+                w = weights[ok]
+                sums = np.bincount(cells, metric_values[ok] * w, minlength=size)
+                total = np.bincount(cells, w, minlength=size).reshape(shape)
+                values = np.divide(
+                    sums.reshape(shape), total, out=np.full(shape, np.nan), where=total > 0
+                )
+            # One argsort along the entity axis ranks every year at once
+            order = np.argsort(-values, axis=0, kind="stable")
+            ranks = np.empty(shape)
+            np.put_along_axis(
+                ranks, order, np.arange(1, entities + 1, dtype=float)[:, None], axis=0
+            )
+            ranks[np.isnan(values)] = np.nan
+            self.values[metric] = values
+            self.ranks[metric] = ranks
+
+    def entities(self, view=None):
+        """Entity ids present in ``view`` (all entities if None)"""
+        if view is None:
+            return np.arange(len(self.labels))
+        codes = self._codes[_positions(self._index, view)]
+        return np.unique(codes[codes >= 0])
+
+    def table(self, metric, view=None):
+        """Ranks of the entities in ``view``, one column per year"""
+        ids = self.entities(view)
+        return pd.DataFrame(
+            self.ranks[metric][ids], index=self.labels[ids], columns=self.years
+        )
+
+    def movers(self, metric, start, end, view=None):
+        """Rank change from ``start`` to ``end`` (positive = moved up), best first"""
+        ids = self.entities(view)
+        ranks = self.ranks[metric]
+        before = ranks[ids, self.years.index(start)]
+        after = ranks[ids, self.years.index(end)]
+        both = ~np.isnan(before) & ~np.isnan(after)
+        movers = pd.DataFrame(
+            {
+                "District": self.labels[ids][both],
+                f"Rank {start}": before[both].astype(int),
+                f"Rank {end}": after[both].astype(int),
+                "Change": (before[both] - after[both]).astype(int),
+            }
+        )
+        return movers.sort_values("Change", ascending=False, kind="stable").reset_index(
+            drop=True
+        )
+
+    def transitions(self, metric, start, end, view=None, bins=5):
+        """Counts of entities moving between national rank quantiles
+        (1 = top) from ``start`` to ``end``"""
+        ids = self.entities(view)
+        ranks = self.ranks[metric]
+        quantiles = []
+        for year in (start, end):
+            column = ranks[:, self.years.index(year)]
+            ranked = np.count_nonzero(~np.isnan(column))
+            quantiles.append(np.ceil(column[ids] / max(ranked, 1) * bins))
+        both = ~np.isnan(quantiles[0]) & ~np.isnan(quantiles[1])
+        counts = np.zeros((bins, bins), dtype=int)
+        np.add.at(
+            counts,
+            (quantiles[0][both].astype(int) - 1, quantiles[1][both].astype(int) - 1),
+            1,
+        )
+        labels = list(range(1, bins + 1))
+        return pd.DataFrame(counts, index=labels, columns=labels)
+
+
+class RankIndex:
+    """Ranks of every row of ``data`` for each metric in ``metrics``.
+
+    Ranks (1 = highest) and percentiles (share of rows scoring at or below)
+    are national and per year when ``year_col`` is present. Views passed
+    to ``top``/``bottom``/``ranks`` must be row subsets of ``data``, e.g.
+    the result of the sidebar filters.
+    """
+
+    def __init__(self, data, metrics, year_col="Year", panel=None):
+        self.metrics = [m for m in metrics if m in data.columns]
+        self._index = data.index
+        # ``panel``: RankPanel options (``keys`` etc.) for the mobility panel
+        self.panel = (
+            RankPanel(data, self.metrics, year_col=year_col, **panel)
+            if panel is not None and year_col in data.columns
+            else None
+        )
+        years = (
+            data[year_col].to_numpy()
+            if year_col in data.columns
+            else np.zeros(len(data), dtype=np.int8)
+        )
+        groups = pd.Series(np.arange(len(data))).groupby(years, sort=False).indices
+        self._desc = {}
+        self._asc = {}
+        self._valid = {}
+        self._rank = {}
+        self._percentile = {}
+        for metric in self.metrics:
+            values = pd.to_numeric(data[metric], errors="coerce").to_numpy(dtype=float)
+            valid = int((~np.isnan(values)).sum())
+            # Stable sorts keep file order among ties, like nlargest/nsmallest;
+            # NaNs sort last in both
+            asc = np.argsort(values, kind="stable")
+            desc = np.argsort(-values, kind="stable")
+            rank = np.full(len(values), np.nan)
+            percentile = np.full(len(values), np.nan)
+            for rows in groups.values():
+                group = values[rows]
+                ok = ~np.isnan(group)
+                if not ok.any():
+                    continue
+                ordered = np.sort(group[ok])
+                distinct = np.unique(ordered)
+                rank[rows[ok]] = len(distinct) - np.searchsorted(distinct, group[ok])
+                percentile[rows[ok]] = (
+                    np.searchsorted(ordered, group[ok], side="right") / len(ordered) * 100
+                )
+            self._asc[metric] = asc.astype(np.int32)
+            self._desc[metric] = desc.astype(np.int32)
+            self._valid[metric] = valid
+            self._rank[metric] = rank
+            self._percentile[metric] = percentile
+
+    def _select(self, order, view, n, metric):
+        # NaNs sit at the end of both orders; drop them before masking
+        order = order[: self._valid[metric]]
+        mask = np.zeros(len(self._index), dtype=bool)
+        mask[_positions(self._index, view)] = True
+        picked = order[mask[order]][:n]
+        return view.loc[self._index[picked]]
+
+    def top(self, view, metric, n):
+        """Rows of ``view`` with the ``n`` largest ``metric`` values (nlargest)"""
+        return self._select(self._desc[metric], view, n, metric)
+
+    def bottom(self, view, metric, n):
+        """Rows of ``view`` with the ``n`` smallest ``metric`` values (nsmallest)"""
+        return self._select(self._asc[metric], view, n, metric)
+
+    def ranks(self, view, metric):
+        """National rank and percentile of each row of ``view`` within its year"""
+        positions = self._index.get_indexer(view.index)
+        found = positions >= 0
+        rank = np.full(len(view), np.nan)
+        percentile = np.full(len(view), np.nan)
+        rank[found] = self._rank[metric][positions[found]]
+        percentile[found] = self._percentile[metric][positions[found]]
+        return pd.DataFrame(
+            {"Rank": pd.array(rank, dtype="Int64"), "Percentile": percentile},
+            index=view.index,
+        )
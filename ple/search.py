@@ -0,0 +1,121 @@
+"""
+Name search index
+Case-folded n-gram postings over district (and later school or centre)
+names. Substring and word-prefix lookups intersect posting arrays instead
+of scanning every row; when nothing contains the query, names sharing
+enough trigrams with it are returned instead, so typos still find a match.
+"""
+
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+GRAM = 3
+# Share of the query's trigrams a name must contain to count as a near match
+MIN_SIMILARITY = 0.5
+
+_SEPARATORS = re.compile(r"[^0-9a-z]+")
+
+
+def fold(text):
+    """Lower-case, punctuation-free form used for matching"""
+    return _SEPARATORS.sub(" ", str(text).casefold()).strip()
+
+
+def _trigrams(text):
+    return {text[i : i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class NameIndex:
+    """Ranked lookup over a fixed set of names.
+
+    Names are indexed with a leading space, so trigrams starting with a
+    space mark the start of a word. Queries shorter than a trigram fall
+    back to a vectorized scan of the folded names.
+    """
+
+    def __init__(self, names):
+        unique = {str(name): fold(name) for name in names if isinstance(name, str)}
+        order = sorted(unique, key=lambda name: (unique[name], name))
+        self.names = order
+        self.folded = [unique[name] for name in order]
+        padded = [" " + folded for folded in self.folded]
+        self._padded = pa.array(padded, type=pa.large_string())
+        self._lengths = np.array([len(f) for f in self.folded], dtype=np.int32)
+
+        # (trigram, name) pairs, deduplicated and grouped by trigram
+        counts = np.maximum(self._lengths + 1 - GRAM + 1, 0)
+        grams = [text[i : i + GRAM] for text in padded for i in range(len(text) - GRAM + 1)]
+        ids = np.repeat(np.arange(len(padded), dtype=np.int64), counts)
+        codes, uniques = pd.factorize(np.array(grams, dtype=object))
+        pairs = np.sort(codes.astype(np.int64) * max(len(padded), 1) + ids)
+        pairs = pairs[np.diff(pairs, prepend=-1) != 0]
+        codes, ids = np.divmod(pairs, max(len(padded), 1))
+        starts = np.flatnonzero(np.diff(codes, prepend=-1))
+        self._postings = dict(
+            zip(uniques[codes[starts]], np.split(ids.astype(np.int32), starts[1:]))
+        )
+        self._trigrams = np.bincount(ids, minlength=len(padded))
+        self._empty = np.zeros(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _containing(self, text):
+        """Ids of names whose padded form contains ``text``"""
+        if len(text) < GRAM:
+            return np.flatnonzero(pc.match_substring(self._padded, text)).astype(np.int32)
+        # Candidates from the rarest trigram, then confirm the whole string
+        ids = min(
+            (self._postings.get(gram, self._empty) for gram in _trigrams(text)), key=len
+        )
+        if len(text) == GRAM or not len(ids):
+            return ids
+        return self._confirm(ids, text)
+
+    def _confirm(self, ids, text):
+        found = pc.match_substring(self._padded.take(ids), text)
+        return ids[found.to_numpy(zero_copy_only=False)]
+
+    def _similar(self, query):
+        """Ids of names containing at least MIN_SIMILARITY of the query's
+        trigrams, with that share and the trigram Jaccard similarity"""
+        grams = _trigrams(" " + query)
+        postings = [self._postings[g] for g in grams if g in self._postings]
+        if not postings:
+            return self._empty, np.zeros(0), np.zeros(0)
+        ids, shared = np.unique(np.concatenate(postings), return_counts=True)
+        keep = shared >= MIN_SIMILARITY * len(grams)
+        ids, shared = ids[keep], shared[keep]
+        jaccard = shared / (len(grams) + self._trigrams[ids] - shared)
+        return ids, shared / len(grams), jaccard
+
+    def search(self, query, limit=None, fuzzy=True):
+        """Names matching ``query``, best first.
+
+        Names starting with the query come first, then names with a word
+        starting with it, then other substrings, shorter names first within
+        each group. Without any substring match, and if ``fuzzy``, names
+        containing most of the query's trigrams are returned, closest first.
+        """
+        query = fold(query)
+        if not query:
+            return []
+        ids = self._containing(query)
+        if len(ids):
+            start = bisect.bisect_left(self.folded, query)
+            end = bisect.bisect_left(self.folded, query + "\uffff")
+            tier = np.where(
+                (ids >= start) & (ids < end),
+                0,
+                np.where(np.isin(ids, self._confirm(ids, " " + query)), 1, 2),
+            )
+            ids = ids[np.lexsort((ids, self._lengths[ids], tier))]
+        elif fuzzy and len(query) >= GRAM:
+            ids, share, jaccard = self._similar(query)
+            ids = ids[np.lexsort((ids, -jaccard, -share))]
+        return [self.names[i] for i in ids[:limit]]
@@ -0,0 +1,467 @@
+"""
+PLE dataset storage
+Cleaned data kept as Arrow IPC files that are memory-mapped instead of
+parsed: converted local sources, and version-stamped datasets that several
+server processes map read-only so a deployment holds one copy in the OS
+page cache no matter how many workers it runs.
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import tempfile
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs
+
+from ple import processing
+from ple.excel import read_excel_source
+
+
+def write_arrow(df, path, metadata=None):
+    """Write a frame as an uncompressed Arrow IPC file (mappable in place)"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if metadata:
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), **metadata}
+        )
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+def read_arrow(path, columns=None):
+    """Memory-map an Arrow IPC file and expose it as a read-only frame.
+
+    Numeric columns without nulls are zero-copy views of the mapped pages,
+    so every process mapping the same file shares that memory.
+    """
+    source = pa.memory_map(path, "r")
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select([c for c in columns if c in table.column_names])
+    return table.to_pandas(split_blocks=True)
+
+
+def read_arrow_metadata(path):
+    """Schema metadata of an Arrow IPC file, without reading any columns"""
+    with pa.memory_map(path, "r") as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    return {key.decode(): value.decode() for key, value in metadata.items()}
+
+
+def read_source(path, sheet=None):
+    """Parse a local CSV or Excel source into a raw frame.
+
+    Workbooks go through the cached reader; without ``sheet`` every
+    district-level sheet is used.
+    """
+    if path.lower().endswith((".xlsx", ".xlsm", ".xls")):
+        return read_excel_source(path, sheet)
+    return pd.read_csv(path)
+
+
+def arrow_path_for(path):
+    """Where the converted copy of a local source lives"""
+    return path + ".arrow"
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {"source_mtime_ns": str(stat.st_mtime_ns), "source_size": str(stat.st_size)}
+
+
+def convert_source(path, output=None):
+    """Parse and clean a local source once and store it as Arrow IPC"""
+    df = processing.clean_and_process_data(read_source(path))
+    return write_arrow(df, output or arrow_path_for(path), _source_stamp(path))
+
+
+def is_converted(path, output=None):
+    """True if the Arrow copy of ``path`` exists and matches the source file"""
+    output = output or arrow_path_for(path)
+    if not os.path.exists(output):
+        return False
+    metadata = read_arrow_metadata(output)
+    return all(metadata.get(k) == v for k, v in _source_stamp(path).items())
+
+
+def load_local(path):
+    """Cleaned frame for a local source, converting it first if stale.
+
+    Passing an ``.arrow`` file maps it directly.
+    """
+    if path.endswith(".arrow"):
+        return read_arrow(path)
+    if not is_converted(path):
+        convert_source(path)
+    return read_arrow(arrow_path_for(path))
+
+
+class SharedDataset:
+    """Directory of published dataset versions plus a ``CURRENT`` pointer.
+
+    One process publishes (guarded by an exclusive file lock); every process
+    maps the version named in ``CURRENT``. Swapping the pointer is atomic,
+    so all workers move to a new version on their next read.
+    """
+
+    def __init__(self, root, keep_versions=3):
+        self.root = root
+        self.keep_versions = keep_versions
+        self._versions_dir = os.path.join(root, "versions")
+        self._pointer = os.path.join(root, "CURRENT")
+        self._mapped = {}
+        os.makedirs(self._versions_dir, exist_ok=True)
+
+    @contextmanager
+    def _exclusive(self):
+        with open(os.path.join(self.root, ".lock"), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def current(self):
+        """Metadata of the published version, or None if nothing is published"""
+        try:
+            with open(self._pointer) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def publish(self, df, version=None):
+        """Write ``df`` as a new version and point ``CURRENT`` at it"""
+        version = version or uuid.uuid4().hex[:16]
+        path = os.path.join(self._versions_dir, f"{version}.arrow")
+        write_arrow(df, path)
+
+        meta = {
+            "version": version,
+            "path": os.path.relpath(path, self.root),
+            "rows": len(df),
+            "published_at": time.time(),
+        }
+        fd, tmp_pointer = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as handle:
+            json.dump(meta, handle)
+        os.replace(tmp_pointer, self._pointer)
+        self._prune(keep=version)
+        return meta
+
+    def publish_with(self, loader, max_age=None):
+        """Run ``loader()`` and publish its frame, unless another process did.
+
+        Callers serialise on the store lock. If a version newer than
+        ``max_age`` seconds is already published when the lock is acquired,
+        it is reused instead of loading again.
+        """
+        with self._exclusive():
+            meta = self.current()
+            if (
+                meta is not None
+                and max_age is not None
+                and time.time() - meta["published_at"] < max_age
+            ):
+                return meta
+            df = loader()
+            if df is None:
+                return meta
+            return self.publish(df)
+
+    def open(self, meta=None):
+        """Frame for a published version, mapped once per process"""
+        meta = meta or self.current()
+        if meta is None:
+            return None
+        version = meta["version"]
+        if version not in self._mapped:
+            # Drop mappings of older versions; their files stay valid while
+            # frames from them are still referenced elsewhere.
+            self._mapped = {
+                version: read_arrow(os.path.join(self.root, meta["path"]))
+            }
+        return self._mapped[version]
+
+    def _prune(self, keep):
+        files = sorted(
+            (
+                os.path.join(self._versions_dir, name)
+                for name in os.listdir(self._versions_dir)
+                if name.endswith(".arrow")
+            ),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for path in files[self.keep_versions :]:
+            if os.path.basename(path) != f"{keep}.arrow":
+                os.unlink(path)
+
+
+SUMMARY_FILE = "_summary.json"
+
+
+def _plain(value):
+    """JSON-friendly scalar"""
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+def write_partition_files(table, root, partition_cols):
+    """Write a table's rows into Hive-style partition directories.
+
+    Only partitions present in ``table`` are replaced; others are untouched.
+    """
+    partitioning = ds.partitioning(
+        pa.schema([table.schema.field(c) for c in partition_cols]), flavor="hive"
+    )
+    ds.write_dataset(
+        table,
+        root,
+        format="ipc",
+        partitioning=partitioning,
+        basename_template=f"part-{uuid.uuid4().hex[:8]}-{{i}}.arrow",
+        existing_data_behavior="delete_matching",
+    )
+
+
+def delete_partitions(root, summary, keys):
+    """Delete the files of the partitions whose key values (dicts as in the
+    summary) are in ``keys``, with their emptied directories"""
+    keys = [dict(k) for k in keys]
+    schema = summary_schema(summary)
+    dataset = ds.dataset(
+        root,
+        schema=schema,
+        format="ipc",
+        partitioning=ds.partitioning(
+            pa.schema([schema.field(c) for c in summary["partition_cols"]]), flavor="hive"
+        ),
+    )
+    for fragment in dataset.get_fragments():
+        values = {
+            column: _plain(value)
+            for column, value in ds.get_partition_keys(fragment.partition_expression).items()
+        }
+        if values not in keys:
+            continue
+        os.unlink(fragment.path)
+        directory = os.path.dirname(fragment.path)
+        while os.path.abspath(directory) != os.path.abspath(root):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+
+
+def summarize_partitions(df, partition_cols):
+    """Summary entries (key values, rows, totals, fresh version) per partition"""
+    if partition_cols:
+        groups = df.groupby(partition_cols, dropna=False, sort=True)
+    else:
+        groups = [((), df)]
+
+    entries = []
+    for key, part in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        entries.append(
+            {
+                "values": {
+                    col: _plain(value) for col, value in zip(partition_cols, key)
+                },
+                "version": uuid.uuid4().hex[:12],
+                "rows": len(part),
+                "registered": float(
+                    part.get("Registered - Total", pd.Series(dtype=float)).sum()
+                ),
+                "districts": (
+                    int(part["District"].nunique()) if "District" in part else 0
+                ),
+            }
+        )
+    return entries
+
+
+def write_summary(root, summary):
+    """Atomically replace a dataset's ``_summary.json``"""
+    summary["rows"] = sum(p["rows"] for p in summary["partitions"])
+    summary["written_at"] = time.time()
+    fd, tmp_path = tempfile.mkstemp(dir=root, suffix=".tmp")
+    with os.fdopen(fd, "w") as handle:
+        json.dump(summary, handle)
+    os.replace(tmp_path, os.path.join(root, SUMMARY_FILE))
+    return summary
+
+
+def write_partitioned(df, root, partition_cols=("Year",)):
+    """Write a cleaned frame as Hive-style partitions (``Year=2025/...``).
+
+    A ``_summary.json`` next to the partitions records each partition's key
+    values, version, row count and headline totals so callers can list the
+    available years without touching the data files.
+    """
+    partition_cols = [c for c in partition_cols if c in df.columns]
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    write_partition_files(table, root, partition_cols)
+    return write_summary(
+        root,
+        {
+            "partition_cols": partition_cols,
+            "columns": list(df.columns),
+            "schema": table.schema.serialize().to_pybytes().hex(),
+            "partitions": summarize_partitions(df, partition_cols),
+        },
+    )
+
+
+def summary_schema(summary):
+    """Arrow schema stored in a dataset summary"""
+    return pa.ipc.read_schema(pa.py_buffer(bytes.fromhex(summary["schema"])))
+
+
+def partition_stamp(summary, **selected):
+    """Short digest of the versions of the partitions a selection reads.
+
+    Changes only when one of those partitions is rewritten, so it can key
+    caches that should survive ingestion of unrelated years.
+    """
+    parts = [
+        (sorted(p["values"].items(), key=str), p["version"])
+        for p in summary["partitions"]
+        if all(
+            not values or p["values"].get(column) in values
+            for column, values in selected.items()
+        )
+    ]
+    return uuid.uuid5(uuid.NAMESPACE_OID, json.dumps(parts, default=str)).hex[:16]
+
+
+def read_summary(root):
+    """Partition summary of a partitioned dataset, or None if ``root`` is not one"""
+    try:
+        with open(os.path.join(root, SUMMARY_FILE)) as handle:
+            return json.load(handle)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def partition_values(summary, column, **selected):
+    """Distinct values of a partition column, straight from the summary,
+    among the partitions matching ``selected`` (empty selections match all)"""
+    return sorted(
+        {
+            p["values"][column]
+            for p in summary["partitions"]
+            if p["values"].get(column) is not None
+            and all(
+                not values or p["values"].get(other) in values
+                for other, values in selected.items()
+            )
+        }
+    )
+
+
+def _partition_base(path, root):
+    # First row label of the partition holding ``path``, from its directory
+    directory = os.path.relpath(os.path.dirname(path), root)
+    return (zlib.crc32(directory.encode()) >> 1) << 32
+
+
+def read_partitioned(root, summary=None, **selected):
+    """Read only the partitions matching ``selected`` (e.g. ``Year=[2024, 2025]``).
+
+    Empty or missing selections read every value of that column. Partition
+    files are memory-mapped; files for other partitions are never opened.
+    Rows are labelled by partition and position within it, so a row has
+    the same label whichever selection it was read with.
+    """
+    summary = summary or read_summary(root)
+    schema = summary_schema(summary)
+    partition_cols = summary["partition_cols"]
+    dataset = ds.dataset(
+        root,
+        schema=schema,
+        format="ipc",
+        partitioning=ds.partitioning(
+            pa.schema([schema.field(c) for c in partition_cols]), flavor="hive"
+        ),
+        filesystem=pyarrow.fs.LocalFileSystem(use_mmap=True),
+    )
+
+    expression = None
+    for column, values in selected.items():
+        if column not in partition_cols or not values:
+            continue
+        condition = ds.field(column).isin(list(values))
+        expression = condition if expression is None else expression & condition
+
+    tables, labels, offsets = [], [], {}
+    for fragment in sorted(dataset.get_fragments(filter=expression), key=lambda f: f.path):
+        table = fragment.to_table(schema=schema)
+        base = _partition_base(fragment.path, root)
+        start = offsets.get(base, base)
+        offsets[base] = start + table.num_rows
+        tables.append(table)
+        labels.append(np.arange(start, start + table.num_rows, dtype=np.int64))
+    table = pa.concat_tables(tables) if tables else schema.empty_table()
+    df = table.select(summary["columns"]).to_pandas(split_blocks=True)
+    return df.set_axis(
+        pd.Index(np.concatenate(labels) if labels else [], dtype=np.int64), axis=0
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert local PLE sources to memory-mappable Arrow files"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="Arrow copy next to each source")
+    convert.add_argument("sources", nargs="+", help="CSV or Excel files to convert")
+    convert.add_argument(
+        "--force", action="store_true", help="Convert even if the copy is current"
+    )
+
+    partition = commands.add_parser("partition", help="Hive-style partitioned dataset")
+    partition.add_argument("source", help="CSV, Excel or .arrow file")
+    partition.add_argument("root", help="Output directory")
+    partition.add_argument(
+        "--by", nargs="+", default=["Year"], help="Partition columns (default: Year)"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "convert":
+        for path in args.sources:
+            if not args.force and is_converted(path):
+                print(f"up to date: {arrow_path_for(path)}")
+                continue
+            print(f"converted:  {convert_source(path)}")
+    else:
+        summary = write_partitioned(load_local(args.source), args.root, args.by)
+        print(f"wrote {len(summary['partitions'])} partitions to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
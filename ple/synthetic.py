@@ -0,0 +1,172 @@
+"""
+Synthetic PLE digests
+Generates district (or school) level results with the exact column layout
+of the published digest, at any scale, for benchmarks and load tests.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+DIVISIONS = ["1", "2", "3", "4", "U", "X"]
+
+# Column order and spelling of the published digest, typos included
+COLUMNS = (
+    ["Year", "Zone", "Sub Region", "District"]
+    + [f"Division {d} - {g}" for d in DIVISIONS for g in ("Boys", "Girls", "Total")]
+    + [f"{m} - {g}" for m in ("Registered", "Sat", "Passed", "Pass Rate") for g in ("Boys", "Girls", "Total")]
+    + [f"Pass Division 1_2_3 {g}" for g in ("Boys", "Girls", "Total")]
+    + [f"Pass Rate Division 1_2_3 {g}" for g in ("Boys", "Girls", "Total")]
+    + [f"Pass Rate Division 1 {g}" for g in ("Boys", "Girls", "Total")]
+    + ["Failure Rate -  Boys", "Failure Rate - Girls", "Failure Rate - Total"]
+    + [f"Abseentism Rate - {g}" for g in ("Boys", "Girls", "Total")]
+)
+
+ZONES = ["Other", "MZO", "AZO", "FZO", "KMD"]
+ZONE_WEIGHTS = [0.78, 0.07, 0.06, 0.05, 0.04]
+SUB_REGIONS = [
+    "Ankole", "West Nile", "Busoga", "South Buganda", "Karamoja",
+    "North Buganda", "Acholi", "Bunyoro", "Teso", "Elgon", "Lango",
+    "Toro", "Bukedi", "Kigezi", "Kampala",
+]
+
+# National share of candidates per division (2022-2025 digests)
+DIVISION_SHARES = np.array([0.118, 0.463, 0.198, 0.101, 0.103, 0.017])
+GIRLS_SHARE = 0.523
+
+
+def _rates(numerator, denominator):
+    rate = np.divide(
+        numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0
+    )
+    return pd.Series(rate * 100).map("{:.2f}%".format).to_numpy()
+
+
+def _districts(count, rng):
+    names = np.array([f"District {i:04d}" for i in range(1, count + 1)])
+    return pd.DataFrame(
+        {
+            "District": names,
+            "Zone": rng.choice(ZONES, count, p=ZONE_WEIGHTS),
+            "Sub Region": rng.choice(SUB_REGIONS, count),
+            # Persistent district strength and size, so years correlate
+            "size": rng.lognormal(np.log(4300), 0.6, count),
+            "strength": rng.normal(0, 0.35, count),
+        }
+    )
+
+
+def generate_year(year, districts, schools=1, rng=None):
+    """One results year: ``len(districts) * schools`` rows"""
+    rng = rng or np.random.default_rng()
+    n = len(districts) * schools
+    base = districts.loc[districts.index.repeat(schools)].reset_index(drop=True)
+
+    registered = np.maximum(
+        rng.lognormal(np.log(base["size"] / schools), 0.25), 5
+    ).astype(np.int64)
+
+    # Stronger districts shift candidates from the lower divisions to the upper
+    tilt = np.outer(base["strength"] + rng.normal(0, 0.1, n), [1.2, 0.6, 0, -0.6, -1.2, -0.3])
+    alpha = DIVISION_SHARES * np.exp(tilt) * 60
+    shares = rng.gamma(alpha)
+    shares /= shares.sum(axis=1, keepdims=True)
+    totals = np.floor(shares * registered[:, None]).astype(np.int64)
+    totals[:, 1] += registered - totals.sum(axis=1)
+
+    girls = rng.binomial(totals, np.clip(rng.normal(GIRLS_SHARE, 0.03, totals.shape), 0, 1))
+    boys = totals - girls
+
+    out = {"Year": np.full(n, year), "Zone": base["Zone"], "Sub Region": base["Sub Region"]}
+    out["District"] = (
+        base["District"]
+        if schools == 1
+        else base["District"] + " School " + pd.Series(np.tile(np.arange(1, schools + 1), len(districts))).astype(str).str.zfill(3)
+    )
+    for i, d in enumerate(DIVISIONS):
+        out[f"Division {d} - Boys"] = boys[:, i]
+        out[f"Division {d} - Girls"] = girls[:, i]
+        out[f"Division {d} - Total"] = totals[:, i]
+
+    for label, counts in (("Boys", boys), ("Girls", girls), ("Total", totals)):
+        reg = counts.sum(axis=1)
+        sat = reg - counts[:, 5]
+        passed = counts[:, :4].sum(axis=1)
+        upper = counts[:, :3].sum(axis=1)
+        out[f"Registered - {label}"] = reg
+        out[f"Sat - {label}"] = sat
+        out[f"Passed - {label}"] = passed
+        out[f"Pass Rate - {label}"] = _rates(passed, sat)
+        out[f"Pass Division 1_2_3 {label}"] = upper
+        out[f"Pass Rate Division 1_2_3 {label}"] = _rates(upper, sat)
+        out[f"Pass Rate Division 1 {label}"] = _rates(counts[:, 0], sat)
+        failure = "Failure Rate -  Boys" if label == "Boys" else f"Failure Rate - {label}"
+        out[failure] = _rates(counts[:, 4], sat)
+        out[f"Abseentism Rate - {label}"] = _rates(counts[:, 5], reg)
+
+    return pd.DataFrame(out)[COLUMNS]
+
+
+def iter_digest(districts=136, years=4, schools=1, last_year=2025, seed=0):
+    """Yield one frame per results year, oldest first"""
+    rng = np.random.default_rng(seed)
+    pool = _districts(districts, rng)
+    for year in range(last_year - years + 1, last_year + 1):
+        yield generate_year(year, pool, schools, rng)
+
+
+def generate_digest(districts=136, years=4, schools=1, last_year=2025, seed=0):
+    """A full synthetic digest as one frame"""
+    return pd.concat(
+        iter_digest(districts, years, schools, last_year, seed), ignore_index=True
+    )
+
+
+def write_digest(path, districts=136, years=4, schools=1, last_year=2025, seed=0):
+    """Stream a synthetic digest to CSV or Arrow one year at a time.
+
+    Memory stays bounded by one year of rows, so tens of millions of rows
+    can be written. Returns the number of rows written.
+    """
+    rows = 0
+    frames = iter_digest(districts, years, schools, last_year, seed)
+    if path.endswith(".arrow"):
+        writer = None
+        with pa.OSFile(path, "wb") as sink:
+            for df in frames:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pa.ipc.new_file(sink, table.schema)
+                writer.write_table(table)
+                rows += len(df)
+            if writer is not None:
+                writer.close()
+        return rows
+    for i, df in enumerate(frames):
+        df.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows += len(df)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic PLE digest")
+    parser.add_argument("output", help="CSV or .arrow file to write")
+    parser.add_argument("--districts", type=int, default=136)
+    parser.add_argument("--years", type=int, default=4)
+    parser.add_argument(
+        "--schools", type=int, default=1, help="Rows per district and year"
+    )
+    parser.add_argument("--last-year", type=int, default=2025)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rows = write_digest(
+        args.output, args.districts, args.years, args.schools, args.last_year, args.seed
+    )
+    print(f"wrote {rows:,} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
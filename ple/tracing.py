@@ -0,0 +1,207 @@
+"""
+Pipeline tracing
+Span-based telemetry for the fetch, parse, clean, filter, aggregate,
+figure-build and serialize stages. Spans are written as JSON lines to a
+size-rotated local file, or handed to OpenTelemetry when it is installed
+and selected. Nothing is recorded until ``configure`` enables a sink.
+
+    PLE_TRACE_FILE=traces/ple.jsonl         rotating JSONL sink
+    PLE_TRACE_EXPORTER=otlp | console       OpenTelemetry exporter
+"""
+
+import json
+import logging
+import logging.handlers
+import numbers
+import os
+import threading
+import time
+import uuid
+import warnings
+from contextlib import contextmanager, nullcontext
+
+SERVICE_NAME = "ple-dashboard"
+MAX_BYTES = 10 * 2**20
+BACKUP_COUNT = 5
+
+_local = threading.local()
+_sink = None
+
+
+def _clean(value):
+    """Coerce an attribute to a JSON / OpenTelemetry friendly value"""
+    if value is None or isinstance(value, (str, bool)):
+        return value
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, (list, tuple, set)):
+        return [str(v) for v in value]
+    return str(value)
+
+
+class JsonlSink:
+    """Append one JSON object per finished span to a size-rotated file"""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.logger = logging.getLogger(f"ple.trace.{path}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        if not self.logger.handlers:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backup_count
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger.addHandler(handler)
+
+    def start(self, span, parent):
+        pass
+
+    def end(self, span):
+        self.logger.info(
+            json.dumps(
+                {
+                    "trace_id": span.trace_id,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "name": span.name,
+                    "start": span.start_time,
+                    "duration_ms": round((span.end_time - span.start_time) * 1000, 3),
+                    "status": "error" if span.error else "ok",
+                    "error": span.error,
+                    "attributes": span.attributes,
+                    "service": SERVICE_NAME,
+                    "pid": os.getpid(),
+                    "thread": threading.current_thread().name,
+                }
+            )
+        )
+
+
+class OpenTelemetrySink:
+    """Forward spans to an OpenTelemetry tracer provider"""
+
+    def __init__(self, exporter="otlp"):
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import (
+            BatchSpanProcessor,
+            ConsoleSpanExporter,
+        )
+
+        if exporter == "otlp":
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+
+            span_exporter = OTLPSpanExporter()
+        else:
+            span_exporter = ConsoleSpanExporter()
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": SERVICE_NAME})
+        )
+        provider.add_span_processor(BatchSpanProcessor(span_exporter))
+        self._trace = trace
+        self.tracer = provider.get_tracer("ple")
+
+    def start(self, span, parent):
+        context = None
+        if parent is not None and parent.handle is not None:
+            context = self._trace.set_span_in_context(parent.handle)
+        span.handle = self.tracer.start_span(
+            span.name, context=context, start_time=int(span.start_time * 1e9)
+        )
+
+    def end(self, span):
+        span.handle.set_attributes(
+            {k: v for k, v in span.attributes.items() if v is not None}
+        )
+        if span.error:
+            span.handle.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.error))
+        span.handle.end(end_time=int(span.end_time * 1e9))
+
+
+class Span:
+    def __init__(self, name, parent, attributes, start_time=None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = {k: _clean(v) for k, v in attributes.items()}
+        self.start_time = start_time or time.time()
+        self.end_time = None
+        self.error = None
+        self.handle = None
+
+    def set(self, **attributes):
+        self.attributes.update({k: _clean(v) for k, v in attributes.items()})
+
+
+class _NoSpan:
+    def set(self, **attributes):
+        pass
+
+
+def configure(path=None, exporter=None, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT):
+    """Choose the sink: OpenTelemetry ``exporter`` if importable, else ``path``"""
+    global _sink
+    if exporter:
+        try:
+            _sink = OpenTelemetrySink(exporter)
+            return _sink
+        except ImportError as e:
+            warnings.warn(f"OpenTelemetry exporter unavailable ({e}); using PLE_TRACE_FILE")
+    _sink = JsonlSink(path, max_bytes, backup_count) if path else None
+    return _sink
+
+
+def configure_from_env():
+    return configure(
+        path=os.environ.get("PLE_TRACE_FILE"),
+        exporter=os.environ.get("PLE_TRACE_EXPORTER"),
+        max_bytes=int(os.environ.get("PLE_TRACE_MAX_BYTES", MAX_BYTES)),
+    )
+
+
+def enabled():
+    return _sink is not None
+
+
+def current_span():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def _span(sink, name, attributes, start_time):
+    stack = _local.__dict__.setdefault("stack", [])
+    parent = stack[-1] if stack else None
+    span = Span(name, parent, attributes, start_time)
+    sink.start(span, parent)
+    stack.append(span)
+    try:
+        yield span
+    except Exception as e:
+        # Control flow such as Streamlit's rerun/stop derives from
+        # BaseException only and is not an error
+        span.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        stack.pop()
+        span.end_time = time.time()
+        sink.end(span)
+
+
+def span(name, start_time=None, **attributes):
+    """Trace a block; yields a span whose ``set`` adds attributes.
+
+    ``start_time`` (epoch seconds) backdates the span, e.g. to cover work
+    that finished before the block was entered.
+    """
+    if _sink is None:
+        return nullcontext(_NoSpan())
+    return _span(_sink, name, attributes, start_time)
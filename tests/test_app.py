@@ -0,0 +1,76 @@
+"""
+App tests
+Whole-script runs of the dashboard through Streamlit's AppTest, with the
+sheet export stubbed out.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit.testing.v1")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+DIGEST = ROOT / "data" / "V2" / "P.L.E Digest 2023 - 2025 v1.csv"
+
+SCRIPT = """
+import runpy
+import sys
+
+import requests
+
+def get(*args, **kwargs):
+    raise requests.ConnectionError("export unreachable")
+
+requests.get = get
+sys.path.insert(0, {root!r})
+runpy.run_path({app!r}, run_name="__main__")
+"""
+
+
+def test_failed_fetch_into_empty_shared_store_reports_load_failure(tmp_path, monkeypatch):
+    monkeypatch.setenv("PLE_SHARED_DATASET_DIR", str(tmp_path / "shared"))
+    monkeypatch.delenv("PLE_DATA_PATH", raising=False)
+    at = AppTest.from_string(
+        SCRIPT.format(root=str(ROOT), app=str(ROOT / "app.py")), default_timeout=60
+    )
+
+    at.run()
+
+    assert not at.exception
+    assert "Failed to load data" in [e.value for e in at.error]
+
+
+def loaded_records(at):
+    """Rows the sidebar reports as loaded"""
+    for element in at.sidebar.markdown:
+        if "records from" in element.value:
+            return int(element.value.split("records from")[0].split()[-1].replace(",", ""))
+    return None
+
+
+def test_zone_selection_reads_only_that_zones_partitions(tmp_path, monkeypatch):
+    from ple.ingest import clean_file_source
+    from ple.storage import write_partitioned
+
+    root = tmp_path / "partitioned"
+    write_partitioned(clean_file_source({"path": str(DIGEST)}), root, ["Year", "Zone"])
+    monkeypatch.setenv("PLE_DATA_PATH", str(root))
+    monkeypatch.delenv("PLE_SHARED_DATASET_DIR", raising=False)
+    raw = pd.read_csv(DIGEST)
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120)
+
+    at.run()
+    next(m for m in at.sidebar.multiselect if m.label == "Year:").set_value([2024])
+    at.run()
+    assert loaded_records(at) == (raw["Year"] == 2024).sum()
+
+    zones = [s for s in at.sidebar.selectbox if s.label == "Zonal Office:"]
+    assert len(zones) == 1
+    zones[0].set_value("AZO")
+    at.run()
+
+    assert not at.exception
+    assert loaded_records(at) == ((raw["Year"] == 2024) & (raw["Zone"] == "AZO")).sum()
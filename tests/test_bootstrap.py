@@ -0,0 +1,89 @@
+"""
+Bootstrap interval tests
+Closed-form district intervals and the seeded cluster bootstrap.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ple import bootstrap
+
+
+def digest(boys, boys_passed, girls, girls_passed, **columns):
+    boys, boys_passed = np.asarray(boys), np.asarray(boys_passed)
+    girls, girls_passed = np.asarray(girls), np.asarray(girls_passed)
+    return pd.DataFrame(
+        {
+            "District": [f"D{i}" for i in range(len(boys))],
+            "Year": 2024,
+            "Registered - Boys": boys,
+            "Registered - Girls": girls,
+            "Registered - Total": boys + girls,
+            "Division 1 - Boys": boys_passed,
+            "Division 1 - Girls": girls_passed,
+            "Division 1 - Total": boys_passed + girls_passed,
+            **columns,
+        }
+    )
+
+
+def test_district_intervals_are_wilson_score_intervals():
+    counts = bootstrap.gap_counts(digest([100, 0], [60, 0], [100, 40], [40, 10]))
+
+    intervals = bootstrap.district_intervals(counts).set_index("District")
+
+    # 100 passes of 200: the textbook Wilson interval
+    assert intervals.loc["D0", ["Pass_Rate_Low", "Pass_Rate_High"]].tolist() == pytest.approx(
+        [43.14, 56.86], abs=0.01
+    )
+    assert intervals.loc["D0", "Gender_Gap"] == pytest.approx(20.0)
+    # No boys: no boys' rate and no gap, but the girls' interval stands
+    assert np.isnan(intervals.loc["D1", ["Boys_Pass_Rate", "Gender_Gap_Low"]]).all()
+    assert intervals.loc["D1", "Girls_Pass_Rate"] == pytest.approx(25.0)
+
+
+def test_gap_interval_mirrors_when_boys_and_girls_swap():
+    forward = bootstrap.district_intervals(
+        bootstrap.gap_counts(digest([100], [60], [80], [36]))
+    ).iloc[0]
+    swapped = bootstrap.district_intervals(
+        bootstrap.gap_counts(digest([80], [36], [100], [60]))
+    ).iloc[0]
+
+    assert forward["Gender_Gap_Low"] == pytest.approx(-swapped["Gender_Gap_High"])
+    assert forward["Gender_Gap_High"] == pytest.approx(-swapped["Gender_Gap_Low"])
+    assert forward["Gender_Gap_Low"] < forward["Gender_Gap"] < forward["Gender_Gap_High"]
+
+
+def test_group_bootstrap_is_seeded_and_brackets_the_pooled_rate():
+    rng = np.random.default_rng(0)
+    boys, girls = rng.integers(50, 500, 40), rng.integers(50, 500, 40)
+    data = digest(
+        boys,
+        rng.binomial(boys, 0.6),
+        girls,
+        rng.binomial(girls, 0.5),
+        **{"Sub Region": ["North"] * 20 + ["South"] * 19 + [None]},
+    )
+    counts = bootstrap.gap_counts(data, "Sub Region")
+
+    replicates = bootstrap.group_replicates(counts, 400, seed=7)
+    again = bootstrap.group_replicates(counts, 400, seed=7)
+    table = bootstrap.group_intervals(counts, replicates)
+
+    assert len(counts) == 39
+    assert replicates.shape == (400, 2, len(bootstrap.STATISTICS))
+    np.testing.assert_array_equal(replicates, again)
+    assert list(table.index) == ["North", "South"]
+    for name in bootstrap.STATISTICS:
+        assert (table[f"{name}_Low"] <= table[name]).all()
+        assert (table[name] <= table[f"{name}_High"]).all()
+
+
+def test_batches_split_work_and_seed_independently():
+    assert bootstrap.split(2000, 3) == [667, 667, 666]
+    assert bootstrap.split(2, 4) == [1, 1]
+    seeds = bootstrap.seeds(0, 3)
+    assert len(set(seeds)) == 3
+    assert seeds == bootstrap.seeds(0, 3)
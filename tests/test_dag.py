@@ -0,0 +1,137 @@
+"""
+Computation graph tests
+Which nodes a run executes and which it reuses, across runs sharing a
+cache and within one run as parameters change.
+"""
+
+import pandas as pd
+import pytest
+
+from ple.dag import Graph
+from ple.memcache import BudgetCache
+
+
+@pytest.fixture
+def graph():
+    """dataset -> view -> summary -> report, plus a per-year count"""
+    cache = BudgetCache(2**24)
+    graph = Graph(lambda: cache, opaque={"dataset": "data_version"})
+    calls = []
+
+    @graph.node("view", inputs=["dataset", "year"])
+    def view(data, year):
+        calls.append("view")
+        return data[data["Year"] == year]
+
+    @graph.node("summary", inputs=["view", "metric"])
+    def summary(data, metric):
+        calls.append("summary")
+        return data[metric].mean()
+
+    @graph.node("report", inputs=["summary", "label"])
+    def report(value, label):
+        calls.append("report")
+        return f"{label}: {value:.1f}"
+
+    @graph.node("rows", inputs=["view"])
+    def rows(data):
+        calls.append("rows")
+        return len(data)
+
+    graph.calls = calls
+    return graph
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame(
+        {
+            "Year": [2024, 2024, 2025],
+            "Pass_Rate": [80.0, 90.0, 70.0],
+            "Excellence_Rate": [10.0, 20.0, 30.0],
+        }
+    )
+
+
+def params(data, **changes):
+    return {
+        "dataset": data,
+        "data_version": "v1",
+        "year": 2024,
+        "metric": "Pass_Rate",
+        "label": "Pass rate",
+        **changes,
+    }
+
+
+def evaluate(run):
+    return run["report"], run["rows"]
+
+
+def test_first_run_executes_every_node(graph, data):
+    run = graph.run(**params(data))
+
+    assert evaluate(run) == ("Pass rate: 85.0", 2)
+    assert sorted(run.ran) == ["report", "rows", "summary", "view"]
+    assert run.reused == []
+
+
+def test_changing_a_parameter_reruns_only_its_downstream_nodes(graph, data):
+    evaluate(graph.run(**params(data)))
+
+    run = graph.run(**params(data, metric="Excellence_Rate"))
+    assert evaluate(run) == ("Pass rate: 15.0", 2)
+    assert run.ran == ["summary", "report"]
+    assert sorted(run.reused) == ["rows", "view"]
+
+    run = graph.run(**params(data, label="Pass"))
+    assert evaluate(run) == ("Pass: 85.0", 2)
+    # The report is rebuilt from the cached summary; nothing upstream runs
+    assert run.ran == ["report"]
+    assert sorted(run.reused) == ["rows", "summary"]
+
+
+def test_frames_are_keyed_by_their_version(graph, data):
+    evaluate(graph.run(**params(data)))
+
+    # Same version: the cached results stand for this frame
+    run = graph.run(**params(data.copy()))
+    evaluate(run)
+    assert run.ran == []
+
+    run = graph.run(**params(data.assign(Pass_Rate=50.0), data_version="v2"))
+    assert evaluate(run) == ("Pass rate: 50.0", 2)
+    assert sorted(run.ran) == ["report", "rows", "summary", "view"]
+
+
+def test_update_invalidates_only_dependent_results(graph, data):
+    run = graph.run(**params(data))
+    evaluate(run)
+    graph.calls.clear()
+
+    run.update(label="Pass")
+    assert evaluate(run) == ("Pass: 85.0", 2)
+    assert graph.calls == ["report"]
+
+    graph.calls.clear()
+    run.update(label="Pass")  # unchanged: nothing is invalidated
+    evaluate(run)
+    assert graph.calls == []
+
+    run.update(year=2025)
+    assert evaluate(run) == ("Pass: 70.0", 1)
+    assert sorted(graph.calls) == ["report", "rows", "summary", "view"]
+
+
+def test_update_with_a_frame_compares_versions(graph, data):
+    run = graph.run(**params(data))
+    evaluate(run)
+    graph.calls.clear()
+
+    run.update(dataset=data.copy())  # same version: kept
+    evaluate(run)
+    assert graph.calls == []
+
+    run.update(dataset=data.assign(Pass_Rate=60.0), data_version="v2")
+    assert evaluate(run) == ("Pass rate: 60.0", 2)
+    assert sorted(graph.calls) == ["report", "rows", "summary", "view"]
@@ -0,0 +1,59 @@
+"""
+District identity tests
+Spelling variants and split-off areas resolved to stable IDs across years.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ple.districts import DistrictRegistry, normalize
+
+
+def test_spellings_and_aliases_share_an_id():
+    registry = DistrictRegistry()
+
+    assert normalize("Kira M.C.") == "kira m c"
+    assert normalize("GULU_CITY") == "gulu city"
+    assert normalize("Bukwe M/C") == "bukwo m c"
+    ids = registry.ids(["GULU", "Gulu ", "Bukwe", "BUKWO", "Luwero", "LUWEERO"])
+    assert ids[0] == ids[1]
+    assert ids[2] == ids[3]
+    assert ids[4] == ids[5]
+    assert len(set(ids)) == 3
+
+
+def test_split_off_areas_link_to_their_parent():
+    registry = DistrictRegistry()
+    names = ["Wakiso", "Kira M.C.", "NANSANA M.C", "GULU_CITY", "GULU", "FORTPORTAL", None]
+
+    ids = registry.ids(names)
+    parents = registry.parents(ids)
+
+    assert ids[-1] == -1 and parents[-1] == -1
+    wakiso, gulu = registry.id("WAKISO"), registry.id("Gulu")
+    assert parents[:3].tolist() == [wakiso] * 3
+    assert parents[3:5].tolist() == [gulu] * 2
+    assert parents[5] == registry.id("Kabarole")
+    # Split-off areas keep their own ID
+    assert len(set(ids[:3])) == 3
+
+
+def test_ids_align_districts_across_years():
+    registry = DistrictRegistry()
+    digest = pd.DataFrame(
+        {
+            "Year": [2024, 2024, 2025, 2025, 2025],
+            "District": ["BUKWE", "MASAKA", "Bukwo", "Masaka", "MASAKA CITY"],
+            "Registered - Total": [900, 4000, 950, 2500, 1600],
+        }
+    )
+
+    ids = registry.ids(digest["District"])
+    totals = digest.groupby([registry.parents(ids), digest["Year"]])["Registered - Total"].sum()
+
+    masaka = registry.id("masaka")
+    assert totals[(masaka, 2024)] == 4000
+    assert totals[(masaka, 2025)] == 4100
+    assert totals[(registry.id("Bukwo"), 2025)] == 950
+    # IDs are assigned once per process-wide registry
+    assert np.array_equal(registry.ids(digest["District"]), ids)
@@ -0,0 +1,67 @@
+"""
+Workbook cache tests
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from ple import excel
+from ple.excel import read_workbook
+
+
+def test_concurrent_first_reads_share_one_published_copy(tmp_path):
+    workbook = tmp_path / "digest.xlsx"
+    with pd.ExcelWriter(workbook) as writer:
+        pd.DataFrame({"District": ["A", "B"], "Total": [1, 2]}).to_excel(
+            writer, sheet_name="Districts", index=False
+        )
+        pd.DataFrame({"Note": ["x"]}).to_excel(writer, sheet_name="Notes", index=False)
+    cache_dir = tmp_path / "cache"
+
+    with ThreadPoolExecutor(8) as pool:
+        reads = list(pool.map(lambda _: read_workbook(str(workbook), str(cache_dir)), range(8)))
+    cached = read_workbook(str(workbook), str(cache_dir))
+
+    for sheets in reads + [cached]:
+        assert list(sheets) == ["Districts", "Notes"]
+        assert sheets["Districts"]["Total"].tolist() == [1, 2]
+    # One published directory per workbook digest, no leftover temp dirs
+    entries = sorted(os.listdir(cache_dir))
+    assert entries[-1] == "index.json"
+    assert [e for e in entries[:-1] if e.endswith(".tmp")] == []
+    assert len(entries) == 2
+
+
+def test_first_and_cached_reads_return_the_same_frames(tmp_path):
+    workbook = tmp_path / "mixed.xlsx"
+    pd.DataFrame(
+        {"District": ["A", "B", None], "Code": [1, "2", 3], "Total": [1.5, None, 2]}
+    ).to_excel(workbook, sheet_name="Districts", index=False)
+    cache_dir = str(tmp_path / "cache")
+
+    first = read_workbook(str(workbook), cache_dir)["Districts"]
+    cached = read_workbook(str(workbook), cache_dir)["Districts"]
+
+    pd.testing.assert_frame_equal(first, cached)
+    assert first["Code"].tolist() == [1, 2, 3]
+
+
+def test_unwritable_cache_logs_a_warning(tmp_path, monkeypatch, caplog):
+    workbook = tmp_path / "digest.xlsx"
+    pd.DataFrame({"District": ["A"]}).to_excel(workbook, index=False)
+
+    replace = os.replace
+
+    def fail(src, dst):
+        if src.endswith(".tmp") and os.path.isdir(src):
+            raise PermissionError("read-only cache")
+        replace(src, dst)
+
+    monkeypatch.setattr(excel.os, "replace", fail)
+    with caplog.at_level("WARNING", logger="ple.excel"):
+        sheets = read_workbook(str(workbook), str(tmp_path / "cache"))
+
+    assert sheets["Sheet1"]["District"].tolist() == ["A"]
+    assert "could not cache workbook sheets" in caplog.text
@@ -0,0 +1,60 @@
+"""
+Geography hierarchy tests
+Dependent filter options and emptiness checks over non-hierarchical data.
+"""
+
+import pandas as pd
+import pytest
+
+from ple.hierarchy import ALL, HierarchyIndex
+
+LEVELS = ["Zone", "Sub Region", "District"]
+
+
+@pytest.fixture
+def index():
+    # Busoga spans two zones, and 2025 has no zones at all
+    data = pd.DataFrame(
+        [
+            (2024, "KMD", "Buganda", "WAKISO"),
+            (2024, "KMD", "Busoga", "JINJA"),
+            (2024, "MZO", "Busoga", "IGANGA"),
+            (2024, "MZO", "Ankole", "MBARARA"),
+            (2025, None, "Buganda", "WAKISO"),
+            (2025, None, "Buganda", "NANSANA"),
+            (2025, None, "Ankole", "MBARARA"),
+        ],
+        columns=["Year"] + LEVELS,
+    )
+    return HierarchyIndex(data, LEVELS + ["School"])
+
+
+def test_levels_missing_from_the_data_are_dropped(index):
+    assert index.levels == tuple(LEVELS)
+    assert index.years == [2025, 2024]
+
+
+def test_options_follow_the_levels_above(index):
+    assert index.options("Zone", years=[2024]) == ["KMD", "MZO"]
+    assert index.options("Sub Region", ["KMD"], [2024]) == ["Buganda", "Busoga"]
+    assert index.options("District", ["MZO", "Busoga"], [2024]) == ["IGANGA"]
+    # A Sub Region spanning zones lists its districts from both
+    assert index.options("District", [ALL, "Busoga"]) == ["IGANGA", "JINJA"]
+
+
+def test_years_merge_and_missing_values_read_as_all(index):
+    assert index.options("Zone", years=[2025]) == []
+    assert index.options("District", [ALL, "Buganda"], [2025]) == ["NANSANA", "WAKISO"]
+    assert index.options("District", [ALL, "Buganda"]) == ["NANSANA", "WAKISO"]
+    # Unknown years contribute nothing
+    assert index.options("District", [ALL, "Buganda"], [2030]) == []
+
+
+def test_counts_and_impossible_combinations(index):
+    assert index.count() == 7
+    assert index.count(["KMD"]) == 2
+    assert index.count([ALL, ALL, "MBARARA"]) == 2
+    assert index.count([ALL, "Ankole"], [2025]) == 1
+    assert index.exists([ALL, ALL, "NANSANA"], [2025])
+    assert not index.exists([ALL, ALL, "NANSANA"], [2024])
+    assert not index.exists(["KMD", "Ankole"])
@@ -0,0 +1,205 @@
+"""
+Ingestion tests
+Manifests of local CSV/Excel fixtures and sheet tabs served by a stub HTTP
+server, loaded through the same concurrent path the app uses.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ple import ingest
+from ple.offload import OffloadExecutor
+from ple.storage import read_partitioned, write_partitioned
+
+ROOT = Path(__file__).resolve().parents[1]
+DIGEST = ROOT / "data" / "V2" / "P.L.E Digest 2023 - 2025 v1.csv"
+
+
+@pytest.fixture(scope="module")
+def digest():
+    """Three districts of one year of the bundled digest"""
+    raw = pd.read_csv(DIGEST)
+    return raw[raw["Year"] == 2024].head(3).reset_index(drop=True)
+
+
+@pytest.fixture
+def sheet_server(digest):
+    """Stub sheet export: ``/<sheet_id>/<sheet_name>`` serves the digest as
+    CSV, ``slow`` answers late and anything else is a 404"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            sheet_id = self.path.strip("/").split("/")[0]
+            if sheet_id == "slow":
+                time.sleep(2)
+            if sheet_id not in ("digest", "slow"):
+                self.send_error(404)
+                return
+            body = digest.to_csv(index=False).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/{{sheet_id}}/{{sheet_name}}"
+    server.shutdown()
+    server.server_close()
+
+
+def write_manifest(path, sources):
+    path.write_text(json.dumps({"sources": sources}))
+    return ingest.load_manifest(path)
+
+
+def test_local_sources_align_schema_and_later_source_wins(tmp_path, digest):
+    digest.iloc[:2].to_csv(tmp_path / "first.csv", index=False)
+    # The workbook lacks the Year and Division U - Boys columns and
+    # reports different results for the second district
+    second = digest.iloc[1:].drop(columns=["Year", "Division U - Boys"])
+    second.loc[1, "Division 1 - Boys"] += 100
+    second.to_excel(tmp_path / "second.xlsx", sheet_name="Digest", index=False)
+    sources = write_manifest(
+        tmp_path / "sources.json",
+        [
+            {"path": "first.csv"},
+            {"path": "second.xlsx", "sheet": "Digest", "columns": {"Year": 2024}},
+        ],
+    )
+
+    combined = ingest.ingest_sources(sources, max_workers=1)
+
+    assert combined["District"].tolist() == digest["District"].tolist()
+    assert combined["Year"].tolist() == [2024] * 3
+    # Counts missing from a source are 0, as cleaning does for blank cells
+    division_u = combined.set_index("District")["Division U - Boys"]
+    assert division_u[digest.loc[0, "District"]] == digest.loc[0, "Division U - Boys"]
+    assert (division_u[digest["District"].iloc[1:]] == 0).all()
+    # The workbook came later, so its row for the shared district wins
+    shared = combined.set_index("District").loc[digest.loc[1, "District"]]
+    assert shared["Division 1 - Boys"] == digest.loc[1, "Division 1 - Boys"] + 100
+
+
+def test_sheet_sources_are_fetched_over_http(tmp_path, monkeypatch, digest, sheet_server):
+    monkeypatch.setattr(ingest, "SHEET_EXPORT_URL", sheet_server)
+    sources = write_manifest(
+        tmp_path / "sources.json",
+        [{"sheet_id": "digest", "sheet_name": "PLE 2024"}],
+    )
+
+    combined = ingest.ingest_sources(sources, max_workers=1)
+
+    assert combined["District"].tolist() == digest["District"].tolist()
+    assert combined["Registered - Total"].tolist() == digest["Registered - Total"].tolist()
+
+
+def test_sources_can_use_the_shared_offload_pool(tmp_path, digest):
+    digest.to_csv(tmp_path / "digest.csv", index=False)
+    sources = write_manifest(tmp_path / "sources.json", [{"path": "digest.csv"}])
+    executor = OffloadExecutor(max_workers=1)
+    try:
+        combined = ingest.ingest_sources(sources, workers=executor)
+    finally:
+        executor.shutdown()
+
+    assert combined["District"].tolist() == digest["District"].tolist()
+    stats = executor.metrics()
+    assert (stats["completed"], stats["in_flight"]) == (1, 0)
+
+
+def test_http_error_names_the_failing_source(tmp_path, monkeypatch, sheet_server):
+    monkeypatch.setattr(ingest, "SHEET_EXPORT_URL", sheet_server)
+    sources = write_manifest(
+        tmp_path / "sources.json",
+        [{"sheet_id": "digest"}, {"sheet_id": "missing", "sheet_name": "Tab"}],
+    )
+
+    with pytest.raises(ingest.SourceError, match=r"sheet missing \[Tab\].*404"):
+        ingest.ingest_sources(sources, max_workers=1)
+
+
+def test_slow_sheet_times_out(tmp_path, monkeypatch, sheet_server):
+    monkeypatch.setattr(ingest, "SHEET_EXPORT_URL", sheet_server)
+    sources = write_manifest(tmp_path / "sources.json", [{"sheet_id": "slow"}])
+
+    with pytest.raises(ingest.SourceError, match=r"sheet slow \[Sheet1\].*timed out"):
+        ingest.ingest_sources(sources, max_workers=1, timeout=0.2)
+
+
+def test_batch_is_aligned_to_the_stored_schema(tmp_path, digest):
+    root = tmp_path / "partitioned"
+    write_partitioned(ingest.clean_file_source({"path": str(DIGEST)}), root)
+    batch = digest.iloc[:1].drop(columns=["Zone", "Division U - Boys"]).assign(Year=2026)
+
+    ingest.ingest_batch(batch, root)
+
+    added = read_partitioned(root, Year=[2026])
+    stored = read_partitioned(root, Year=[2024])
+    assert list(added.columns) == list(stored.columns)
+    assert added.dtypes.equals(stored.dtypes)
+    assert added["Division U - Boys"].tolist() == [0]
+    assert added["Zone"].isna().all()
+    assert len(stored) == (pd.read_csv(DIGEST)["Year"] == 2024).sum()
+
+
+def test_append_to_missing_dataset_is_a_usage_error(tmp_path, capsys):
+    source = tmp_path / "batch.csv"
+    source.write_text("Year,District\n2026,X\n")
+
+    with pytest.raises(SystemExit) as exit_info:
+        ingest.main(["append", str(source), str(tmp_path / "empty")])
+
+    assert exit_info.value.code == 2
+    assert "is not a partitioned PLE dataset" in capsys.readouterr().err
+
+
+@pytest.fixture
+def zoned(tmp_path):
+    """The bundled digest partitioned by Year and Zone (2025 has no zones)"""
+    root = tmp_path / "zoned"
+    write_partitioned(ingest.clean_file_source({"path": str(DIGEST)}), root, ["Year", "Zone"])
+    return root
+
+
+def test_batch_with_null_and_set_zones_keeps_other_rows(zoned):
+    stored = read_partitioned(zoned, Year=[2025])
+    batch = pd.read_csv(DIGEST).query("Year == 2025").head(2).assign(Zone=["AZO", None])
+
+    ingest.ingest_batch(batch, zoned)
+
+    after = read_partitioned(zoned, Year=[2025])
+    assert len(after) == len(stored)
+    assert after["District"].is_unique
+    zones = after.set_index("District")["Zone"]
+    assert zones[batch["District"].iloc[0]] == "AZO"
+    assert zones.isna().sum() == len(stored) - 1
+
+
+def test_corrected_row_moves_out_of_its_old_zone(zoned):
+    stored = read_partitioned(zoned, Year=[2024])
+    # Move every district of the smallest zone, which empties its partition
+    smallest = stored["Zone"].value_counts().idxmin()
+    raw = pd.read_csv(DIGEST)
+    batch = raw[(raw["Year"] == 2024) & (raw["Zone"] == smallest)].assign(Zone="AZO")
+
+    summary = ingest.ingest_batch(batch, zoned)
+
+    after = read_partitioned(zoned, Year=[2024])
+    assert len(after) == len(stored)
+    assert after["District"].is_unique
+    assert smallest not in set(after["Zone"])
+    assert {"Year": 2024, "Zone": smallest} not in [p["values"] for p in summary["partitions"]]
+    assert not (zoned / "Year=2024" / f"Zone={smallest}").exists()
+    assert sum(p["rows"] for p in summary["partitions"]) == len(read_partitioned(zoned))
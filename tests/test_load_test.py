@@ -0,0 +1,51 @@
+"""
+Load test tests
+Latency percentiles and a short single-session run of the load test.
+"""
+
+import importlib.util
+import json
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+spec = importlib.util.spec_from_file_location(
+    "load_test", os.path.join(ROOT, "benchmarks", "load_test.py")
+)
+load_test = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(load_test)
+
+
+def test_percentiles_pick_nearest_ranks():
+    summary = load_test.percentiles([float(v) for v in range(100, 0, -1)])
+
+    assert summary["count"] == 100
+    assert summary["mean_s"] == 50.5
+    assert (summary["p50_s"], summary["p95_s"], summary["p99_s"]) == (51.0, 95.0, 99.0)
+    assert summary["max_s"] == 100.0
+    assert load_test.percentiles([]) == {}
+
+
+def test_short_run_writes_a_clean_report(tmp_path, monkeypatch):
+    # main() points the app at its generated digest and drops the other
+    # sources; setting them here makes monkeypatch restore them afterwards
+    for var in ("PLE_DATA_PATH", "PLE_SOURCES_MANIFEST", "PLE_SHARED_DATASET_DIR"):
+        monkeypatch.setenv(var, os.environ.get(var, ""))
+    output = tmp_path / "report.json"
+
+    try:
+        load_test.main(
+            ["--sessions", "1", "--actions", "4", "--scale", "12x2x1", "--output", str(output)]
+        )
+    except SystemExit as exit:
+        pytest.fail(f"load test reported errors (exit {exit.code}): {output.read_text()}")
+
+    report = json.loads(output.read_text())
+    assert report["errors"] == []
+    assert report["data"] == "synthetic 12x2x1"
+    assert 1 <= report["reruns"] <= 5
+    assert report["latency"]["count"] == report["reruns"]
+    assert "initial_load" in report["latency_by_action"]
+    assert report["peak_rss_bytes"] > 0
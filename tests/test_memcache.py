@@ -0,0 +1,68 @@
+"""
+Budgeted cache tests
+Eviction order, the byte budget, and the cache's own accounting checked
+against the memory tracemalloc sees it hold.
+"""
+
+import gc
+import pickle
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from ple.memcache import MISSING, BudgetCache
+
+
+def frame(seed, rows=2_000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"a": rng.random(rows), "b": rng.integers(0, 100, rows)})
+
+
+def payload_size(value):
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    size = payload_size(frame(0))
+    cache = BudgetCache(3 * size + size // 2)
+    for key in "abc":
+        cache.put(key, frame(0))
+    cache.get("a")  # a is now the most recently used
+
+    cache.put("d", frame(0))  # evicts b
+    cache.put("e", frame(0))  # evicts c
+
+    missing = [key for key in "abcde" if cache.get(key) is MISSING]
+    assert missing == ["b", "c"]
+    assert cache.usage()["evictions"] == 2
+
+
+def test_usage_stays_within_budget_and_matches_traced_memory():
+    budget = 2 * 2**20
+    cache = BudgetCache(budget)
+    # Warm up first, so one-off allocations (imports, pickle and pandas
+    # internals) are not counted as cache growth
+    warm = BudgetCache(budget)
+    warm.put("warm", frame(0))
+    warm.get("warm")
+    del warm
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for seed in range(100):
+            cache.put(("frame", seed), frame(seed), kind="frame")
+            assert cache.usage()["bytes"] <= budget
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    usage = cache.usage()
+    assert usage["evictions"] > 0
+    assert 0 < usage["bytes"] <= budget
+    assert usage["by_kind"]["frame"]["bytes"] == usage["bytes"]
+    # What the process holds for the cache is its payloads plus a little
+    # bookkeeping per entry
+    assert abs(growth - usage["bytes"]) <= 0.05 * usage["bytes"] + 64 * 1024
@@ -0,0 +1,95 @@
+"""
+Peer group tests
+KD-tree queries against a brute-force scan, and peers within one year.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ple.peers import KDTree, PeerIndex
+
+
+@pytest.fixture
+def digest():
+    rng = np.random.default_rng(3)
+    rows = 60
+    registered = rng.integers(500, 9000, rows * 2)
+    divisions = rng.dirichlet(np.ones(6), rows * 2) * registered[:, None]
+    data = pd.DataFrame(
+        {
+            "Year": np.repeat([2024, 2025], rows),
+            "District": [f"District {i:02d}" for i in range(rows)] * 2,
+            "Registered - Total": registered,
+            "Registered - Girls": (registered * rng.uniform(0.4, 0.6, rows * 2)).round(),
+        }
+    )
+    for i, division in enumerate(["1", "2", "3", "4", "U", "X"]):
+        data[f"Division {division} - Total"] = divisions[:, i].round()
+    data["Pass Rate - Total"] = rng.uniform(50, 99, rows * 2)
+    # Offset labels, so positions and index labels differ
+    data.index = data.index + 1000
+    return data
+
+
+@pytest.mark.parametrize("leaf_size", [1, 4, 64])
+def test_query_matches_a_brute_force_scan(leaf_size):
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(300, 5))
+    tree = KDTree(points, leaf_size=leaf_size)
+
+    for x in rng.normal(size=(20, 5)):
+        found, distance = tree.query(x, 7)
+        brute = np.sqrt(((points - x) ** 2).sum(axis=1))
+        expected = np.argsort(brute, kind="stable")[:7]
+        assert list(found) == list(expected)
+        np.testing.assert_allclose(distance, brute[expected])
+
+
+def test_query_handles_duplicates_and_small_trees():
+    tree = KDTree(np.zeros((10, 2)), leaf_size=2)
+
+    found, distance = tree.query([1.0, 0.0], 3)
+    assert len(set(found)) == 3
+    np.testing.assert_allclose(distance, 1.0)
+    assert len(tree.query([0.0, 0.0], 50)[0]) == 10
+    assert len(KDTree(np.empty((0, 2))).query([0.0, 0.0], 3)[0]) == 0
+
+
+def test_peers_exclude_the_district_and_stay_in_its_year(digest):
+    index = PeerIndex(digest)
+
+    row = digest.index[70]
+    peers = index.peers(row, 5)
+    assert len(peers) == 5
+    assert row not in peers.index
+    assert (digest.loc[peers.index, "Year"] == digest.loc[row, "Year"]).all()
+    assert peers.is_monotonic_increasing
+
+    # The same distances as a scan over the standardized features
+    features = index.features
+    scaled = (features - features.mean()) / features.std(ddof=0)
+    same_year = scaled[(digest["Year"] == 2025) & (digest.index != row)]
+    brute = np.sqrt(((same_year - scaled.loc[row]) ** 2).sum(axis=1))
+    np.testing.assert_allclose(peers.to_numpy(), brute.nsmallest(5).to_numpy())
+
+
+def test_rows_with_undefined_features_have_no_peers(digest):
+    digest.loc[digest.index[3], "Registered - Total"] = 0
+    index = PeerIndex(digest)
+
+    assert index.peers(digest.index[3], 5).empty
+    assert digest.index[3] not in index.peers(digest.index[4], 59).index
+
+
+def test_compare_returns_only_the_kept_columns(digest):
+    index = PeerIndex(digest, columns=["District", "Pass Rate - Total"])
+
+    row = digest.index[0]
+    group = index.compare(row, 3, ["District", "Pass Rate - Total"])
+    assert list(group.columns) == ["District", "Pass Rate - Total", "Distance"]
+    assert group.index[0] == row
+    assert group["Distance"].iloc[0] == 0
+    assert group["Distance"].is_monotonic_increasing
+    with pytest.raises(KeyError):
+        index.compare(row, 3, ["Registered - Total"])
@@ -0,0 +1,22 @@
+"""
+Projection tests
+Trend initialization of the damped model across missing years.
+"""
+
+import numpy as np
+import pytest
+
+from ple.projection import PHI, damped_trend, linear_trend
+
+
+def test_damped_trend_spreads_a_gap_over_the_elapsed_years():
+    values = np.array([[np.nan, 50, np.nan, 70], [50, 60, np.nan, np.nan]])
+
+    forecast, _ = damped_trend(values)
+    linear, _ = linear_trend(values[:1], [2022, 2023, 2024, 2025])
+
+    # 20 points over two years is a trend of 10 a year, damped once
+    assert forecast[0] == pytest.approx(70 + PHI * 10)
+    assert forecast[0] < linear[0]
+    # Two missing years after the second observation move along the damped trend
+    assert forecast[1] == pytest.approx(60 + (PHI + PHI**2 + PHI**3) * 10)
@@ -0,0 +1,62 @@
+"""
+Data quality tests
+History checks across a district split.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ple.quality import scan
+
+
+def panel(parent_registered, split_registered):
+    """Five districts over four years; in the last year part of district A
+    is reported as a new district, A2"""
+    rows = []
+    for year in (2022, 2023, 2024, 2025):
+        for i, district in enumerate("ABCDE"):
+            registered = 1000 * (i + 1) + 10 * (year - 2022) * (i % 2 * 2 - 1)
+            rows.append({"Year": year, "District": district, "Registered - Total": registered})
+    rows[-5]["Registered - Total"] = parent_registered
+    rows.append({"Year": 2025, "District": "A2", "Registered - Total": split_registered})
+    data = pd.DataFrame(rows)
+    # A2 was split off A, so both have A's key
+    keys = np.where(data["District"] == "A2", "A", data["District"])
+    return data, keys
+
+
+def history(findings):
+    return findings[findings["Check"] == "History outlier"]
+
+
+def test_split_off_area_is_not_a_history_outlier():
+    data, keys = panel(430, 600)
+
+    by_row = scan(data, keys=keys)
+    combined = scan(
+        data,
+        keys=keys,
+        totals=["Registered - Total"],
+        label_rows=data["District"] != "A2",
+    )
+
+    assert history(by_row)["District"].tolist() == ["A"]
+    assert history(combined).empty
+
+
+def test_combined_district_jump_is_reported_on_the_parent_row():
+    data, keys = panel(1030, 6000)
+
+    findings = history(
+        scan(
+            data,
+            keys=keys,
+            totals=["Registered - Total"],
+            label_rows=data["District"] != "A2",
+        )
+    )
+
+    assert findings["District"].tolist() == ["A"]
+    # The value scored is the combined district's
+    assert findings["Value"].tolist() == [7030.0]
+    assert findings["Row"].tolist() == [15]
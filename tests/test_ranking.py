@@ -0,0 +1,86 @@
+"""
+Ranking tests
+Top/bottom selection against pandas, ranks with ties, and the district
+panel behind rank mobility.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ple.ranking import RankIndex, RankPanel
+
+
+@pytest.fixture
+def data():
+    return pd.DataFrame(
+        {
+            "Year": [2024, 2024, 2024, 2024, 2025, 2025, 2025],
+            "District": ["A", "B", "C", "D", "A", "B", "C"],
+            "Pass_Rate": [80.0, 90.0, 80.0, np.nan, 70.0, 70.0, 95.0],
+        },
+        index=[10, 11, 12, 13, 20, 21, 22],
+    )
+
+
+def test_top_and_bottom_match_nlargest_and_nsmallest_with_ties(data):
+    index = RankIndex(data, ["Pass_Rate", "Missing"])
+    view = data[data["District"] != "C"]
+
+    assert index.metrics == ["Pass_Rate"]
+    for n in (1, 3, 10):
+        # Rows without a value are never ranked
+        pd.testing.assert_frame_equal(
+            index.top(data, "Pass_Rate", n),
+            data.nlargest(n, "Pass_Rate").dropna(subset=["Pass_Rate"]),
+        )
+        pd.testing.assert_frame_equal(
+            index.bottom(view, "Pass_Rate", n),
+            view.nsmallest(n, "Pass_Rate").dropna(subset=["Pass_Rate"]),
+        )
+
+
+def test_tied_rows_share_a_dense_rank_within_their_year(data):
+    ranks = RankIndex(data, ["Pass_Rate"]).ranks(data, "Pass_Rate")
+
+    assert ranks["Rank"].tolist() == [2, 1, 2, pd.NA, 2, 2, 1]
+    # Share of the year's rows scoring at or below
+    assert ranks["Percentile"].round(1).tolist()[:3] == [66.7, 100.0, 66.7]
+    assert np.isnan(ranks.loc[13, "Percentile"])
+
+
+def test_ranks_are_stable_across_rebuilds_and_row_order(data):
+    shuffled = data.sample(frac=1, random_state=0)
+
+    first = RankIndex(data, ["Pass_Rate"]).ranks(data, "Pass_Rate")
+    again = RankIndex(shuffled, ["Pass_Rate"]).ranks(data, "Pass_Rate")
+
+    pd.testing.assert_frame_equal(first, again)
+
+
+def test_panel_combines_rows_sharing_a_key():
+    # In 2025 district A is reported as A and its split-off area A2
+    data = pd.DataFrame(
+        {
+            "Year": [2024, 2024, 2025, 2025, 2025],
+            "District": ["A", "B", "A", "A2", "B"],
+            "Registered - Total": [100, 300, 60, 60, 290],
+            "Pass_Rate": [50.0, 60.0, 40.0, 80.0, 55.0],
+        }
+    )
+    panel = RankPanel(
+        data,
+        ["Registered - Total", "Pass_Rate"],
+        keys=np.array([0, 1, 0, 0, 1]),
+        totals=["Registered - Total"],
+        weights=data["Registered - Total"],
+        label_rows=data["District"] != "A2",
+    )
+
+    assert panel.labels.tolist() == ["A", "B"]
+    assert panel.values["Registered - Total"][0].tolist() == [100, 120]
+    assert panel.values["Pass_Rate"][0].tolist() == [50.0, 60.0]
+    table = panel.table("Pass_Rate")
+    assert table.loc["A"].tolist() == [2, 1]
+    movers = panel.movers("Pass_Rate", 2024, 2025)
+    assert movers.set_index("District")["Change"].to_dict() == {"A": 1, "B": -1}
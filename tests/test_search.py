@@ -0,0 +1,41 @@
+"""
+Name search tests
+Tiered substring ranking and the trigram fallback for typos.
+"""
+
+from ple.search import NameIndex, fold
+
+NAMES = ["KAMPALA", "KAMULI", "KAMWENGE", "ISINGIRO", "MBARARA", "Mbarara City", "Fort Portal"]
+
+
+def test_names_starting_with_the_query_rank_before_word_and_inner_matches():
+    index = NameIndex(NAMES + ["Upper Kampala", "Bukampa"])
+
+    assert index.search("kamp") == ["KAMPALA", "Upper Kampala", "Bukampa"]
+    # Within a tier, shorter names come first
+    assert index.search("kam")[:3] == ["KAMULI", "KAMPALA", "KAMWENGE"]
+
+
+def test_matching_ignores_case_and_punctuation():
+    index = NameIndex(NAMES)
+
+    assert fold("Mbarara-City!") == "mbarara city"
+    assert index.search("MBARARA city") == ["Mbarara City"]
+    assert index.search("fort-portal") == ["Fort Portal"]
+
+
+def test_typo_finds_the_closest_name():
+    index = NameIndex(NAMES)
+
+    assert index.search("kampla") == ["KAMPALA"]
+    assert index.search("isingro") == ["ISINGIRO"]
+    assert index.search("kampla", fuzzy=False) == []
+
+
+def test_short_and_unmatched_queries():
+    index = NameIndex(NAMES + [None, 12])
+
+    assert len(index) == len(NAMES)
+    assert index.search("ka", limit=2) == ["KAMULI", "KAMPALA"]
+    assert index.search("") == []
+    assert index.search("zzzz") == []
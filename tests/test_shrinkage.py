@@ -0,0 +1,39 @@
+"""
+Shrinkage tests
+Edge cases of the beta-binomial district estimates.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from ple.shrinkage import adjusted_rates, beta_binomial
+
+
+def digest(registered, passed):
+    return pd.DataFrame(
+        {
+            "Year": [2024] * len(registered),
+            "Registered - Total": registered,
+            "Division 1 - Total": passed,
+        }
+    )
+
+
+def test_empty_frame_gives_empty_rates():
+    rates = adjusted_rates(digest([], []))
+
+    assert len(rates) == 0
+    assert "Adjusted_Pass_Rate" in rates.columns
+
+
+def test_inconsistent_totals_stay_within_bounds():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        posterior, sd = beta_binomial([120, 40, 30], [100, 80, 60], [0, 0, 0])
+        rates = adjusted_rates(digest([100, 80, 60], [120, 40, 30]))
+
+    assert (posterior <= 1).all() and np.isfinite(sd).all()
+    assert rates["Adjusted_Pass_Rate"].le(100).all()
+    assert rates.notna().all().all()
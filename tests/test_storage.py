@@ -0,0 +1,61 @@
+"""
+Arrow storage tests
+Local sources converted once to Arrow IPC and memory-mapped on later loads.
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ple import processing, storage
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIGEST = os.path.join(ROOT, "data", "V2", "P.L.E Digest 2023 - 2025 v1.csv")
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "digest.csv"
+    shutil.copy(DIGEST, path)
+    return str(path)
+
+
+def test_load_local_converts_once_and_matches_a_fresh_parse(source):
+    assert not storage.is_converted(source)
+
+    df = storage.load_local(source)
+    assert storage.is_converted(source)
+    expected = processing.clean_and_process_data(pd.read_csv(source))
+    pd.testing.assert_frame_equal(df, expected.reset_index(drop=True), check_dtype=False)
+
+    # A converted source is mapped, not parsed again
+    stamp = os.stat(storage.arrow_path_for(source)).st_mtime_ns
+    storage.load_local(source)
+    assert os.stat(storage.arrow_path_for(source)).st_mtime_ns == stamp
+
+
+def test_changed_source_is_converted_again(source):
+    storage.load_local(source)
+    raw = pd.read_csv(source)
+    raw[raw["Year"] == 2025].to_csv(source, index=False)
+
+    assert not storage.is_converted(source)
+    assert set(storage.load_local(source)["Year"]) == {2025}
+    assert storage.is_converted(source)
+
+
+def test_read_arrow_maps_numeric_columns_read_only(tmp_path):
+    path = str(tmp_path / "frame.arrow")
+    df = pd.DataFrame({"Year": [2024, 2025], "Rate": [0.5, 0.75], "District": ["A", "B"]})
+    storage.write_arrow(df, path, {"origin": "test"})
+
+    assert storage.read_arrow_metadata(path)["origin"] == "test"
+    assert [p for p in os.listdir(tmp_path) if p.endswith(".tmp")] == []
+    mapped = storage.read_arrow(path, columns=["Rate", "Missing"])
+    assert list(mapped.columns) == ["Rate"]
+    values = mapped["Rate"].to_numpy()
+    assert not values.flags.writeable
+    np.testing.assert_array_equal(values, [0.5, 0.75])
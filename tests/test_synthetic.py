@@ -0,0 +1,69 @@
+"""
+Synthetic digest tests
+Generated digests keep the published layout, add up, and clean like real data.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from ple import processing, synthetic
+from ple.storage import read_arrow
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIGEST = os.path.join(ROOT, "data", "V2", "P.L.E Digest 2023 - 2025 v1.csv")
+
+
+def test_layout_matches_the_published_digest():
+    df = synthetic.generate_digest(districts=20, years=3)
+
+    assert list(df.columns) == list(pd.read_csv(DIGEST, nrows=0).columns)
+    assert len(df) == 60
+    assert sorted(df["Year"].unique()) == [2023, 2024, 2025]
+    assert df.groupby("Year")["District"].nunique().eq(20).all()
+
+
+def test_same_seed_same_digest():
+    first = synthetic.generate_digest(districts=10, years=2, seed=4)
+
+    pd.testing.assert_frame_equal(first, synthetic.generate_digest(districts=10, years=2, seed=4))
+    assert not first.equals(synthetic.generate_digest(districts=10, years=2, seed=5))
+
+
+def test_counts_are_consistent():
+    df = synthetic.generate_digest(districts=15, years=2, schools=3)
+
+    assert len(df) == 90
+    assert df["District"].str.endswith(" School 003").sum() == 30
+    for division in synthetic.DIVISIONS:
+        pd.testing.assert_series_equal(
+            df[f"Division {division} - Boys"] + df[f"Division {division} - Girls"],
+            df[f"Division {division} - Total"],
+            check_names=False,
+        )
+    divisions = df[[f"Division {d} - Total" for d in synthetic.DIVISIONS]].sum(axis=1)
+    np.testing.assert_array_equal(divisions, df["Registered - Total"])
+    np.testing.assert_array_equal(
+        df["Sat - Total"], df["Registered - Total"] - df["Division X - Total"]
+    )
+
+
+def test_digest_cleans_like_the_published_one():
+    clean = processing.clean_and_process_data(synthetic.generate_digest(districts=12, years=2))
+
+    expected = clean["Passed - Total"] / clean["Sat - Total"] * 100
+    np.testing.assert_allclose(clean["Pass Rate - Total"], expected, atol=0.006)
+    assert clean["Pass Rate - Total"].between(0, 100).all()
+
+
+def test_written_csv_and_arrow_match_the_generated_frame(tmp_path):
+    expected = synthetic.generate_digest(districts=8, years=3, seed=2)
+
+    csv = str(tmp_path / "digest.csv")
+    assert synthetic.write_digest(csv, districts=8, years=3, seed=2) == 24
+    pd.testing.assert_frame_equal(pd.read_csv(csv), expected, check_dtype=False)
+
+    arrow = str(tmp_path / "digest.arrow")
+    assert synthetic.write_digest(arrow, districts=8, years=3, seed=2) == 24
+    pd.testing.assert_frame_equal(read_arrow(arrow), expected, check_dtype=False)
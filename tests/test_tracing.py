@@ -0,0 +1,119 @@
+"""
+Tracing and profiling tests
+Span status under errors and script control flow, stage nesting and cache
+outcomes, rolling stage statistics, and chart timing without the profiler
+panel.
+"""
+
+import json
+
+import plotly.graph_objects as go
+import pytest
+
+from ple import profiling, tracing
+
+
+class Rerun(BaseException):
+    """Stands in for Streamlit's RerunException/StopException"""
+
+
+@pytest.fixture
+def spans(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    tracing.configure(path=str(path))
+
+    def read():
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        return {record["name"]: record for record in records}
+
+    yield read
+    tracing.configure()
+
+
+def test_control_flow_is_not_an_error(spans):
+    with pytest.raises(Rerun):
+        with tracing.span("rerun"):
+            raise Rerun()
+    with pytest.raises(ValueError):
+        with tracing.span("failed"):
+            raise ValueError("bad cell")
+
+    recorded = spans()
+    assert recorded["rerun"]["status"] == "ok"
+    assert recorded["failed"]["status"] == "error"
+    assert recorded["failed"]["error"] == "ValueError: bad cell"
+
+
+@pytest.mark.parametrize("measure_payload", [False, True])
+def test_charts_are_sized_only_for_the_profiler_panel(spans, monkeypatch, measure_payload):
+    serialized = []
+    monkeypatch.setattr(go.Figure, "to_json", lambda self: serialized.append(self) or "{}")
+    fig = go.Figure(go.Bar(y=[1, 2]), layout={"title": {"text": "<b>Pass</b>"}})
+
+    profiling.start(measure_payload=measure_payload)
+    try:
+        with profiling.chart(fig):
+            pass
+    finally:
+        profile = profiling.stop()
+
+    assert len(serialized) == int(measure_payload)
+    assert profile.charts[0]["payload_bytes"] == (2 if measure_payload else None)
+    assert spans()["figure.serialize"]["attributes"]["traces"] == 1
+
+
+def test_stages_nest_and_record_cache_outcomes():
+    @profiling.computes
+    def load(value):
+        return value
+
+    profiling.start()
+    try:
+        with profiling.stage("load", rows=10):
+            with profiling.stage("fetch", cached=True):
+                load(1)
+            with profiling.stage("filter", cached=True) as record:
+                record["rows"] = 4
+    finally:
+        profile = profiling.stop()
+
+    assert [(r["stage"], r["depth"], r["cache"]) for r in profile.stages] == [
+        ("load", 0, None),
+        ("fetch", 1, "miss"),
+        ("filter", 1, "hit"),
+    ]
+    assert profile.stages[2]["rows"] == 4
+    assert profile.cache_counts() == {"hit": 1, "miss": 1}
+    assert profile.stages[0]["seconds"] >= profile.stages[1]["seconds"]
+    assert profile.total >= profile.stages[0]["seconds"]
+
+
+def test_helpers_are_no_ops_without_a_profile():
+    assert profiling.current() is None
+    with profiling.stage("load") as record:
+        assert record == {}
+    with profiling.chart(go.Figure()):
+        pass
+    assert profiling.computes(lambda: 3)() == 3
+    assert profiling.stop() is None
+
+
+def test_history_keeps_a_window_of_stage_timings():
+    history = profiling.ProfileHistory(size=20)
+    for i in range(1, 26):
+        profile = profiling.Profile()
+        profile.stages = [{"stage": "load", "seconds": i / 1000, "cache": None}]
+        if i % 5 == 0:
+            profile.stages.append({"stage": "chart", "seconds": 1.0, "cache": "hit"})
+        history.add(profile.finish())
+
+    assert len(history.runs()) == 20
+    stats = {s["stage"]: s for s in history.stage_stats()}
+    load, chart = stats["load"], stats["chart"]
+    assert load["runs"] == 20
+    assert load["median_ms"] == pytest.approx(15.5)
+    assert load["p95_ms"] == pytest.approx(24)
+    assert load["max_ms"] == pytest.approx(25)
+    assert chart["runs"] == 4
+    assert history.stage_stats()[0]["stage"] == "chart"
+    assert history.runs()[-1]["cache"] == {"hit": 1, "miss": 0}